@@ -5,26 +5,16 @@ sys.path.append(f"{PROJECT_PATH}/src")
 
 ################################################################################
 
-import yfinance as yf
 import streamlit as st
 
 from streamlit_app_units.input.input import parse_symbols, gather_input
 from streamlit_app_units.input.q_and_a import display_q_and_a
 from streamlit_app_units.pipeline.pipeline import run_pipeline
 from streamlit_app_units.output.output import display_output
+from portfolio_optimization.datasets.ticker_validator import get_ticker_validator
 from portfolio_optimization.utils.formatting_utils import strip_stock_symbol
 
 
-def is_ticker_valid(ticker: str) -> bool:
-    """
-    Checks if an ticker is available via the Yahoo Finance API.
-    """
-    info = yf.Ticker(ticker).history(
-        period='7d',
-        interval='1d'
-    )
-    return len(info) > 0
-
 def run():    
     
     # (1) Title
@@ -45,7 +35,7 @@ def run():
         if st.button("Optimize Portfolio & Simulate"):
             symbols = list(map(strip_stock_symbol, parse_symbols(symbols_input)))
             if symbols:
-                invalid_tickers = [symbol for symbol in symbols if not is_ticker_valid(symbol)]
+                invalid_tickers = get_ticker_validator().get_invalid(symbols)
                 
                 # Validate tickers
                 if len(invalid_tickers) > 0:
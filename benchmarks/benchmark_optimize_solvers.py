@@ -0,0 +1,54 @@
+"""
+Benchmarks the interior-point QP backend against SLSQP on synthetic factor-model universes.
+
+Run from the project root:
+
+    python benchmarks/benchmark_optimize_solvers.py [n_assets ...]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.datasets.portfolio_set import PortfolioSet
+from portfolio_optimization.units.optimize import get_optimizer
+
+SLSQP_MAX_ASSETS = 500  # SLSQP takes minutes per solve beyond this
+
+
+def make_stocks_data(n_assets: int, n_days: int = 750, n_factors: int = 5, seed: int = 0):
+    n_days = max(n_days, 2 * n_assets)  # keep the sample covariance matrix non-singular
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2021-01-01", periods=n_days, name="Date")
+    factors = rng.normal(0, 0.01, size=(n_days, n_factors))
+    loadings = rng.normal(0, 0.5, size=(n_assets, n_factors))
+    drift = rng.normal(0.0004, 0.0004, size=n_assets)
+    returns = factors @ loadings.T + drift + rng.normal(0, 0.01, size=(n_days, n_assets))
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return {
+        f"S{i}": pd.DataFrame({"Open": prices[:, i], "Close": prices[:, i]}, index=dates)
+        for i in range(n_assets)
+    }
+
+
+def benchmark(n_assets: int, solvers=("SLSQP", "QP")) -> pd.DataFrame:
+    stocks_data = make_stocks_data(n_assets)
+    rows = []
+    for solver in solvers:
+        if solver == "SLSQP" and n_assets > SLSQP_MAX_ASSETS:
+            continue
+        start = time.perf_counter()
+        opt_results = get_optimizer(solver)(stocks_data, PortfolioSet(), solver=solver, record_every=None)
+        rows.append({
+            "Assets": n_assets,
+            "Solver": solver,
+            "Seconds": time.perf_counter() - start,
+            "Iterations": opt_results.nit,
+            "Sharpe Ratio": -opt_results.fun,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [100, 250, 500, 1000, 2000, 3000]
+    print(pd.concat([benchmark(n) for n in sizes], ignore_index=True).to_string(index=False))
@@ -0,0 +1,67 @@
+"""
+Benchmarks the Monte Carlo return generators (asset mode) in paths per second, on synthetic factor-model
+universes, and reports the 1% CVaR each produces.
+
+Run from the project root:
+
+    python benchmarks/benchmark_return_generators.py [n_assets ...]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.units.evaluate import calculate_mcVaR_and_mcCVaR_for_each_alpha
+from portfolio_optimization.units.simulate import calculate_simulated_portfolio_returns, simulate_portfolio_returns
+from portfolio_optimization.utils.simulation_utils import RETURN_GENERATORS
+
+N_SIMS = 10000
+TIMEFRAME = 90
+
+
+def make_stocks_data(n_assets: int, n_days: int = 750, n_factors: int = 5, seed: int = 0):
+    n_days = max(n_days, 2 * n_assets)  # keep the sample covariance matrix non-singular
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2021-01-01", periods=n_days, name="Date")
+    factors = rng.standard_t(4, size=(n_days, n_factors)) * 0.007
+    loadings = rng.normal(0, 0.5, size=(n_assets, n_factors))
+    drift = rng.normal(0.0004, 0.0004, size=n_assets)
+    returns = factors @ loadings.T + drift + rng.normal(0, 0.01, size=(n_days, n_assets))
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return {
+        f"S{i}": pd.DataFrame({"Open": prices[:, i], "Close": prices[:, i]}, index=dates)
+        for i in range(n_assets)
+    }
+
+
+def benchmark(n_assets: int, generators=RETURN_GENERATORS) -> pd.DataFrame:
+    stocks_data = make_stocks_data(n_assets)
+    weights_dict = {ticker: 1 / n_assets for ticker in stocks_data}
+    rows = []
+    for generator in generators:
+        params = {
+            "simulate": {
+                "num_sims": N_SIMS,
+                "timeframe": TIMEFRAME,
+                "initial_investment": 100000,
+                "generator": generator,
+                "seed": 0,
+            },
+        }
+        start = time.perf_counter()
+        portfolio_sims_df = simulate_portfolio_returns(stocks_data, weights_dict, params)
+        seconds = time.perf_counter() - start
+        returns = calculate_simulated_portfolio_returns(portfolio_sims_df, 100000)
+        rows.append({
+            "Assets": n_assets,
+            "Generator": generator,
+            "Seconds": seconds,
+            "Paths/s": N_SIMS / seconds,
+            "CVaR (1%)": calculate_mcVaR_and_mcCVaR_for_each_alpha(returns, 0.01)["CVaR"].iloc[0],
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [10, 50, 200]
+    print(pd.concat([benchmark(n) for n in sizes], ignore_index=True).to_string(index=False))
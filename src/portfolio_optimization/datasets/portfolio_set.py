@@ -1,17 +1,95 @@
-from typing import Dict
+from typing import Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from numpy.typing import ArrayLike
+
+class OptimizationTrace:
+    """
+    Records the iterates of a single solver run into a PortfolioSet, keeping one of every
+    `record_every` calls (or only forced records if `record_every` is None).
+    """
+
+    def __init__(
+        self,
+        portfolio_set: "PortfolioSet",
+        *,
+        solver: str,
+        symbols: ArrayLike,
+        record_every: Optional[int] = 1,
+    ):
+        if record_every is not None and record_every < 1:
+            raise ValueError(f"{record_every}: Value of 'record_every' parameter must be a positive integer")
+        self.portfolio_set = portfolio_set
+        self.solver = solver
+        self.record_every = record_every
+        self._columns = portfolio_set._get_symbol_columns(symbols)
+        self._n_calls = 0
+
+    def record(
+        self,
+        weights: np.ndarray,
+        ret: float,
+        vol: float,
+        sharpe_ratio: float,
+        force: bool = False,
+    ) -> None:
+        self._n_calls += 1
+        if not force and (self.record_every is None or (self._n_calls - 1) % self.record_every):
+            return
+        self.portfolio_set._append(self.solver, ret, vol, sharpe_ratio, weights, self._columns)
 
 class PortfolioSet:
-    
-    def __init__(self):
-        self._portfolios = pd.DataFrame(columns=[
-            "Solver", "Return", "Volatility", "Sharpe Ratio", "Weights"
-        ])
-    
+    """
+    Columnar store of portfolios: a growable (n_portfolios, n_symbols) float64 weights matrix over a
+    shared symbols index, with parallel arrays of solver codes and metrics.
+    """
+
+    METRICS = ["Return", "Volatility", "Sharpe Ratio"]
+
+    def __init__(
+        self,
+        symbols: Optional[ArrayLike] = None,
+        capacity: int = 1024,
+    ):
+        self._symbols = pd.Index([] if symbols is None else list(symbols))
+        self._weights = np.zeros((capacity, len(self._symbols)), dtype=np.float64)
+        self._metrics = np.empty((len(self.METRICS), capacity), dtype=np.float64)
+        self._solver_codes = np.empty(capacity, dtype=np.int32)
+        self._solvers: List[str] = []
+        self._size = 0
+        self._portfolios = None  # DataFrame view, built lazily
+        self.timings: Dict[str, float] = {}  # solve time (seconds) of each solver
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def symbols(self) -> pd.Index:
+        return self._symbols
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._weights[:self._size]
+
+    @property
+    def solvers(self) -> np.ndarray:
+        return np.array(self._solvers, dtype=object)[self._solver_codes[:self._size]]
+
+    def get_metric(self, metric: str) -> np.ndarray:
+        try:
+            return self._metrics[self.METRICS.index(metric), :self._size]
+        except ValueError:
+            raise ValueError(f"{metric}: Invalid value for 'metric' parameter; choose from {self.METRICS}")
+
     @property
-    def portfolios(self):
+    def portfolios(self) -> pd.DataFrame:
+        # Compatible row-per-portfolio view (weights as dicts), only rebuilt after new appends
+        if self._portfolios is None or len(self._portfolios) != self._size:
+            self._portfolios = self._to_frame(np.arange(self._size))
         return self._portfolios
-    
+
     def add_portfolio(
         self,
         *,
@@ -21,7 +99,144 @@ class PortfolioSet:
         sharpe_ratio: float,
         weights: Dict[str, float]  # weights dict
     ) -> None:
-        # Directly assign the new row to the DataFrame using loc
-        self._portfolios.loc[len(self._portfolios)] = [solver, ret, vol, sharpe_ratio, weights]
+        columns = self._get_symbol_columns(list(weights.keys()))
+        self._append(solver, ret, vol, sharpe_ratio, np.fromiter(weights.values(), dtype=np.float64), columns)
+
+    def add_portfolios(
+        self,
+        *,
+        solver: Union[str, ArrayLike],
+        rets: ArrayLike,
+        vols: ArrayLike,
+        sharpe_ratios: ArrayLike,
+        weights: np.ndarray,  # (n_portfolios, len(symbols))
+        symbols: ArrayLike,
+    ) -> None:
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        n = len(weights)
+        columns = self._get_symbol_columns(symbols)
+        self._reserve(self._size + n)
+        rows = slice(self._size, self._size + n)
+        self._weights[rows] = 0
+        self._weights[rows, columns] = weights
+        self._metrics[:, rows] = [rets, vols, sharpe_ratios]
+        solvers = np.broadcast_to(np.asarray(solver, dtype=object), (n,))
+        self._solver_codes[rows] = [self._get_solver_code(s) for s in solvers]
+        self._size += n
+
+    def extend(self, other: "PortfolioSet") -> None:
+        self.add_portfolios(
+            solver=other.solvers,
+            rets=other.get_metric("Return"),
+            vols=other.get_metric("Volatility"),
+            sharpe_ratios=other.get_metric("Sharpe Ratio"),
+            weights=other.weights,
+            symbols=other.symbols,
+        )
+        self.timings.update(other.timings)
+
+    def new_trace(
+        self,
+        *,
+        solver: str,
+        symbols: ArrayLike,
+        record_every: Optional[int] = 1,
+    ) -> OptimizationTrace:
+        return OptimizationTrace(self, solver=solver, symbols=symbols, record_every=record_every)
+
+    def top_k(self, metric: str = "Sharpe Ratio", k: int = 1, ascending: bool = False) -> pd.DataFrame:
+        # Ties (including at the k-th value) go to the earliest added portfolios
+        values = self.get_metric(metric)
+        values = values if ascending else -values
+        k = min(k, self._size)
+        if 0 < k < self._size:
+            kth = np.partition(values, k - 1)[k - 1]
+            idx = np.flatnonzero(values < kth)
+            idx = np.concatenate([idx, np.flatnonzero(values == kth)[:k - len(idx)]])
+        else:
+            idx = np.arange(k)
+        idx = idx[np.argsort(values[idx], kind="stable")]
+        return self._to_frame(idx)
+
+    def to_arrow(self) -> pa.Table:
+        # Metric columns and the row-major weights buffer are handed to Arrow without copying
+        if len(self._symbols):
+            weights = pa.FixedSizeListArray.from_arrays(
+                pa.array(self._weights[:self._size].reshape(-1)), len(self._symbols)
+            )
+        else:
+            # Arrow has no zero-size fixed-size lists
+            weights = pa.array([[]] * self._size, type=pa.list_(pa.float64()))
+        solvers = pa.DictionaryArray.from_arrays(
+            pa.array(self._solver_codes[:self._size]), pa.array(self._solvers, type=pa.string())
+        )
+        table = pa.table(
+            [solvers] + [pa.array(self._metrics[i, :self._size]) for i in range(len(self.METRICS))] + [weights],
+            names=["Solver"] + self.METRICS + ["Weights"],
+        )
+        return table.replace_schema_metadata({"symbols": ",".join(map(str, self._symbols))})
+
+    def to_parquet(self, filepath: str, **kwargs) -> None:
+        pq.write_table(self.to_arrow(), filepath, **kwargs)
+
+    @classmethod
+    def from_frame(cls, portfolios: pd.DataFrame) -> "PortfolioSet":
+        portfolio_set = cls()
+        for solver, ret, vol, sharpe_ratio, weights in portfolios[["Solver"] + cls.METRICS + ["Weights"]].itertuples(index=False):
+            portfolio_set.add_portfolio(solver=solver, ret=ret, vol=vol, sharpe_ratio=sharpe_ratio, weights=weights)
+        return portfolio_set
+
+    def _get_solver_code(self, solver: str) -> int:
+        if solver not in self._solvers:
+            self._solvers.append(solver)
+        return self._solvers.index(solver)
+
+    def _get_symbol_columns(self, symbols: ArrayLike) -> np.ndarray:
+        # Widen the shared symbols index (and weights matrix) with any symbols not seen yet
+        symbols = pd.Index(list(symbols))
+        new_symbols = symbols.difference(self._symbols, sort=False)
+        if len(new_symbols):
+            self._symbols = self._symbols.append(new_symbols)
+            self._weights = np.hstack([self._weights, np.zeros((len(self._weights), len(new_symbols)))])
+        return self._symbols.get_indexer(symbols)
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._weights)
+        if size <= capacity:
+            return
+        # Grow geometrically so that appends stay O(1) amortized
+        capacity = max(size, 2 * capacity)
+        weights = np.zeros((capacity, self._weights.shape[1]), dtype=np.float64)
+        weights[:self._size] = self._weights[:self._size]
+        metrics = np.empty((len(self.METRICS), capacity), dtype=np.float64)
+        metrics[:, :self._size] = self._metrics[:, :self._size]
+        solver_codes = np.empty(capacity, dtype=np.int32)
+        solver_codes[:self._size] = self._solver_codes[:self._size]
+        self._weights, self._metrics, self._solver_codes = weights, metrics, solver_codes
+
+    def _append(
+        self,
+        solver: str,
+        ret: float,
+        vol: float,
+        sharpe_ratio: float,
+        weights: np.ndarray,
+        columns: np.ndarray,
+    ) -> None:
+        self._reserve(self._size + 1)
+        row = self._weights[self._size]
+        row[:] = 0
+        row[columns] = weights
+        self._metrics[:, self._size] = ret, vol, sharpe_ratio
+        self._solver_codes[self._size] = self._get_solver_code(solver)
+        self._size += 1
 
-    
\ No newline at end of file
+    def _to_frame(self, idx: np.ndarray) -> pd.DataFrame:
+        symbols = list(self._symbols)
+        return pd.DataFrame({
+            "Solver": np.array(self._solvers, dtype=object)[self._solver_codes[idx]],
+            "Return": self._metrics[0, idx],
+            "Volatility": self._metrics[1, idx],
+            "Sharpe Ratio": self._metrics[2, idx],
+            "Weights": [dict(zip(symbols, row)) for row in self._weights[idx].tolist()],
+        }, index=pd.Index(idx))
@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Tuple, Union
+from pathlib import Path
+import datetime
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+DateRange = Tuple[pd.Timestamp, pd.Timestamp]  # [start, end)
+
+class PriceCache:
+    """
+    Persistent per-ticker price cache: one Parquet file per (ticker, interval), recording in its schema
+    metadata the date range it covers, so that only the missing part of a requested range is fetched.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        interval: str = "1d",
+        offline: bool = False,  # raise on any miss instead of fetching
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.interval = interval
+        self.offline = offline
+        self.hits: List[str] = []
+        self.misses: List[str] = []
+
+    def filepath(self, ticker: str) -> Path:
+        return self.cache_dir / f"{ticker}_{self.interval}.parquet"
+
+    def coverage(self, ticker: str) -> Optional[DateRange]:
+        filepath = self.filepath(ticker)
+        if not filepath.exists():
+            return None
+        metadata = pq.read_schema(filepath).metadata
+        return pd.Timestamp(metadata[b"start"].decode()), pd.Timestamp(metadata[b"end"].decode())
+
+    def missing_ranges(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+    ) -> List[DateRange]:
+        start, end = pd.Timestamp(start_date), self._cap_end(end_date)
+        coverage = self.coverage(ticker)
+        if coverage is None:
+            return [(start, end)] if start < end else []
+        covered_start, covered_end = coverage
+        # Ranges extend up to the covered range (even past the requested one) so that coverage stays contiguous
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    def plan(
+        self,
+        tickers: List[str],
+        start_date: str,
+        end_date: str,
+    ) -> Dict[str, List[DateRange]]:
+        """
+        Returns the missing date ranges of each ticker, recording cache hits & misses.
+        In offline mode, raises if anything is missing, before any network call is made.
+        """
+        missing = {ticker: self.missing_ranges(ticker, start_date, end_date) for ticker in tickers}
+        self.hits = [ticker for ticker, ranges in missing.items() if not ranges]
+        self.misses = [ticker for ticker, ranges in missing.items() if ranges]
+        logger.info(f"Price cache ({self.cache_dir}): {len(self.hits)} hit(s), {len(self.misses)} miss(es)")
+        if self.offline and self.misses:
+            raise RuntimeError(
+                f"{self.misses}: Prices missing from cache ({self.cache_dir}) for "
+                f"{start_date} - {end_date}, and offline mode is enabled"
+            )
+        return {ticker: ranges for ticker, ranges in missing.items() if ranges}
+
+    def update(
+        self,
+        ticker: str,
+        data: pd.DataFrame,
+        start_date: Union[str, pd.Timestamp],
+        end_date: Union[str, pd.Timestamp],
+    ) -> None:
+        # Merge newly fetched rows of [start_date, end_date) into the cached file & widen its coverage
+        start, end = pd.Timestamp(start_date), self._cap_end(end_date)
+        coverage = self.coverage(ticker)
+        if coverage is not None:
+            cached = pd.read_parquet(self.filepath(ticker))
+            data = pd.concat([cached, data])
+            data = data[~data.index.duplicated(keep="last")]
+            start, end = min(start, coverage[0]), max(end, coverage[1])
+        data = data.sort_index()
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"start": str(start.date()).encode(),
+            b"end": str(end.date()).encode(),
+        })
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, self.filepath(ticker))
+
+    def load(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+    ) -> pd.DataFrame:
+        data = pd.read_parquet(self.filepath(ticker))
+        return data[(data.index >= pd.Timestamp(start_date)) & (data.index < pd.Timestamp(end_date))]
+
+    @staticmethod
+    def _cap_end(end_date: Union[str, pd.Timestamp]) -> pd.Timestamp:
+        # Today's bar may still change, so coverage never extends past the start of today
+        return min(pd.Timestamp(end_date), pd.Timestamp(datetime.date.today()))
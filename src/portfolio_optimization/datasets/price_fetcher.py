@@ -0,0 +1,160 @@
+from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+NO_DATA = "no data"  # failure of a ticker whose requests succeeded without returning prices
+
+class PriceFetcher(ABC):
+    """
+    Source of price history. Returns one frame with (Ticker, Price) column levels; tickers without
+    data are left out rather than filled with NaNs.
+    """
+
+    @abstractmethod
+    def fetch(
+        self,
+        tickers: List[str],
+        start_date: str,
+        end_date: Optional[str] = None,
+        interval: str = "1d",
+    ) -> pd.DataFrame:
+        ...
+
+class YFinanceFetcher(PriceFetcher):
+    """
+    Downloads all tickers in a single Yahoo Finance request.
+    """
+
+    def fetch(
+        self,
+        tickers: List[str],
+        start_date: str,
+        end_date: Optional[str] = None,
+        interval: str = "1d",
+    ) -> pd.DataFrame:
+        data: pd.DataFrame = yf.download(tickers, start=start_date, end=end_date, interval=interval, progress=False)
+        if data.empty:
+            return pd.DataFrame()
+        data.columns = data.columns.swaplevel(0, 1)
+        data.columns.names = ["Ticker", "Price"]
+        # yfinance reports failed tickers as all-NaN columns
+        data = data.dropna(axis=1, how="all")
+        return data.sort_index(axis=1, level=0)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of up to `capacity` requests, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError(f"{rate}: Value of 'rate' parameter must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class ConcurrentFetcher(PriceFetcher):
+    """
+    Splits tickers into batches fetched by a pool of threads through another fetcher, rate limited by
+    a token bucket. Failed requests are retried with exponential backoff; a batch that still fails
+    is retried ticker by ticker, so one bad ticker only loses its own data (listed in `failures`).
+    Tickers missing from a successful response are not retried (e.g. no trading session in the range),
+    and are listed in `failures` as NO_DATA.
+    """
+
+    def __init__(
+        self,
+        fetcher: PriceFetcher,
+        *,
+        batch_size: int = 10,
+        n_workers: int = 1,
+        rate: Optional[float] = None,  # requests per second (None: unlimited)
+        burst: int = 1,  # requests allowed at once by the rate limit
+        max_retries: int = 3,
+        backoff: float = 1.0,  # seconds before the first retry, doubled on each retry
+    ):
+        self.fetcher = fetcher
+        self.batch_size = batch_size
+        self.n_workers = n_workers
+        self.rate_limit = TokenBucket(rate, burst) if rate is not None else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def fetch(
+        self,
+        tickers: List[str],
+        start_date: str,
+        end_date: Optional[str] = None,
+        interval: str = "1d",
+    ) -> pd.DataFrame:
+        self.failures = {}
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        fetch_batch = lambda batch: self._fetch_batch(batch, start_date, end_date, interval)
+        if self.n_workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+                frames = list(executor.map(fetch_batch, batches))
+        else:
+            frames = [fetch_batch(batch) for batch in batches]
+        if self.failures:
+            logger.warning(f"{list(self.failures)}: Failed to download prices ({self.failures})")
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, axis=1).sort_index(axis=1, level=0) if frames else pd.DataFrame()
+
+    def _fetch_batch(
+        self,
+        batch: List[str],
+        start_date: str,
+        end_date: Optional[str],
+        interval: str,
+    ) -> pd.DataFrame:
+        frames, pending, error = [], list(batch), NO_DATA
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            if self.rate_limit is not None:
+                self.rate_limit.acquire()
+            try:
+                data = self.fetcher.fetch(pending, start_date, end_date, interval)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            if data.empty:
+                # Asking again would not return prices either
+                error = NO_DATA
+                break
+            frames.append(data)
+            fetched = data.columns.get_level_values(0).unique()
+            pending = [ticker for ticker in pending if ticker not in fetched]
+            if not pending:
+                break
+        if len(pending) > 1 and error != NO_DATA:
+            # Isolate the failing ticker(s) of the batch
+            frames += [self._fetch_batch([ticker], start_date, end_date, interval) for ticker in pending]
+        elif pending:
+            with self._lock:
+                self.failures.update(dict.fromkeys(pending, error))
+        frames = [frame for frame in frames if not frame.empty]
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
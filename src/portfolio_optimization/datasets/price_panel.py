@@ -0,0 +1,91 @@
+from typing import Callable, Iterator, Mapping, Union
+from functools import cached_property
+import hashlib
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike, DTypeLike
+
+class PricePanel(Mapping):
+    """
+    Aligned prices of every ticker: one (n_fields, n_dates, n_tickers) array over shared dates, tickers
+    & fields indexes, stored field-major so that a field (e.g. Close for all tickers) is a contiguous block.
+
+    Field frames (dates x tickers) and ticker frames (dates x fields, the Mapping interface) are
+    read-only views of the array, so consumers written against dicts of per-ticker frames keep working.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,  # (n_fields, n_dates, n_tickers)
+        *,
+        dates: ArrayLike,
+        tickers: ArrayLike,
+        fields: ArrayLike,
+    ):
+        self.dates = pd.Index(dates)
+        self.tickers = pd.Index(list(tickers), name="Ticker")
+        self.fields = pd.Index(list(fields), name="Price")
+        expected_shape = (len(self.fields), len(self.dates), len(self.tickers))
+        if values.shape != expected_shape:
+            raise ValueError(f"{values.shape}: Invalid shape for 'values' parameter; expected {expected_shape}")
+        self.values = np.ascontiguousarray(values)
+        self.values.flags.writeable = False
+
+    @classmethod
+    def from_frame(
+        cls,
+        data: pd.DataFrame,  # wide frame with (Ticker, Price) column levels
+        dtype: DTypeLike = np.float64,
+    ) -> "PricePanel":
+        tickers = data.columns.get_level_values(0).unique()
+        fields = data.columns.get_level_values(1).unique()
+        data = data.reindex(columns=pd.MultiIndex.from_product([tickers, fields]))
+        values = data.to_numpy(dtype=dtype).reshape(len(data), len(tickers), len(fields)).transpose(2, 0, 1)
+        return cls(values, dates=data.index, tickers=tickers, fields=fields)
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Mapping[str, Union[Callable, pd.DataFrame]],
+        dtype: DTypeLike = np.float64,
+    ) -> "PricePanel":
+        frames = {ticker: df() if callable(df) else df for ticker, df in data.items()}
+        return cls.from_frame(pd.concat(frames, axis=1), dtype=dtype)
+
+    @cached_property
+    def content_hash(self) -> str:
+        # Identifies the prices across copies of the panel (e.g. each node's load of a persisted panel)
+        digest = hashlib.blake2b(self.values.data, digest_size=16)
+        for index in (self.dates, self.tickers, self.fields):
+            digest.update(pd.util.hash_pandas_object(index, index=False).values.tobytes())
+        digest.update(str(self.values.dtype).encode())
+        return digest.hexdigest()
+
+    def field(self, field: str) -> pd.DataFrame:
+        # Prices of one field, dates x tickers (zero-copy)
+        try:
+            i = self.fields.get_loc(field)
+        except KeyError:
+            raise ValueError(f"{field}: Invalid value for 'field' parameter; choose from {list(self.fields)}")
+        return pd.DataFrame(self.values[i], index=self.dates, columns=self.tickers, copy=False)
+
+    def __getitem__(self, ticker: str) -> pd.DataFrame:
+        # Prices of one ticker, dates x fields (zero-copy, strided)
+        i = self.tickers.get_loc(ticker)
+        return pd.DataFrame(self.values[:, :, i].T, index=self.dates, columns=self.fields, copy=False)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __repr__(self) -> str:
+        return (
+            f"PricePanel({len(self.dates)} dates x {len(self.tickers)} tickers x {len(self.fields)} fields, "
+            f"{self.values.dtype}, {self.values.nbytes / 2 ** 20:.1f} MiB)"
+        )
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.values.flags.writeable = False
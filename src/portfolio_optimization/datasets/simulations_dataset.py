@@ -0,0 +1,147 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from kedro.io import AbstractDataSet
+from kedro.io.core import DataSetError, get_protocol_and_path
+
+SAMPLE_WEIGHT_COLUMN = "sample_weight"
+
+class PortfolioSimulations:
+    """
+    Simulated portfolio values as an Arrow table: one row per simulation, one float64 column per day,
+    plus a sample weight column if the simulations are weighted (e.g. importance sampling).
+
+    Built either from a table (e.g. memory-mapped by SimulationsDataSet, so that columns are read
+    zero-copy from the file) or lazily from an iterator of (n_sims, timeframe) chunks (or of (chunk,
+    sample weights) pairs), which is only consumed by iter_batches (streaming, e.g. into a file) or on
+    first access to `table`.
+    """
+
+    def __init__(
+        self,
+        table: Optional[pa.Table] = None,
+        *,
+        chunks: Optional[Iterable[Union[np.ndarray, Tuple[np.ndarray, Optional[np.ndarray]]]]] = None,
+        timeframe: Optional[int] = None,
+        weighted: bool = False,
+    ):
+        if (table is None) == (chunks is None):
+            raise ValueError("Exactly one of 'table' or 'chunks' parameters must be provided")
+        if chunks is not None and timeframe is None:
+            raise ValueError("'timeframe' parameter must be provided with 'chunks'")
+        self._table = table
+        self._chunks = None if chunks is None else iter(chunks)
+        self.weighted = weighted if table is None else SAMPLE_WEIGHT_COLUMN in table.column_names
+        self._timeframe = timeframe if table is None else table.num_columns - self.weighted
+        self.schema = pa.schema(
+            [pa.field(str(t), pa.float64()) for t in range(self._timeframe)]
+            + ([pa.field(SAMPLE_WEIGHT_COLUMN, pa.float64())] if self.weighted else [])
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "PortfolioSimulations":
+        # From the (timeframe x num_sims) frame returned by simulate_portfolio_returns
+        return cls(chunks=[df.to_numpy(dtype=np.float64).T], timeframe=len(df))
+
+    def iter_batches(self) -> Iterator[pa.RecordBatch]:
+        if self._table is not None:
+            yield from self._table.to_batches()
+            return
+        # Chunks are consumed as they are streamed, so they can only be streamed once
+        chunks, self._chunks = self._chunks, None
+        if chunks is None:
+            raise DataSetError("Simulation chunks have already been consumed")
+        for chunk in chunks:
+            chunk, sample_weights = chunk if isinstance(chunk, tuple) else (chunk, None)
+            arrays = [pa.array(chunk[:, t]) for t in range(self._timeframe)]
+            if self.weighted:
+                arrays.append(pa.array(np.ones(len(chunk)) if sample_weights is None else sample_weights))
+            yield pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+    @property
+    def table(self) -> pa.Table:
+        if self._table is None:
+            self._table = pa.Table.from_batches(list(self.iter_batches()), schema=self.schema)
+        return self._table
+
+    @property
+    def num_sims(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def timeframe(self) -> int:
+        return self._timeframe
+
+    def day(self, t: int) -> np.ndarray:
+        # Values of every simulation on day t (zero-copy for a single-chunk column, e.g. a mapped file)
+        column = self.table.column(t)
+        if column.num_chunks == 1:
+            return column.chunk(0).to_numpy(zero_copy_only=True)
+        return column.to_numpy()
+
+    def iter_chunks(self, with_sample_weights: bool = False) -> Iterator[Union[np.ndarray, Tuple]]:
+        # (n_sims, timeframe) arrays of simulated paths, batch by batch, without materializing the table
+        for batch in self.iter_batches():
+            values = np.column_stack([batch.column(t).to_numpy() for t in range(self._timeframe)])
+            yield (values, self._batch_sample_weights(batch)) if with_sample_weights else values
+
+    def iter_day(self, t: int, with_sample_weights: bool = False) -> Iterator[Union[np.ndarray, Tuple]]:
+        # Values of every simulation on day t, batch by batch, without materializing the table
+        for batch in self.iter_batches():
+            values = batch.column(t).to_numpy()
+            yield (values, self._batch_sample_weights(batch)) if with_sample_weights else values
+
+    def sample_weights(self) -> Optional[np.ndarray]:
+        # Sample weight of every simulation (None if unweighted)
+        return self.table.column(SAMPLE_WEIGHT_COLUMN).to_numpy() if self.weighted else None
+
+    def _batch_sample_weights(self, batch: pa.RecordBatch) -> Optional[np.ndarray]:
+        return batch.column(self._timeframe).to_numpy() if self.weighted else None
+
+    def terminal_values(self) -> np.ndarray:
+        return self.day(self._timeframe - 1)
+
+    def to_frame(self, max_paths: Optional[int] = None) -> pd.DataFrame:
+        # Legacy (timeframe x num_sims) frame, of the first `max_paths` simulations only if given
+        table = self.table if max_paths is None else self.table.slice(0, max_paths)
+        values = np.empty((self._timeframe, table.num_rows))
+        for t in range(self._timeframe):
+            values[t] = table.column(t).to_numpy()
+        return pd.DataFrame(values, columns=[f"Simulation {i + 1}" for i in range(table.num_rows)])
+
+    def __repr__(self) -> str:
+        num_sims = "?" if self._table is None else self.num_sims
+        return f"PortfolioSimulations({num_sims} simulations x {self._timeframe} days)"
+
+class SimulationsDataSet(AbstractDataSet):
+    """
+    PortfolioSimulations persisted as an Arrow IPC (Feather v2) file, written one record batch per
+    simulation chunk and loaded memory-mapped, so that reading a day's values doesn't copy or convert it.
+    Only local files are supported, since memory mapping requires them.
+    """
+
+    def __init__(self, filepath: str):
+        protocol, path = get_protocol_and_path(filepath)
+        if protocol != "file":
+            raise DataSetError(f"{filepath}: {self.__class__.__name__} only supports local files")
+        self._filepath = Path(path)
+
+    def _load(self) -> PortfolioSimulations:
+        source = pa.memory_map(str(self._filepath), "r")
+        return PortfolioSimulations(pa.ipc.open_file(source).read_all())
+
+    def _save(self, data: Union[PortfolioSimulations, pd.DataFrame]) -> None:
+        if isinstance(data, pd.DataFrame):
+            data = PortfolioSimulations.from_frame(data)
+        self._filepath.parent.mkdir(parents=True, exist_ok=True)
+        with pa.OSFile(str(self._filepath), "wb") as sink, pa.ipc.new_file(sink, data.schema) as writer:
+            for batch in data.iter_batches():
+                writer.write_batch(batch)
+
+    def _exists(self) -> bool:
+        return self._filepath.exists()
+
+    def _describe(self) -> Dict[str, Any]:
+        return dict(filepath=self._filepath)
@@ -1,12 +1,16 @@
-from typing import Union, Iterable, Optional, Callable, Any, Dict
-import yfinance as yf
+from typing import Union, Iterable, Optional, Callable, Any, Dict, List, Tuple
 import pandas as pd
 import streamlit as st
 
+from portfolio_optimization.datasets.price_cache import PriceCache
+from portfolio_optimization.datasets.price_fetcher import NO_DATA, PriceFetcher, ConcurrentFetcher, YFinanceFetcher
+from portfolio_optimization.datasets.ticker_validator import get_ticker_validator
 from portfolio_optimization.utils.formatting_utils import strip_stock_symbol
 from portfolio_optimization.utils.kedro_utils import read_catalog
 from portfolio_optimization.utils.wrapper_utils import wrapper
 
+MAX_CLOSED_BDAYS = 2  # missing ranges this short may fall entirely on exchange holidays
+
 class StocksDataLoader:
     
     def __init__(
@@ -14,11 +18,19 @@ class StocksDataLoader:
         symbols: Union[str, Iterable[str]],
         start_date: str,
         end_date: Optional[str] = None,
+        cache: Optional[PriceCache] = None,
+        fetcher: Optional[PriceFetcher] = None,  # default: sequential batches of 10 tickers from Yahoo Finance
     ):
         self.symbols = self.obj2list(symbols)
         [symbols] if isinstance(symbols, str) else list(symbols)
         self.symbols = list(map(strip_stock_symbol, self.symbols))
-        invalid_tickers = [symbol for symbol in self.symbols if not self.is_ticker_valid(symbol)]
+        self.cache = cache
+        self.fetcher = fetcher or ConcurrentFetcher(YFinanceFetcher())
+        # Cached tickers were valid when first downloaded; offline, nothing is checked over the network
+        unchecked = [] if cache is not None and cache.offline else [
+            symbol for symbol in self.symbols if cache is None or cache.coverage(symbol) is None
+        ]
+        invalid_tickers = get_ticker_validator().get_invalid(unchecked) if unchecked else []
         if len(invalid_tickers) > 0:
             error = f"The following tickers are invalid: {invalid_tickers}"
             st.error(error)
@@ -37,11 +49,7 @@ class StocksDataLoader:
         """
         Checks if an ticker is available via the Yahoo Finance API.
         """
-        info = yf.Ticker(ticker).history(
-            period='7d',
-            interval='1d'
-        )
-        return len(info) > 0
+        return get_ticker_validator().is_valid(ticker)
 
     # def _test_yf_download(self):
     #     test_symbols = self.symbols
@@ -60,18 +68,54 @@ class StocksDataLoader:
         symbols: Union[str, Iterable[str]],
         start_date: str,
         end_date: Optional[str] = None,
-        batch_size: Optional[int] = 10,
     ) -> pd.DataFrame:
         symbols = self.obj2list(symbols)
-        all_data = []
-        for i in range(0, len(symbols), batch_size):
-            batch_symbols = symbols[i:i + batch_size]
-            data: pd.DataFrame = yf.download(batch_symbols, start=start_date, end=end_date)
-            data.columns = data.columns.swaplevel(0, 1)
-            data.sort_index(axis=1, level=0, inplace=True)
-            all_data.append(data)
-        
-        return pd.concat(all_data, axis=1) if all_data else pd.DataFrame()
+        if self.cache is not None:
+            return self._download_and_clean_data_cached(symbols, start_date, end_date)
+        return self.fetcher.fetch(symbols, start_date, end_date)
+
+    def _download_and_clean_data_cached(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: Optional[str],
+    ) -> pd.DataFrame:
+        end_date = end_date or pd.Timestamp.today().strftime("%Y-%m-%d")
+
+        # (1) Fetch Only Missing Date Ranges (tickers missing the same range are downloaded together)
+        missing: Dict[Tuple[pd.Timestamp, pd.Timestamp], List[str]] = {}
+        for ticker, ranges in self.cache.plan(symbols, start_date, end_date).items():
+            for date_range in ranges:
+                missing.setdefault(date_range, []).append(ticker)
+        for (start, end), tickers in missing.items():
+            n_bdays = len(pd.bdate_range(start, end, inclusive="left"))
+            data = self.fetcher.fetch(tickers, start, end, interval=self.cache.interval) if n_bdays else pd.DataFrame()
+            # Failed tickers are not cached, so their range is fetched again next run
+            fetched = data.columns.get_level_values(0).unique() if not data.empty else []
+            for ticker in fetched:
+                self.cache.update(ticker, data[ticker].dropna(how="all"), start, end)
+            # ... unless the market was closed (weekend, holiday): no ticker has prices, and none failed with an error
+            # (no fetch ran for an empty range, so the fetcher's failures belong to another range)
+            failures = getattr(self.fetcher, "failures", {}) if n_bdays else {}
+            if not len(fetched) and n_bdays <= MAX_CLOSED_BDAYS and all(
+                failures.get(ticker, NO_DATA) == NO_DATA for ticker in tickers
+            ):
+                for ticker in tickers:
+                    self.cache.update(ticker, pd.DataFrame(index=pd.DatetimeIndex([], name="Date")), start, end)
+
+        # (2) Read Requested Window From Cache
+        cached = {
+            ticker: self.cache.load(ticker, start_date, end_date) for ticker in symbols if self.cache.coverage(ticker)
+        }
+        if not cached:
+            return pd.DataFrame()
+        data = pd.concat(
+            cached,
+            axis=1,
+            names=["Ticker", "Price"],
+        )
+        data.sort_index(axis=1, level=0, inplace=True)
+        return data
     
     @property
     def data(self) -> pd.DataFrame:
@@ -1,39 +1,60 @@
-# from typing import Any, Dict, Union, Iterable, Optional
-# import pandas as pd
-# from kedro.io import PartitionedDataSet
-# from kedro.io.core import DataSetError
-# from copy import deepcopy
-# from datetime import datetime
-# from portfolio_optimization.datasets.stocks_data_loader import StocksDataLoader
-# from portfolio_optimization.consts import DATE_FORMAT
-
-
-# class StocksPartitionedDataSet(PartitionedDataSet):
-#     def __init__(
-#         self,
-#         path: str,
-#         dataset,
-#         symbols: Union[str, Iterable[str]],
-#         start_date: str,
-#         end_date: Optional[str] = None,
-#         **kwargs
-#     ):
-#         super().__init__(path, dataset, **kwargs)
-#         self.symbols = [symbols] if isinstance(symbols, str) else list(symbols)
-#         self.start_date = pd.to_datetime(start_date).strftime(DATE_FORMAT)
-#         end_date = datetime.today() if end_date is None else pd.to_datetime(end_date)
-#         self.end_date = end_date.strftime(DATE_FORMAT)
-        # self.loader = StocksDataLoader(self.symbols, self.start_date, self.end_date)
-
-    # def _load(self) -> Dict[str, Dict[str, pd.Series]]:
-    #     """
-    #     Custom load method to organize data into a nested dictionary structure
-    #     where the first level keys are stock tickers and the second level keys are dates.
-    #     """
-        # try:
-        #     partitions = super()._load() # Load using the base class's load method
-        #     partitions = {f"{k.split('.')[0]}": v for k, v in partitions.items()}
-        # except DataSetError:
-        #     partitions = self.loader.get_data(return_dict=True)
-        #     self._save(partitions)
-        # return partitions
\ No newline at end of file
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+from copy import deepcopy
+import pandas as pd
+from kedro.io import PartitionedDataSet
+from kedro.io.core import DataSetError
+
+from portfolio_optimization.consts import DATE_FORMAT
+from portfolio_optimization.datasets.metadata_parquet_dataset import MetadataParquetDataSet
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.utils.formatting_utils import str2list, strip_stock_symbol
+
+
+class StocksPartitionedDataSet(PartitionedDataSet):
+    """
+    Stock prices persisted as one Parquet file per ticker (e.g. MetadataParquetDataSet partitions, which
+    record the ticker & date range in the file's schema metadata), loaded into a PricePanel.
+
+    Loading only reads the partitions of `symbols` (all partitions if None), and of each partition only
+    the columns listed in the partition dataset's `load_args` (e.g. `columns: [Close]`), so load time and
+    memory scale with the tickers & fields actually used.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dataset: Union[str, type, Dict[str, Any]],
+        symbols: Optional[Union[str, Iterable[str]]] = None,
+        dtype: str = "float64",
+        **kwargs
+    ):
+        super().__init__(path, dataset, **kwargs)
+        self.symbols = None if symbols is None else list(map(strip_stock_symbol, str2list(symbols)))
+        self.dtype = dtype
+
+    def _load(self) -> PricePanel:
+        partitions = super()._load()  # {ticker: load function}, nothing read yet
+        if self.symbols is not None:
+            missing = [symbol for symbol in self.symbols if symbol not in partitions]
+            if missing:
+                raise DataSetError(f"{missing}: No partitions found in '{self._path}'")
+            partitions = {symbol: partitions[symbol] for symbol in self.symbols}
+        return PricePanel.from_dict(partitions, dtype=self.dtype)
+
+    def _save(self, data: Union[PricePanel, Dict[str, Union[Callable, pd.DataFrame]]]) -> None:
+        if self._overwrite and self._filesystem.exists(self._normalized_path):
+            self._filesystem.rm(self._normalized_path, recursive=True)
+
+        for ticker, df in sorted(data.items()):
+            df = (df() if callable(df) else df).dropna(how="all")
+            kwargs = deepcopy(self._dataset_config)
+            kwargs[self._filepath_arg] = self._join_protocol(self._partition_to_path(ticker))
+            if issubclass(self._dataset_type, MetadataParquetDataSet) and not df.empty:
+                kwargs["metadata"] = {
+                    **(kwargs.get("metadata") or {}),
+                    "ticker": ticker,
+                    "start_date": df.index.min().strftime(DATE_FORMAT),
+                    "end_date": df.index.max().strftime(DATE_FORMAT),
+                }
+            self._dataset_type(**kwargs).save(df)
+        self._invalidate_caches()
@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime
+import logging
+import threading
+import time
+
+from portfolio_optimization.datasets.price_fetcher import PriceFetcher, YFinanceFetcher
+
+logger = logging.getLogger(__name__)
+
+class TickerValidator:
+    """
+    Checks whether tickers are available via the Yahoo Finance API: all unknown tickers are checked
+    in a single bulk request for the last week of prices, and results (valid or invalid) are cached
+    for `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[PriceFetcher] = None,
+        ttl: float = 24 * 60 * 60,
+    ):
+        self.fetcher = fetcher or YFinanceFetcher()
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[bool, float]] = {}  # ticker -> (is valid, checked at)
+        self._lock = threading.Lock()
+
+    def validate(self, tickers: Iterable[str]) -> Dict[str, bool]:
+        tickers = list(dict.fromkeys(tickers))
+        now = time.monotonic()
+        with self._lock:
+            results = {
+                ticker: self._cache[ticker][0]
+                for ticker in tickers
+                if ticker in self._cache and now - self._cache[ticker][1] < self.ttl
+            }
+        unknown = [ticker for ticker in tickers if ticker not in results]
+        if unknown:
+            start_date = (datetime.date.today() - datetime.timedelta(days=7)).strftime("%Y-%m-%d")
+            data = self.fetcher.fetch(unknown, start_date)
+            fetched = set(data.columns.get_level_values(0)) if not data.empty else set()
+            checked = {ticker: ticker in fetched for ticker in unknown}
+            # A request returning nothing at all may have failed, so it is not cached
+            if fetched:
+                with self._lock:
+                    self._cache.update({ticker: (is_valid, now) for ticker, is_valid in checked.items()})
+            results.update(checked)
+        logger.info(f"Validated {len(tickers)} ticker(s): {len(tickers) - len(unknown)} cached, {len(unknown)} requested")
+        return {ticker: results[ticker] for ticker in tickers}
+
+    def get_invalid(self, tickers: Iterable[str]) -> List[str]:
+        return [ticker for ticker, is_valid in self.validate(tickers).items() if not is_valid]
+
+    def is_valid(self, ticker: str) -> bool:
+        return self.validate([ticker])[ticker]
+
+_ticker_validator: Optional[TickerValidator] = None
+
+def get_ticker_validator() -> TickerValidator:
+    # Shared by every caller in the process, so that each ticker is checked once per TTL
+    global _ticker_validator
+    if _ticker_validator is None:
+        _ticker_validator = TickerValidator()
+    return _ticker_validator
@@ -2,16 +2,29 @@ from kedro.pipeline import node, Pipeline
 
 from portfolio_optimization.units.optimize import optimize_weights, extract_best_portfolio_weights
 from portfolio_optimization.units.visualize import plot_portfolios, plot_best_portfolio_weights
+from portfolio_optimization.utils.moments_utils import estimate_covariance_model
 
 
 def create_pipeline() -> Pipeline:
     return Pipeline(
         [
+            node(
+                func=estimate_covariance_model,
+                inputs={
+                    "stocks_data": "stock_prices",
+                    "agg": "params:optimize.optimize_on",
+                    "estimator": "params:covariance.estimator",
+                    "n_factors": "params:covariance.n_factors",
+                },
+                outputs="covariance_model",
+                name="estimate_covariance_model",
+            ),
             node(
                 func=optimize_weights,
                 inputs={
                     "stocks_data": "stock_prices",
                     "params": "parameters",
+                    "covariance_model": "covariance_model",
                 },
                 outputs="portfolios",
                 name="optimize",
@@ -5,25 +5,35 @@ from portfolio_optimization.units.visualize import (
     plot_simulated_portfolio_returns_dist_all_alphas
 )
 from portfolio_optimization.units.simulate import (
-    simulate_portfolio_returns,
+    simulate_portfolio_paths,
     calculate_simulated_portfolio_returns,
+    calculate_simulated_portfolio_returns_digest,
+    calculate_simulated_path_risk,
     calculate_simulated_portfolio_returns_stats
 )
-from portfolio_optimization.units.evaluate import calculate_mcVaR_for_each_alpha, calculate_mcCVaR_for_each_alpha
+from portfolio_optimization.units.evaluate import (
+    calculate_mcVaR_and_mcCVaR_for_each_alpha,
+    split_mcVaR_and_mcCVaR,
+    calculate_simulation_convergence,
+    calculate_path_risk_for_each_alpha,
+    calculate_loss_barrier_breach_probabilities,
+)
 
 
 def create_pipeline() -> Pipeline:
     return Pipeline(
         [
             node(
-                func=simulate_portfolio_returns,
+                func=simulate_portfolio_paths,
                 inputs={
                     "stocks_data": "stock_prices",
                     "weights_dict": "best_portfolio_weights",
                     "params": "parameters",
+                    "agg": "params:optimize.optimize_on",
+                    "covariance_model": "covariance_model",
                 },
                 outputs="portfolio_simulations",
-                name="simulate_portfolio_returns",
+                name="simulate_portfolio_paths",
             ),
             node(
                 func=calculate_simulated_portfolio_returns,
@@ -34,6 +44,17 @@ def create_pipeline() -> Pipeline:
                 outputs="simulated_portfolio_returns",
                 name="calculate_simulated_portfolio_returns",
             ),
+            node(
+                func=calculate_simulated_portfolio_returns_digest,
+                inputs={
+                    "portfolio_simulations": "portfolio_simulations",
+                    "initial_investment": "params:simulate.initial_investment",
+                    "compression": "params:evaluate.compression",
+                    "n_batches": "params:evaluate.n_batches",
+                },
+                outputs="simulated_portfolio_returns_digest",
+                name="calculate_simulated_portfolio_returns_digest",
+            ),
             node(
                 func=calculate_simulated_portfolio_returns_stats,
                 inputs={
@@ -43,23 +64,58 @@ def create_pipeline() -> Pipeline:
                 name="calculate_simulated_portfolio_returns_stats",
             ),
             node(
-                func=calculate_mcVaR_for_each_alpha,
+                func=calculate_mcVaR_and_mcCVaR_for_each_alpha,
                 inputs={
-                    "portfolio_returns": "simulated_portfolio_returns",
+                    "portfolio_returns": "simulated_portfolio_returns_digest",
                     "alphas": "params:evaluate.alphas",
                 },
-                outputs="portfolio_simulations_VaR",
-                name="calculate_portfolio_simulations_VaR",
+                outputs="portfolio_simulations_VaR_and_CVaR",
+                name="calculate_portfolio_simulations_VaR_and_CVaR",
+            ),
+            node(
+                func=split_mcVaR_and_mcCVaR,
+                inputs="portfolio_simulations_VaR_and_CVaR",
+                outputs=["portfolio_simulations_VaR", "portfolio_simulations_CVaR"],
+                name="split_portfolio_simulations_VaR_and_CVaR",
             ),
             node(
-                func=calculate_mcCVaR_for_each_alpha,
+                func=calculate_simulation_convergence,
                 inputs={
-                    "portfolio_returns": "simulated_portfolio_returns",
+                    "portfolio_returns": "simulated_portfolio_returns_digest",
+                    "alphas": "params:evaluate.alphas",
+                    "rel_tol": "params:simulate.adaptive.rel_tol",
+                    "confidence": "params:simulate.adaptive.confidence",
+                    "min_scale": "params:simulate.adaptive.min_scale",
+                    "initial_investment": "params:simulate.initial_investment",
+                },
+                outputs="portfolio_simulations_convergence",
+                name="calculate_portfolio_simulations_convergence",
+            ),
+            node(
+                func=calculate_simulated_path_risk,
+                inputs={
+                    "portfolio_simulations": "portfolio_simulations",
+                    "initial_investment": "params:simulate.initial_investment",
+                    "loss_barriers": "params:evaluate.loss_barriers",
+                    "compression": "params:evaluate.compression",
+                },
+                outputs="simulated_path_risk",
+                name="calculate_simulated_path_risk",
+            ),
+            node(
+                func=calculate_path_risk_for_each_alpha,
+                inputs={
+                    "path_risk": "simulated_path_risk",
                     "alphas": "params:evaluate.alphas",
-                    "VaR_series": "portfolio_simulations_VaR",
                 },
-                outputs="portfolio_simulations_CVaR",
-                name="calculate_portfolio_simulations_CVaR",
+                outputs="portfolio_simulations_path_risk",
+                name="calculate_portfolio_simulations_path_risk",
+            ),
+            node(
+                func=calculate_loss_barrier_breach_probabilities,
+                inputs="simulated_path_risk",
+                outputs="portfolio_simulations_breach_probabilities",
+                name="calculate_portfolio_simulations_breach_probabilities",
             ),
             node(
                 func=plot_simulation_and_evaluation_all_alphas,
@@ -72,6 +128,7 @@ def create_pipeline() -> Pipeline:
                     "CVaR_color": "params:visualize.CVaR_color",
                     "days": "params:simulate.timeframe",
                     "show": "params:visualize.show",
+                    "max_paths": "params:visualize.max_simulation_paths",
                 },
                 outputs="simulation_and_evaluation_plots",
                 name="plot_simulation_and_evaluation_all_alphas",
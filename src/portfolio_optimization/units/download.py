@@ -1,14 +1,34 @@
-from typing import Any, Dict, Callable
+from typing import Any, Dict
 
 from portfolio_optimization.consts import DATE_FORMAT
+from portfolio_optimization.datasets.price_cache import PriceCache
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.datasets.price_fetcher import ConcurrentFetcher, YFinanceFetcher
 from portfolio_optimization.datasets.stocks_data_loader import StocksDataLoader
 from portfolio_optimization.utils.date_utils import format_date, get_end_date
 
 
-def download_stock_prices(params: Dict[str, Any]) -> Dict[str, Callable]:
+def download_stock_prices(params: Dict[str, Any]) -> PricePanel:
     symbols = params["data"]["stocks"]["symbols"]
     start_date = format_date(params["data"]["stocks"]["start_date"], format=DATE_FORMAT)
     end_date = get_end_date(params["data"]["stocks"].get("end_date"), format=DATE_FORMAT)
-    loader = StocksDataLoader(symbols, start_date, end_date)
-    data = loader.get_data(return_dict=True)
-    return data
+    cache_params = params["data"]["stocks"].get("cache") or {}
+    cache = None
+    if cache_params.get("enabled", False):
+        cache = PriceCache(
+            cache_params.get("dir", "data/01_raw/prices"),
+            interval=cache_params.get("interval", "1d"),
+            offline=cache_params.get("offline", False),
+        )
+    fetch_params = params["data"]["stocks"].get("fetch") or {}
+    fetcher = ConcurrentFetcher(
+        YFinanceFetcher(),
+        batch_size=fetch_params.get("batch_size", 10),
+        n_workers=fetch_params.get("n_workers", 1),
+        rate=fetch_params.get("rate"),
+        burst=fetch_params.get("burst", 1),
+        max_retries=fetch_params.get("max_retries", 3),
+        backoff=fetch_params.get("backoff", 1.0),
+    )
+    loader = StocksDataLoader(symbols, start_date, end_date, cache=cache, fetcher=fetcher)
+    return PricePanel.from_frame(loader.data, dtype=params["data"]["stocks"].get("dtype", "float64"))
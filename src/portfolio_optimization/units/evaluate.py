@@ -1,8 +1,12 @@
-from typing import List, Union, Dict, Optional
+from typing import List, Union, Dict, Optional, Tuple
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 
+from portfolio_optimization.utils.convergence_utils import calculate_confidence_intervals
+from portfolio_optimization.utils.path_risk_utils import PathRiskAccumulator
+from portfolio_optimization.utils.quantile_utils import BatchedQuantileDigest, QuantileDigest
+
 # Verify & establish alphas
 def establish_alphas(alphas: Union[List[float], float]):
     if isinstance(alphas, float):
@@ -19,35 +23,54 @@ def establish_alphas(alphas: Union[List[float], float]):
 
 # VaR (Monte Carlo) - single alpha
 def calculate_mcVaR(
-    portfolio_returns: pd.Series,
+    portfolio_returns: Union[pd.Series, QuantileDigest],
     alpha: Union[List[float], float] = 0.05,
+    sample_weights: Optional[np.ndarray] = None,
 ) -> float:
+    if isinstance(portfolio_returns, QuantileDigest):
+        return portfolio_returns.quantile(alpha)
+    if sample_weights is not None:
+        VaRs = _weighted_mcVaR_and_mcCVaR(
+            np.asarray(portfolio_returns, dtype=np.float64),
+            np.asarray(sample_weights, dtype=np.float64),
+            list(np.atleast_1d(alpha)),
+        )["VaR"].to_numpy()
+        return VaRs if np.ndim(alpha) else VaRs[0]
     VaR = np.percentile(portfolio_returns, alpha * 100)
     return VaR
 
 # VaR (Monte Carlo) - many alphas
 def calculate_mcVaR_for_each_alpha(
-    portfolio_returns: pd.Series,
+    portfolio_returns: Union[pd.Series, QuantileDigest],
     alphas: Union[List[float], float] = 0.05,
 ) -> Dict[float, float]:
     alphas = establish_alphas(alphas)
+    if isinstance(portfolio_returns, QuantileDigest):
+        return dict(zip(alphas, portfolio_returns.quantile(alphas)))
     percentiles = [alpha * 100 for alpha in alphas]
     VaRs = np.percentile(portfolio_returns, percentiles)
     return dict(zip(alphas, VaRs))
 
 # CVaR (Monte Carlo) - single alpha
 def calculate_mcCVaR(
-    portfolio_returns: pd.Series,
+    portfolio_returns: Union[pd.Series, QuantileDigest],
     alpha: float = 0.05,
     VaR: Optional[Union[float, int]] = None,
+    sample_weights: Optional[np.ndarray] = None,
 ) -> float:
+    if isinstance(portfolio_returns, QuantileDigest):
+        # Mean of the returns <= the digest's VaR at alpha
+        return portfolio_returns.tail_mean(alpha)
     if not isinstance(VaR, (float, int)):
-        VaR = calculate_mcVaR(portfolio_returns, alpha)
+        VaR = calculate_mcVaR(portfolio_returns, alpha, sample_weights)
+    if sample_weights is not None:
+        in_tail = np.asarray(portfolio_returns) <= VaR
+        return np.average(np.asarray(portfolio_returns)[in_tail], weights=np.asarray(sample_weights)[in_tail])
     return portfolio_returns[portfolio_returns <= VaR].mean()
 
 # CVaR (Monte Carlo) - many alphas
 def calculate_mcCVaR_for_each_alpha(
-    portfolio_returns: pd.Series,
+    portfolio_returns: Union[pd.Series, QuantileDigest],
     alphas: Union[List[float], float] = 0.05,
     VaR_series: Optional[Union[dict, pd.Series]] = None,
 ) -> Dict[float, float]:
@@ -61,7 +84,138 @@ def calculate_mcCVaR_for_each_alpha(
             return {alpha: calculate_mcCVaR(portfolio_returns, alpha, VaR=dict(VaR_series)[alpha]) for alpha in alphas}
         except KeyError:
             raise ValueError(f"Values of alphas in VaR_series parameter ({list(dict(VaR_series).keys())}) must correspond exactly with those of parameter 'alphas ' ({alphas})")
-    return {alpha: calculate_mcCVaR(portfolio_returns, alpha) for alpha in alphas}
+    return calculate_mcVaR_and_mcCVaR_for_each_alpha(portfolio_returns, alphas)["CVaR"].to_dict()
+
+# VaR & CVaR (Monte Carlo) - many alphas, in a single pass over the returns
+def calculate_mcVaR_and_mcCVaR_for_each_alpha(
+    portfolio_returns: Union[pd.Series, np.ndarray, QuantileDigest],
+    alphas: Union[List[float], float] = 0.05,
+    sample_weights: Optional[np.ndarray] = None,
+    n_batches: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Calculates VaR (as np.percentile, linear interpolation) & CVaR (mean of the returns <= VaR) for
+    every alpha from one partition of the returns at the largest alpha's cutoff: only that tail is sorted,
+    and each CVaR is a prefix sum of it. Weighted returns (importance sampling) use the weighted inverted
+    CDF instead, each return's probability mass being its weight over the number of returns.
+
+    Parameters:
+    - portfolio_returns: Simulated returns, or a QuantileDigest of them.
+    - alphas: Risk thresholds.
+    - sample_weights: Likelihood ratio of each return, if importance sampled.
+    - n_batches: Number of batches (consecutive pairs of returns dealt to each in turn, as by
+      BatchedQuantileDigest) for batch-means standard errors of the estimates.
+
+    Returns:
+    - DataFrame indexed by alpha, with VaR & CVaR columns, and VaR SE & CVaR SE columns if the returns
+      are batched (a BatchedQuantileDigest, or `n_batches` given).
+    """
+    alphas = establish_alphas(alphas)
+    index = pd.Index(alphas, name="alpha")
+    if isinstance(portfolio_returns, QuantileDigest):
+        result = pd.DataFrame(
+            {"VaR": portfolio_returns.quantile(alphas), "CVaR": portfolio_returns.tail_mean(alphas)}, index=index
+        )
+        if isinstance(portfolio_returns, BatchedQuantileDigest):
+            result["VaR SE"] = portfolio_returns.quantile_se(alphas)
+            result["CVaR SE"] = portfolio_returns.tail_mean_se(alphas)
+        return result
+    returns = np.asarray(portfolio_returns, dtype=np.float64)
+    if n_batches is not None:
+        # Batch means: spread of the estimates of each batch, over the square root of the number of batches
+        batch_ids = (np.arange(len(returns)) // 2) % n_batches
+        batches = [
+            calculate_mcVaR_and_mcCVaR_for_each_alpha(
+                returns[batch_ids == i], alphas, None if sample_weights is None else sample_weights[batch_ids == i]
+            )
+            for i in range(n_batches)
+        ]
+        result = calculate_mcVaR_and_mcCVaR_for_each_alpha(returns, alphas, sample_weights)
+        result["VaR SE"] = np.std([batch["VaR"] for batch in batches], axis=0, ddof=1) / np.sqrt(n_batches)
+        result["CVaR SE"] = np.std([batch["CVaR"] for batch in batches], axis=0, ddof=1) / np.sqrt(n_batches)
+        return result
+    if sample_weights is not None:
+        return _weighted_mcVaR_and_mcCVaR(returns, np.asarray(sample_weights, dtype=np.float64), alphas, index)
+    n = len(returns)
+
+    # (1) Ranks of each VaR between the sorted returns, as np.percentile
+    ranks = np.asarray(alphas) * (n - 1)
+    lower = np.floor(ranks).astype(int)
+    upper = np.minimum(lower + 1, n - 1)
+
+    # (2) Sorted tail up to the largest rank needed
+    cutoff = upper.max()
+    partitioned = np.partition(returns, cutoff)
+    tail = np.sort(partitioned[:cutoff + 1])
+
+    # (3) VaR by linear interpolation (same operations as np.percentile, so results are identical)
+    t = ranks - lower
+    diff = tail[upper] - tail[lower]
+    VaRs = np.where(t >= 0.5, tail[upper] - diff * (1 - t), tail[lower] + diff * t)
+
+    # (4) CVaR from prefix sums of the tail; returns tied with the tail's largest value may lie past the cutoff
+    prefix_sums = np.cumsum(tail)
+    counts = np.searchsorted(tail, VaRs, side="right")
+    sums = prefix_sums[counts - 1]
+    at_cutoff = VaRs == tail[-1]
+    if at_cutoff.any():
+        ties = np.count_nonzero(partitioned[cutoff + 1:] == tail[-1])
+        counts = counts + at_cutoff * ties
+        sums = sums + at_cutoff * ties * tail[-1]
+    CVaRs = sums / counts
+
+    return pd.DataFrame({"VaR": VaRs, "CVaR": CVaRs}, index=index)
+
+def _weighted_mcVaR_and_mcCVaR(
+    returns: np.ndarray,
+    sample_weights: np.ndarray,
+    alphas: List[float],
+    index: Optional[pd.Index] = None,
+) -> pd.DataFrame:
+    # (1) VaR: smallest return whose cumulative sample weight reaches alpha * n (weighted inverted CDF)
+    order = np.argsort(returns, kind="stable")
+    returns, weights = returns[order], sample_weights[order]
+    cum_weights = np.cumsum(weights)
+    i = np.minimum(np.searchsorted(cum_weights, np.asarray(alphas) * len(returns), side="left"), len(returns) - 1)
+    VaRs = returns[i]
+    # (2) CVaR: weighted mean of the returns <= VaR (including returns tied with it)
+    last = np.searchsorted(returns, VaRs, side="right") - 1
+    CVaRs = np.cumsum(returns * weights)[last] / cum_weights[last]
+    return pd.DataFrame({"VaR": VaRs, "CVaR": CVaRs}, index=index)
+
+def split_mcVaR_and_mcCVaR(
+    VaR_and_CVaR: pd.DataFrame,
+) -> Tuple[pd.Series, pd.Series]:
+    return VaR_and_CVaR["VaR"], VaR_and_CVaR["CVaR"]
+
+# Convergence of VaR & CVaR (Monte Carlo) - many alphas, with the number of simulations they used
+def calculate_simulation_convergence(
+    portfolio_returns: BatchedQuantileDigest,
+    alphas: Union[List[float], float] = 0.05,
+    rel_tol: float = 0.01,
+    confidence: float = 0.95,
+    min_scale: float = 0.0,  # fraction of the initial investment
+    initial_investment: float = 10000,
+) -> pd.DataFrame:
+    alphas = establish_alphas(alphas)
+    table = calculate_confidence_intervals(portfolio_returns, alphas, confidence, min_scale * initial_investment)
+    table["Converged"] = table["Relative Error"] <= rel_tol
+    table["Simulations"] = portfolio_returns.count
+    return table
+
+# Path-dependent risk (Monte Carlo) - many alphas
+def calculate_path_risk_for_each_alpha(
+    path_risk: PathRiskAccumulator,
+    alphas: Union[List[float], float] = 0.05,
+) -> pd.DataFrame:
+    alphas = establish_alphas(alphas)
+    return path_risk.metrics_for_each_alpha(alphas)
+
+# Probability of breaching each loss barrier at any point of the timeframe (Monte Carlo)
+def calculate_loss_barrier_breach_probabilities(
+    path_risk: PathRiskAccumulator,
+) -> pd.Series:
+    return path_risk.breach_probabilities()
 
 # def plot_mcVaR_and_mcCVaR(
 #     *,
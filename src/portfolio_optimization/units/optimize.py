@@ -1,37 +1,150 @@
-from typing import Dict, Union, Callable, Any, Optional
+from typing import Dict, Union, Callable, Any, Optional, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+import logging
+import time
 import pandas as pd
 import numpy as np
 from numpy.typing import ArrayLike
 import scipy.optimize as sco
+import scipy.linalg as sla
 
 from portfolio_optimization.datasets.portfolio_set import PortfolioSet
-from portfolio_optimization.utils.data_utils import get_stock_returns
-from portfolio_optimization.utils.financial_utils import get_num_trading_periods
+from portfolio_optimization.utils.covariance_utils import CovarianceModel
+from portfolio_optimization.utils.moments_utils import estimate_covariance_model
 from portfolio_optimization.utils.formatting_utils import str2list
 from portfolio_optimization.consts import RISK_FREE_RATE
 
 
+GRADIENT_FREE_SOLVERS = ["COBYLA", "Nelder-Mead", "Powell"]  # solvers that do not accept 'jac'
+HESSIAN_SOLVERS = ["trust-constr"]  # constrained solvers that accept 'hess'
+FRONTIER_GRIDS = ["target_return", "risk_aversion"]
+FRONTIER_SOLVER = "Frontier"  # solver label of efficient frontier portfolios
+QP_SOLVER = "QP"  # interior-point quadratic programming backend (see solve_qp)
+
+Moments = Tuple[pd.Index, np.ndarray, np.ndarray]  # (symbols, annualized mean, annualized covariance)
+
+logger = logging.getLogger(__name__)
+
 def optimize_weights(
     stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
     params: Dict[str, Any],
-) -> pd.DataFrame:
+    covariance_model: Optional[CovarianceModel] = None,
+) -> PortfolioSet:
     portfolio_set = PortfolioSet()
     solvers = str2list(params["optimize"]["solvers"])
     agg = params["optimize"]["optimize_on"]
     period = params["data"]["stocks"]["period"]
     subtract_risk_free =  params["optimize"].get("subtract_risk_free", True)
-    for solver in solvers:
-        opt_results = optimize_scipy(
+    n_workers = params["optimize"].get("n_workers", 1)
+    solver_kwargs = dict(
+        agg=agg,
+        period=period,
+        subtract_risk_free=subtract_risk_free,
+        use_hessian=params["optimize"].get("use_hessian", False),
+        record_every=params["optimize"].get("record_every", 1),
+    )
+
+    # Returns & moments are computed once and shared read-only by every solver
+    covariance_params = params.get("covariance") or {}
+    moments = get_annualized_moments(
+        stocks_data,
+        agg,
+        period,
+        estimator=covariance_params.get("estimator", "sample"),
+        n_factors=covariance_params.get("n_factors", 3),
+        covariance_model=covariance_model,
+    )
+    multi_start_params = params["optimize"].get("multi_start") or {}
+    if multi_start_params.get("enabled", False):
+        # Workers solve starting points instead of solvers (worker processes cannot start pools of their own)
+        multi_start = dict(
+            n_starts=multi_start_params.get("n_starts", 20),
+            patience=multi_start_params.get("patience", 5),
+            seed=multi_start_params.get("seed"),
+            n_workers=n_workers,
+        )
+        solver_sets = [_run_optimizer(solver, solver_kwargs, moments, multi_start) for solver in solvers]
+    elif n_workers > 1 and len(solvers) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(solvers)),
+            initializer=_init_optimize_worker,
+            initargs=(moments,),
+        ) as executor:
+            solver_sets = list(executor.map(_run_optimizer, solvers, repeat(solver_kwargs)))
+    else:
+        solver_sets = [_run_optimizer(solver, solver_kwargs, moments) for solver in solvers]
+    for solver_set in solver_sets:
+        portfolio_set.extend(solver_set)
+    frontier_params = params["optimize"].get("frontier") or {}
+    if frontier_params.get("enabled", False):
+        optimize_frontier(
             stocks_data,
             portfolio_set,
             agg=agg,
             period=period,
-            solver=solver,
+            n_points=frontier_params.get("n_points", 25),
+            grid=frontier_params.get("grid", "target_return"),
+            solver=frontier_params.get("solver", "SLSQP"),
             subtract_risk_free=subtract_risk_free,
+            moments=moments,
         )
-    return portfolio_set.portfolios
-    
-            
+    return portfolio_set
+
+def get_annualized_moments(
+    stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
+    agg: str = "Close",
+    period: str = "daily",
+    estimator: str = "sample",
+    n_factors: int = 3,
+    covariance_model: Optional[CovarianceModel] = None,  # estimated once per run (estimator is then ignored)
+) -> Moments:
+    if covariance_model is None:
+        covariance_model = estimate_covariance_model(stocks_data, agg, estimator, n_factors)
+    mean_annualized, cov_annualized = covariance_model.annualized(period)
+    return covariance_model.symbols, mean_annualized, cov_annualized
+
+_worker_moments: Optional[Moments] = None  # moments shared with each optimize worker process
+
+def _init_optimize_worker(moments: Moments) -> None:
+    global _worker_moments
+    _worker_moments = moments
+
+def _run_optimizer(
+    solver: str,
+    solver_kwargs: Dict[str, Any],
+    moments: Optional[Moments] = None,
+    multi_start: Optional[Dict[str, Any]] = None,  # optimize_multi_start parameters (scipy solvers only)
+) -> PortfolioSet:
+    # Runs one solver into its own portfolio set (module-level so that it can run in worker processes)
+    solver_set = PortfolioSet()
+    start = time.perf_counter()
+    optimizer = get_optimizer(solver)
+    if multi_start is not None and optimizer is optimize_scipy:
+        optimizer = partial(optimize_multi_start, **multi_start)
+    optimizer(
+        None,
+        solver_set,
+        solver=solver,
+        moments=moments or _worker_moments,
+        **solver_kwargs,
+    )
+    solver_set.timings[solver] = time.perf_counter() - start
+    if len(solver_set):
+        logger.info(
+            f"{solver}: Sharpe Ratio {solver_set.get_metric('Sharpe Ratio').max():.4f} "
+            f"in {solver_set.timings[solver]:.2f}s"
+        )
+    else:
+        # The other solvers' portfolios are still kept
+        logger.warning(f"{solver}: No portfolio recorded in {solver_set.timings[solver]:.2f}s")
+    return solver_set
+
+def get_optimizer(solver: str) -> Callable[..., sco.OptimizeResult]:
+    # Solvers with a dedicated backend; any other solver name is passed to scipy.optimize.minimize
+    return OPTIMIZER_BACKENDS.get(solver, optimize_scipy)
+
 def optimize_scipy(
     stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
     portfolio_set: PortfolioSet,
@@ -39,79 +152,500 @@ def optimize_scipy(
     agg: str = "Close",
     period: str = "daily",
     solver: str = "SLSQP",  # default: Sequential Least Squares Programming (SLSQP)
-    subtract_risk_free: bool = True
-) -> pd.DataFrame:
-        
-    # (1) Concat Partitions of Returns Data    
-    returns = get_stock_returns(stocks_data, agg)
-    symbols = returns.columns
-    
-    mean_annualized = returns.mean() * get_num_trading_periods(period)
-    cov_annualized = returns.cov() * get_num_trading_periods(period)
-    
-    # (2) Write Negate Function (scipy only has optimize.minimize, not optimize.maximize)
+    subtract_risk_free: bool = True,
+    use_hessian: bool = False,
+    record_every: Optional[int] = 1,  # keep every n-th iterate in the portfolio set (None: final solution only)
+    moments: Optional[Moments] = None,  # (symbols, annualized mean, annualized covariance)
+    init_guess: Optional[ArrayLike] = None,  # starting weights (default: equal distribution)
+) -> sco.OptimizeResult:
+
+    # (1) Concat Partitions of Returns Data (unless the moments were computed already)
+    symbols, mean_annualized, cov_annualized = moments or get_annualized_moments(stocks_data, agg, period)
+    risk_free_rate = RISK_FREE_RATE if subtract_risk_free else 0
+
+    # (2) Write Negate Function (scipy only has optimize.minimize, not optimize.maximize), recording iterates
+    trace = portfolio_set.new_trace(solver=solver, symbols=symbols, record_every=record_every)
+
     def _neg_sharpe(weights):
-        return get_ret_vol_sr(
-            portfolio_set=portfolio_set,
-            symbols=symbols,
-            weights=weights,
-            mean_annualized=mean_annualized,
-            cov_annualized=cov_annualized,
-            solver=solver,
-            subtract_risk_free=subtract_risk_free
-        )[2] * -1
-        
-    # (3) Establish Constraint(s): weights must add to 1 (by convention of sco.minimize, condition functions should return zero)
-    constraints = ({'type':'eq','fun': lambda weights: np.sum(weights) - 1})
+        ret, vol, sharpe_ratio = get_ret_vol_sr(weights, mean_annualized, cov_annualized, risk_free_rate)
+        trace.record(weights, ret, vol, sharpe_ratio)
+        return -sharpe_ratio
+
+    # ...and its closed-form derivatives, so gradient-based solvers skip finite differences
+    def _neg_sharpe_grad(weights):
+        return get_neg_sharpe_ratio_grad(weights, mean_annualized, cov_annualized, risk_free_rate)
+
+    def _neg_sharpe_hess(weights):
+        return get_neg_sharpe_ratio_hess(weights, mean_annualized, cov_annualized, risk_free_rate)
+
+    # (3) Establish Constraint(s): weights must add to 1 (linear, so solvers get its exact jacobian & zero hessian)
+    constraints = sco.LinearConstraint(np.ones(len(symbols)), lb=1, ub=1)
 
     # (4) Establish Bound(s): each weights must be btw. 0 and 1 (by convention of sco.minimize, bounds should be iterable of tuples)
-    bounds = ((0, 1) for _ in returns.columns)
+    bounds = tuple((0, 1) for _ in symbols)
 
     # (5) Generate Initial Guess: equal distribution
-    init_guess = [1 / len(returns.columns) for _ in returns.columns]
+    if init_guess is None:
+        init_guess = [1 / len(symbols) for _ in symbols]
 
     # (6) Optimize & Save Each Portfolio!
+    derivatives = {}
+    if solver not in GRADIENT_FREE_SOLVERS:
+        derivatives["jac"] = _neg_sharpe_grad
+    if use_hessian and solver in HESSIAN_SOLVERS:
+        derivatives["hess"] = _neg_sharpe_hess
     opt_results = sco.minimize(
         _neg_sharpe,
         init_guess,
         method=solver,
         bounds=bounds,
-        constraints=constraints
+        constraints=constraints,
+        **derivatives
     )
-    
+    # Always keep the solution itself, whichever iterates were sampled
+    trace.record(opt_results.x, *get_ret_vol_sr(opt_results.x, mean_annualized, cov_annualized, risk_free_rate), force=True)
+
     return opt_results
 
+def optimize_multi_start(
+    stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
+    portfolio_set: PortfolioSet,
+    *,
+    agg: str = "Close",
+    period: str = "daily",
+    solver: str = "SLSQP",
+    subtract_risk_free: bool = True,
+    moments: Optional[Moments] = None,
+    n_starts: int = 20,
+    patience: Optional[int] = 5,
+    seed: Optional[int] = None,
+    n_workers: int = 1,
+    tol: float = 1e-3,
+    **kwargs,
+) -> sco.OptimizeResult:
+    """
+    Solves the Sharpe maximization from several starting points and keeps every distinct local optimum.
 
-def get_ret_vol_sr(
+    Parameters:
+    - n_starts: Maximum number of starting points: the equal-weight portfolio, then Dirichlet draws.
+    - patience: Stop once the best solution has not improved for this many consecutive starts (None: never).
+    - seed: Seed of the starting points.
+    - n_workers: Processes solving starting points concurrently (in batches of n_workers starts).
+    - tol: Converged weights closer than this (max abs difference) count as the same solution.
+    - kwargs: Passed to optimize_scipy (use_hessian, ...).
+
+    Returns:
+    - The best solution found (starts whose solve failed are skipped; if all of them failed, the last
+      failed result).
+    """
+    if n_starts < 1:
+        raise ValueError(f"{n_starts}: Value of 'n_starts' parameter must be a positive integer")
+    moments = moments or get_annualized_moments(stocks_data, agg, period)
+    symbols, mean_annualized, cov_annualized = moments
+    risk_free_rate = RISK_FREE_RATE if subtract_risk_free else 0
+
+    # (1) Sample Starting Points: uniformly over the simplex, after the usual equal-weight guess
+    rng = np.random.default_rng(seed)
+    starts = np.vstack([np.full(len(symbols), 1 / len(symbols)), rng.dirichlet(np.ones(len(symbols)), size=n_starts - 1)])
+
+    # (2) Solve in Batches, keeping distinct converged solutions & stopping early once the best stalls
+    kwargs.pop("record_every", None)  # only solutions are kept, not iterates
+    start_kwargs = dict(agg=agg, period=period, subtract_risk_free=subtract_risk_free, **kwargs)
+    solutions, best, n_stalled, failed = [], None, 0, []
+    executor = None
+    if n_workers > 1 and n_starts > 1:
+        executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_optimize_worker, initargs=(moments,))
+    try:
+        batch_size = n_workers if executor is not None else 1
+        for batch_start in range(0, n_starts, batch_size):
+            batch = starts[batch_start:batch_start + batch_size]
+            if executor is not None:
+                results = list(executor.map(_solve_start, repeat(solver), batch, repeat(start_kwargs)))
+            else:
+                results = [_solve_start(solver, init_guess, start_kwargs, moments) for init_guess in batch]
+            for opt_results in results:
+                if not opt_results.success:
+                    failed.append(opt_results)
+                    continue
+                if not any(np.abs(opt_results.x - x).max() < tol for x in solutions):
+                    solutions.append(opt_results.x)
+                if best is None or opt_results.fun < best.fun - 1e-9:
+                    best, n_stalled = opt_results, 0
+                else:
+                    n_stalled += 1
+            if patience is not None and n_stalled >= patience:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    logger.info(
+        f"{solver}: {len(solutions)} distinct solution(s) from {min(batch_start + batch_size, n_starts)} starting point(s)"
+    )
+    if failed:
+        logger.warning(
+            f"{solver}: Dropped {len(failed)} starting point(s) whose solve failed "
+            f"({sorted({str(opt_results.message) for opt_results in failed})})"
+        )
+    if best is None:
+        # Nothing to save: the caller gets an empty portfolio set & the last (unsuccessful) result
+        logger.warning(f"{solver}: Every starting point failed, no portfolio saved")
+        return failed[-1]
+
+    # (3) Save Each Distinct Solution
+    metrics = np.array([get_ret_vol_sr(x, mean_annualized, cov_annualized, risk_free_rate) for x in solutions])
+    portfolio_set.add_portfolios(
+        solver=solver,
+        rets=metrics[:, 0],
+        vols=metrics[:, 1],
+        sharpe_ratios=metrics[:, 2],
+        weights=np.array(solutions),
+        symbols=symbols,
+    )
+    return best
+
+def _solve_start(
+    solver: str,
+    init_guess: np.ndarray,
+    start_kwargs: Dict[str, Any],
+    moments: Optional[Moments] = None,
+) -> sco.OptimizeResult:
+    return optimize_scipy(
+        None,
+        PortfolioSet(),
+        solver=solver,
+        record_every=None,
+        moments=moments or _worker_moments,
+        init_guess=init_guess,
+        **start_kwargs,
+    )
+
+
+def optimize_frontier(
+    stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
+    portfolio_set: PortfolioSet,
+    *,
+    agg: str = "Close",
+    period: str = "daily",
+    n_points: int = 25,
+    grid: str = "target_return",
+    solver: str = "SLSQP",  # "SLSQP" or "QP"
+    subtract_risk_free: bool = True,
+    moments: Optional[Moments] = None,
+) -> List[sco.OptimizeResult]:
+    """
+    Traces the long-only efficient frontier and adds its portfolios to the portfolio set.
+
+    Parameters:
+    - n_points: Number of frontier portfolios.
+    - grid: "target_return" (minimize variance for evenly spaced target returns, from the minimum
+            variance portfolio up to the best single asset) or "risk_aversion" (maximize
+            mu·w - λ wᵀΣw over log-spaced risk aversions λ).
+
+    With SLSQP, each solve is warm-started from the previous frontier point, so neighbouring solves
+    only need a few iterations. With QP, each point is solved by the interior-point solver, which
+    scales to thousands of assets. Points whose solve fails are dropped (with a warning), and if every
+    stock has the same expected return the frontier is the minimum variance portfolio alone.
+
+    Returns:
+    - The solutions of the frontier portfolios added to the portfolio set, by increasing return.
+    """
+    if grid not in FRONTIER_GRIDS:
+        raise ValueError(f"{grid}: Invalid value for 'grid' parameter; choose from {FRONTIER_GRIDS}")
+
+    # (1) Concat Partitions of Returns Data (unless the moments were computed already)
+    symbols, mean_annualized, cov_annualized = moments or get_annualized_moments(stocks_data, agg, period)
+    risk_free_rate = RISK_FREE_RATE if subtract_risk_free else 0
+    trace = portfolio_set.new_trace(solver=FRONTIER_SOLVER, symbols=symbols, record_every=None)
+
+    # (2) Establish Constraint(s) & Bound(s), as in optimize_scipy
+    sum_to_one = sco.LinearConstraint(np.ones(len(symbols)), lb=1, ub=1)
+    bounds = tuple((0, 1) for _ in symbols)
+
+    def _solve(objective, jac, x0, constraints):
+        if solver == QP_SOLVER:
+            # Both objectives are quadratic: ½xᵀ(2Σ)x + cᵀx, with c recovered as the gradient at zero
+            return solve_qp(
+                2 * cov_annualized,
+                jac(np.zeros(len(symbols))),
+                A_eq=np.vstack([constraint.A for constraint in constraints]),
+                b_eq=np.concatenate([np.atleast_1d(constraint.lb) for constraint in constraints]),
+            )
+        return sco.minimize(objective, x0, jac=jac, method=solver, bounds=bounds, constraints=constraints)
+
+    def _variance(weights):
+        return np.dot(weights, np.dot(cov_annualized, weights))
+
+    def _variance_grad(weights):
+        return 2 * np.dot(cov_annualized, weights)
+
+    # (3) Sweep the grid from the minimum variance portfolio, warm-starting each solve from the last solution
+    init_guess = np.full(len(symbols), 1 / len(symbols))
+    min_variance = _solve(_variance, _variance_grad, init_guess, [sum_to_one])
+    if not min_variance.success:
+        # Every frontier point is anchored on it, so there is no frontier to trace
+        logger.warning(f"{FRONTIER_SOLVER}: Skipped, the minimum variance {solver} solve failed ({min_variance.message})")
+        return []
+    x0 = min_variance.x
+    opt_results, failed = [], []
+    if np.ptp(mean_annualized) == 0:
+        # Every portfolio has the same return (e.g. a single stock), so only the minimum variance one is efficient
+        opt_results.append(min_variance)
+    elif grid == "target_return":
+        targets = np.linspace(np.dot(mean_annualized, min_variance.x), mean_annualized.max(), n_points)
+        for target in targets:
+            on_target = sco.LinearConstraint(mean_annualized, lb=target, ub=target)
+            opt_result = _solve(_variance, _variance_grad, x0, [sum_to_one, on_target])
+            (opt_results if opt_result.success else failed).append(opt_result)
+            x0 = opt_results[-1].x if opt_results else x0
+    else:
+        # Minimize wᵀΣw - mu·w / λ, with 1/λ log-spaced around the scale at which both terms are comparable
+        risk_tolerance_scale = np.mean(np.diag(cov_annualized)) / np.ptp(mean_annualized)
+        for risk_tolerance in risk_tolerance_scale * np.logspace(-3, 2, n_points):
+            opt_result = _solve(
+                lambda weights: _variance(weights) - risk_tolerance * np.dot(mean_annualized, weights),
+                lambda weights: _variance_grad(weights) - risk_tolerance * mean_annualized,
+                x0,
+                [sum_to_one],
+            )
+            (opt_results if opt_result.success else failed).append(opt_result)
+            x0 = opt_results[-1].x if opt_results else x0
+    if failed:
+        logger.warning(
+            f"{FRONTIER_SOLVER}: Dropped {len(failed)} of {len(failed) + len(opt_results)} frontier point(s) whose "
+            f"{solver} solve failed ({sorted({str(opt_result.message) for opt_result in failed})})"
+        )
+
+    # (4) Save Each Frontier Portfolio
+    for opt_result in opt_results:
+        weights = np.clip(opt_result.x, 0, 1)
+        trace.record(weights, *get_ret_vol_sr(weights, mean_annualized, cov_annualized, risk_free_rate), force=True)
+    return opt_results
+
+
+def optimize_qp(
+    stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
     portfolio_set: PortfolioSet,
-    symbols: ArrayLike,
+    *,
+    agg: str = "Close",
+    period: str = "daily",
+    solver: str = QP_SOLVER,
+    subtract_risk_free: bool = True,
+    moments: Optional[Moments] = None,
+    **kwargs,  # options of optimize_scipy that do not apply to the QP backend
+) -> sco.OptimizeResult:
+    """
+    Maximizes the Sharpe Ratio as a convex QP (Cornuejols & Tütüncü): minimize yᵀΣy subject to
+    (mu - rf)·y = 1 and y >= 0, then normalize w = y / sum(y), which also satisfies 0 <= w <= 1.
+    If the solve fails (e.g. iteration limit), a warning is logged and no portfolio is saved.
+    """
+    # (1) Concat Partitions of Returns Data (unless the moments were computed already)
+    symbols, mean_annualized, cov_annualized = moments or get_annualized_moments(stocks_data, agg, period)
+    risk_free_rate = RISK_FREE_RATE if subtract_risk_free else 0
+    excess_returns = mean_annualized - risk_free_rate
+    if not np.any(excess_returns > 0):
+        raise ValueError(
+            f"{solver}: No stock has an expected return above the risk free rate ({risk_free_rate}), so the "
+            "Sharpe Ratio cannot be maximized as a QP; use a scipy solver (e.g. SLSQP) instead"
+        )
+
+    # (2) Solve the QP in the scaled variables y
+    opt_results = solve_qp(
+        2 * cov_annualized,
+        np.zeros(len(symbols)),
+        A_eq=excess_returns[np.newaxis, :],
+        b_eq=np.ones(1),
+        ub=np.inf,
+    )
+    if not opt_results.success:
+        # A failed solve is not a solution, so nothing is saved
+        logger.warning(f"{solver}: Portfolio not saved, the QP solve failed ({opt_results.message})")
+        return opt_results
+    opt_results.x = opt_results.x / np.sum(opt_results.x)
+    ret, vol, sharpe_ratio = get_ret_vol_sr(opt_results.x, mean_annualized, cov_annualized, risk_free_rate)
+    opt_results.fun = -sharpe_ratio
+
+    # (3) Save the Portfolio
+    trace = portfolio_set.new_trace(solver=solver, symbols=symbols, record_every=None)
+    trace.record(opt_results.x, ret, vol, sharpe_ratio, force=True)
+    return opt_results
+
+def solve_qp(
+    Q: np.ndarray,
+    c: np.ndarray,
+    A_eq: np.ndarray,
+    b_eq: np.ndarray,
+    lb: Union[float, ArrayLike] = 0,
+    ub: Union[float, ArrayLike] = 1,
+    tol: float = 1e-9,
+    max_iter: int = 100,
+) -> sco.OptimizeResult:
+    """
+    Solves the convex quadratic program
+
+        minimize ½xᵀQx + cᵀx  subject to  A_eq x = b_eq,  lb <= x <= ub
+
+    with a Mehrotra predictor-corrector primal-dual interior-point method. Each iteration factors
+    the n x n matrix Q + D (D diagonal, from the bound barriers) once and solves the few equality
+    constraints through their m x m Schur complement, so the cost is one Cholesky per iteration and
+    the iteration count barely grows with the number of assets.
+
+    Parameters:
+    - Q: Positive semi-definite (n, n) matrix.
+    - c: Linear term, shape (n,).
+    - A_eq, b_eq: Equality constraints, shapes (m, n) and (m,).
+    - lb, ub: Bounds (ub may be np.inf).
+    - tol: Tolerance on the relative primal & dual residuals and on the duality measure.
+    - max_iter: Maximum number of interior-point iterations.
+
+    Returns:
+    - scipy OptimizeResult with fields x, fun, nit, success and message.
+    """
+    n = len(c)
+    A = np.atleast_2d(A_eq)
+    b = np.atleast_1d(b_eq).astype(float)
+    lb = np.broadcast_to(np.asarray(lb, dtype=float), (n,))
+    ub = np.broadcast_to(np.asarray(ub, dtype=float), (n,))
+    has_ub = np.isfinite(ub)
+    n_pairs = n + np.count_nonzero(has_ub)
+    ridge = 1e-12 * max(1.0, np.mean(np.abs(np.diag(Q))))  # keeps Q + D factorable if Q is singular
+
+    # Strictly interior (though not necessarily feasible) starting point
+    x = np.where(has_ub, (lb + np.where(has_ub, ub, 0)) / 2, lb + 1)
+    y = np.zeros(len(b))
+    z_l = np.ones(n)
+    z_u = np.where(has_ub, 1.0, 0.0)
+
+    def _max_step(v, dv):
+        neg = dv < 0
+        return min(1.0, np.min(-v[neg] / dv[neg])) if np.any(neg) else 1.0
+
+    converged = False
+    for nit in range(1, max_iter + 1):
+        s_l = x - lb
+        s_u = np.where(has_ub, ub - x, 1.0)
+        r_d = Q @ x + c - A.T @ y - z_l + z_u
+        r_p = A @ x - b
+        mu = (np.dot(s_l, z_l) + np.dot(s_u[has_ub], z_u[has_ub])) / n_pairs
+        if (
+            np.linalg.norm(r_p) <= tol * (1 + np.linalg.norm(b))
+            and np.linalg.norm(r_d) <= tol * (1 + np.linalg.norm(c))
+            and mu <= tol
+        ):
+            converged = True
+            break
+
+        # Factor the reduced KKT system once per iteration
+        H = Q + np.diag(z_l / s_l + z_u / s_u + ridge)
+        H_factor = sla.cho_factor(H)
+        H_inv_At = sla.cho_solve(H_factor, A.T)
+        schur_factor = sla.cho_factor(A @ H_inv_At)
+
+        def _newton_step(r_l, r_u):
+            rhs = -r_d + r_l / s_l - r_u / s_u
+            H_inv_rhs = sla.cho_solve(H_factor, rhs)
+            dy = sla.cho_solve(schur_factor, -r_p - A @ H_inv_rhs)
+            dx = H_inv_rhs + H_inv_At @ dy
+            dz_l = (r_l - z_l * dx) / s_l
+            dz_u = (r_u + z_u * dx) / s_u
+            return dx, dy, dz_l, dz_u
+
+        def _step_length(dx, dz_l, dz_u):
+            return min(
+                _max_step(s_l, dx),
+                _max_step(s_u[has_ub], -dx[has_ub]),
+                _max_step(z_l, dz_l),
+                _max_step(z_u[has_ub], dz_u[has_ub]),
+            )
+
+        # (1) Predictor (affine scaling) step
+        dx_a, _, dz_l_a, dz_u_a = _newton_step(-s_l * z_l, np.where(has_ub, -s_u * z_u, 0))
+        alpha_a = _step_length(dx_a, dz_l_a, dz_u_a)
+        mu_a = (
+            np.dot(s_l + alpha_a * dx_a, z_l + alpha_a * dz_l_a)
+            + np.dot((s_u - alpha_a * dx_a)[has_ub], (z_u + alpha_a * dz_u_a)[has_ub])
+        ) / n_pairs
+        sigma = (mu_a / mu) ** 3
+
+        # (2) Corrector step, centered with sigma and second-order corrected
+        r_l = sigma * mu - s_l * z_l - dx_a * dz_l_a
+        r_u = np.where(has_ub, sigma * mu - s_u * z_u + dx_a * dz_u_a, 0)
+        dx, dy, dz_l, dz_u = _newton_step(r_l, r_u)
+        alpha = min(1.0, 0.99 * _step_length(dx, dz_l, dz_u))
+        x, y, z_l, z_u = x + alpha * dx, y + alpha * dy, z_l + alpha * dz_l, z_u + alpha * dz_u
+
+    x = np.clip(x, lb, ub)
+    return sco.OptimizeResult(
+        x=x,
+        fun=0.5 * np.dot(x, Q @ x) + np.dot(c, x),
+        nit=nit,
+        success=converged,
+        message="Optimization terminated successfully" if converged else "Iteration limit reached",
+    )
+
+def get_ret_vol_sr(
     weights: ArrayLike,
     mean_annualized: ArrayLike,
     cov_annualized: ArrayLike,
-    solver: str,
-    subtract_risk_free: bool = True
+    risk_free_rate: float = 0,
 ) -> np.ndarray:
-    risk_free_rate = RISK_FREE_RATE if subtract_risk_free else 0
-    weights = np.array(weights)
-    ret = np.sum(mean_annualized * weights) - risk_free_rate
-    vol = np.sqrt(np.dot(weights.T, np.dot(cov_annualized, weights)))
+    weights = np.asarray(weights)
+    ret = np.dot(mean_annualized, weights) - risk_free_rate
+    vol = np.sqrt(np.dot(weights, np.dot(cov_annualized, weights)))
     sharpe_ratio = ret / vol
-    weights_dict = dict(zip(symbols, weights))
-    portfolio_set.add_portfolio(
-        solver=solver,
-        ret=ret,
-        vol=vol,
-        sharpe_ratio=sharpe_ratio,
-        weights=weights_dict
-    )
     return np.array([ret, vol, sharpe_ratio])
 
+def get_neg_sharpe_ratio_grad(
+    weights: ArrayLike,
+    mean_annualized: np.ndarray,
+    cov_annualized: np.ndarray,
+    risk_free_rate: float = 0,
+) -> np.ndarray:
+    """
+    Gradient of the negative Sharpe Ratio -(mu·w - rf) / sqrt(wᵀΣw) with respect to the weights.
+    """
+    weights = np.asarray(weights)
+    ret = np.dot(mean_annualized, weights) - risk_free_rate
+    cov_weights = np.dot(cov_annualized, weights)
+    vol = np.sqrt(np.dot(weights, cov_weights))
+    return -(mean_annualized / vol - ret * cov_weights / vol ** 3)
+
+def get_neg_sharpe_ratio_hess(
+    weights: ArrayLike,
+    mean_annualized: np.ndarray,
+    cov_annualized: np.ndarray,
+    risk_free_rate: float = 0,
+) -> np.ndarray:
+    """
+    Hessian of the negative Sharpe Ratio -(mu·w - rf) / sqrt(wᵀΣw) with respect to the weights.
+    """
+    weights = np.asarray(weights)
+    ret = np.dot(mean_annualized, weights) - risk_free_rate
+    cov_weights = np.dot(cov_annualized, weights)
+    vol = np.sqrt(np.dot(weights, cov_weights))
+    cross = np.outer(mean_annualized, cov_weights)
+    hess = (
+        -(cross + cross.T) / vol ** 3
+        - ret * cov_annualized / vol ** 3
+        + 3 * ret * np.outer(cov_weights, cov_weights) / vol ** 5
+    )
+    return -hess
+
+OPTIMIZER_BACKENDS: Dict[str, Callable[..., sco.OptimizeResult]] = {
+    QP_SOLVER: optimize_qp,
+}
+
 def extract_best_portfolio_weights(
     *,
-    portfolios: pd.DataFrame,
+    portfolios: Union[PortfolioSet, pd.DataFrame],
     min_weight: Optional[float] = 1e-04
 ):
-    weights_dict = portfolios.sort_values(by="Sharpe Ratio", ascending=False).iloc[0]["Weights"]
+    if not len(portfolios):
+        solvers = list(portfolios.timings) if isinstance(portfolios, PortfolioSet) else []
+        raise ValueError(f"{solvers}: No portfolio was produced by any solver")
+    if isinstance(portfolios, PortfolioSet):
+        weights_dict = portfolios.top_k("Sharpe Ratio", k=1).iloc[0]["Weights"]
+    else:
+        weights_dict = portfolios.sort_values(by="Sharpe Ratio", ascending=False).iloc[0]["Weights"]
     if isinstance(min_weight, float):
         weights_dict = {ticker: weight for ticker, weight in weights_dict.items() if weight > min_weight}
     return weights_dict
\ No newline at end of file
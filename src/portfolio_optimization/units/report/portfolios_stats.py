@@ -1,11 +1,15 @@
-from typing import Dict, Any
+from typing import Dict, Any, Union
 import pandas as pd
 
+from portfolio_optimization.datasets.portfolio_set import PortfolioSet
+
 
 def get_best_portfolio(
-    portfolios: pd.DataFrame,
+    portfolios: Union[PortfolioSet, pd.DataFrame],
     metric: str = "Sharpe Ratio"
 ) -> Dict[str, Any]:
+    if isinstance(portfolios, PortfolioSet):
+        return portfolios.top_k(metric, k=1).iloc[0].to_dict()
     return portfolios.sort_values(
         metric, ascending=False
     ).iloc[0].to_dict()
@@ -1,17 +1,18 @@
-from typing import Dict, Union, Callable, Any
+from typing import Dict, Union, Callable, Any, Optional
 import pandas as pd
 import streamlit as st
 
 from portfolio_optimization.consts import DATE_FORMAT
-from portfolio_optimization.utils.data_utils import concat_partitions, filter_stocks_df_for_agg, get_stock_returns
-from portfolio_optimization.utils.financial_utils import get_num_trading_periods
+from portfolio_optimization.utils.data_utils import get_agg_prices
+from portfolio_optimization.utils.covariance_utils import CovarianceModel
+from portfolio_optimization.utils.moments_utils import estimate_covariance_model
 
 
 def get_stock_prices_stats(
     stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
     agg: str = "Close",
 ) -> Dict[str, Any]:
-    stocks_data: pd.DataFrame = filter_stocks_df_for_agg(concat_partitions(stocks_data), agg)
+    stocks_data: pd.DataFrame = get_agg_prices(stocks_data, agg)
     start_date = stocks_data.index.min().strftime(DATE_FORMAT)
     end_date = stocks_data.index.max().strftime(DATE_FORMAT)
     if stocks_data.empty:
@@ -28,13 +29,17 @@ def get_stock_prices_corr_matrix(
     stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
     agg: str = "Close",
 ) -> pd.DataFrame:
-    stocks_data: pd.DataFrame = filter_stocks_df_for_agg(concat_partitions(stocks_data), agg)
+    stocks_data: pd.DataFrame = get_agg_prices(stocks_data, agg)
     return stocks_data.corr()
 
 def get_stock_returns_cov_matrix(
     stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
     agg: str = "Close",
-    period: str = "daily"
+    period: str = "daily",
+    estimator: str = "sample",
+    n_factors: int = 3,
+    covariance_model: Optional[CovarianceModel] = None,
 ) -> pd.DataFrame:
-    returns = get_stock_returns(stocks_data, agg)
-    return returns.cov() * get_num_trading_periods(period)
\ No newline at end of file
+    if covariance_model is None:
+        covariance_model = estimate_covariance_model(stocks_data, agg, estimator, n_factors)
+    return covariance_model.to_frame(period)
\ No newline at end of file
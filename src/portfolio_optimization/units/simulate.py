@@ -1,63 +1,530 @@
-from typing import Any, Dict, Callable
+from typing import Any, Dict, Callable, Optional, Union, Iterator, List, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import logging
+import time
 import numpy as np
 import pandas as pd
 
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.datasets.simulations_dataset import PortfolioSimulations
 from portfolio_optimization.utils.data_utils import callable2obj
+from portfolio_optimization.utils.convergence_utils import AdaptiveStopping
+from portfolio_optimization.utils.covariance_utils import CovarianceModel, estimate_covariance
+from portfolio_optimization.utils.path_risk_utils import PathRiskAccumulator
+from portfolio_optimization.utils.quantile_utils import BatchedQuantileDigest
+from portfolio_optimization.utils.simulation_utils import (
+    RETURN_GENERATORS,
+    ReturnGenerator,
+    GaussianReturnGenerator,
+    StudentTReturnGenerator,
+    BlockBootstrapReturnGenerator,
+    FilteredHistoricalReturnGenerator,
+    NormalSampler,
+)
+
+
+SIMULATION_MODES = ["asset", "portfolio", "factor"]
+
+logger = logging.getLogger(__name__)
 
 def simulate_portfolio_returns(
-    stocks_data: Dict[str, Callable[[], pd.DataFrame]],
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
     weights_dict: Dict[str, float],
     params: Dict[str, Any],
-    agg: str = "Close"
+    agg: str = "Close",
+    covariance_model: Optional[CovarianceModel] = None,
 ):
-    # Convert the weights dictionary to a numpy array
-    weights = np.array(list(weights_dict.values()))
-    
-    # Get the stock tickers
-    tickers = list(weights_dict.keys())
-
-    # Extract the adjusted close prices for the selected tickers
-    agg_data = {ticker: callable2obj(stocks_data[ticker])[agg] for ticker in tickers}
-    agg_df = pd.DataFrame(agg_data)
-    
-    # Calculate returns
-    returns = agg_df.pct_change().dropna()
-    mean_returns = returns.mean()
-    cov_matrix = returns.cov()
-    
-    # Monte Carlo parameters
-    mc_sims = params["simulate"].get("num_sims", 400)  # Number of simulations
-    T = params["simulate"].get("timeframe", 90)  # Timeframe in days
-    initial_investment = params["simulate"].get("initial_investment", 10000)
+    mc_sims = params["simulate"].get("num_sims", 400)
+    T = params["simulate"].get("timeframe", 90)
+    if params["simulate"].get("variance_reduction") == "importance":
+        # The frame has no room for the paths' likelihood ratios, without which they would be biased
+        raise ValueError(
+            "importance: Invalid value for 'variance_reduction' parameter with simulate_portfolio_returns; "
+            "use simulate_portfolio_paths, which keeps the paths' sample weights"
+        )
 
-    # Initialize matrix to hold the simulation results
-    portfolio_sims = np.full(shape=(T, mc_sims), fill_value=0.0)
-    
-    # Mean returns matrix
-    meanM = np.full(shape=(T, len(weights)), fill_value=mean_returns.values).T
-
-    # Cholesky decomposition
-    L = np.linalg.cholesky(cov_matrix)
-    
-    for m in range(mc_sims):
-        # Generate random noise
-        Z = np.random.normal(size=(T, len(weights)))
-        # Calculate daily returns with noise
-        daily_returns = meanM + np.inner(L, Z)
-        # Calculate cumulative returns
-        portfolio_sims[:, m] = np.cumprod(np.inner(weights, daily_returns.T) + 1) * initial_investment
+    chunks = iter_portfolio_simulations(stocks_data, weights_dict, params, agg, covariance_model)
+    if _get_adaptive_stopping(params) is not None:
+        # The number of simulations is only known once the adaptive simulation stops
+        portfolio_sims = np.concatenate([chunk for chunk, _ in chunks]).T
+        mc_sims = portfolio_sims.shape[1]
+    else:
+        # Initialize matrix to hold the simulation results
+        portfolio_sims = np.full(shape=(T, mc_sims), fill_value=0.0)
+        start = 0
+        for chunk, _ in chunks:
+            portfolio_sims[:, start:start + len(chunk)] = chunk.T
+            start += len(chunk)
 
     # Convert the simulation results to a DataFrame
     portfolio_sims_df = pd.DataFrame(portfolio_sims, columns=[f"Simulation {i + 1}" for i in range(mc_sims)])
-    
+
     return portfolio_sims_df
 
+def simulate_portfolio_paths(
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
+    weights_dict: Dict[str, float],
+    params: Dict[str, Any],
+    agg: str = "Close",
+    covariance_model: Optional[CovarianceModel] = None,
+) -> PortfolioSimulations:
+    # Chunks are only simulated as they are consumed (e.g. streamed to disk by SimulationsDataSet)
+    return PortfolioSimulations(
+        chunks=iter_portfolio_simulations(stocks_data, weights_dict, params, agg, covariance_model),
+        timeframe=params["simulate"].get("timeframe", 90),
+        weighted=params["simulate"].get("variance_reduction") == "importance",
+    )
+
+def simulate_portfolio_returns_digest(
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
+    weights_dict: Dict[str, float],
+    params: Dict[str, Any],
+    agg: str = "Close",
+    covariance_model: Optional[CovarianceModel] = None,
+) -> BatchedQuantileDigest:
+    """
+    Simulates the portfolio returns at the end of the timeframe into a (batched, for standard errors)
+    QuantileDigest without keeping any simulation: each chunk is summarized in the process simulating it
+    & merged as chunks complete, so memory stays constant however many simulations run. In adaptive mode,
+    chunks stop once the VaR & CVaR estimates converge (or a budget runs out).
+    """
+    chunk_args, initial_investment, n_workers = _prepare_chunks(
+        stocks_data, weights_dict, params, agg, covariance_model
+    )
+    digest_kwargs = _get_digest_kwargs(params)
+    stopping = _get_adaptive_stopping(params)
+    digest = BatchedQuantileDigest(**digest_kwargs)
+    chunk_digests = _iter_chunks(
+        partial(_digest_chunk, initial_investment=initial_investment, **digest_kwargs),
+        chunk_args,
+        n_workers,
+    )
+    start = time.perf_counter()
+    for chunk_digest in chunk_digests:
+        digest.merge(chunk_digest)
+        if stopping is not None and _check_stopping(stopping, digest, time.perf_counter() - start):
+            chunk_digests.close()
+            break
+    return digest
+
+def simulate_portfolio_path_risk(
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
+    weights_dict: Dict[str, float],
+    params: Dict[str, Any],
+    agg: str = "Close",
+    covariance_model: Optional[CovarianceModel] = None,
+) -> PathRiskAccumulator:
+    """
+    Simulates path-dependent risk statistics (drawdowns, time under water, loss barrier breaches &
+    lowest values) without keeping any simulation: each chunk's paths are reduced in the process
+    simulating them & the running statistics merged as chunks complete.
+    """
+    chunk_args, initial_investment, n_workers = _prepare_chunks(
+        stocks_data, weights_dict, params, agg, covariance_model
+    )
+    evaluate_params = params.get("evaluate") or {}
+    path_risk_kwargs = dict(
+        initial_investment=initial_investment,
+        loss_barriers=evaluate_params.get("loss_barriers", []),
+        compression=evaluate_params.get("compression", 500),
+    )
+    path_risk = PathRiskAccumulator(**path_risk_kwargs)
+    if _get_adaptive_stopping(params) is not None:
+        # Paths are reduced here as they stream from the adaptive simulation, which decides when to stop
+        for values, sample_weights in iter_portfolio_simulations(stocks_data, weights_dict, params, agg, covariance_model):
+            path_risk.update(values, sample_weights)
+        return path_risk
+    for chunk_path_risk in _iter_chunks(partial(_path_risk_chunk, **path_risk_kwargs), chunk_args, n_workers):
+        path_risk.merge(chunk_path_risk)
+    return path_risk
+
+def iter_portfolio_simulations(
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
+    weights_dict: Dict[str, float],
+    params: Dict[str, Any],
+    agg: str = "Close",
+    covariance_model: Optional[CovarianceModel] = None,
+) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    Validates the parameters & prepares the simulation, then returns an iterator over the simulated
+    portfolio values, one (chunk_size, timeframe) array per chunk of simulations, in order, each with the
+    sample weights of its paths (None unless importance sampling). In adaptive mode, chunks stop once the
+    VaR & CVaR estimates of the returns at the end of the timeframe converge (or a budget runs out).
+    """
+    chunk_args, initial_investment, n_workers = _prepare_chunks(
+        stocks_data, weights_dict, params, agg, covariance_model
+    )
+    chunks = _iter_chunks(partial(_simulate_values_chunk, initial_investment=initial_investment), chunk_args, n_workers)
+    stopping = _get_adaptive_stopping(params)
+    if stopping is None:
+        return chunks
+    return _iter_until_stopped(chunks, stopping, initial_investment, _get_digest_kwargs(params))
+
+def _iter_until_stopped(
+    chunks: Iterator[Tuple[np.ndarray, Optional[np.ndarray]]],
+    stopping: AdaptiveStopping,
+    initial_investment: float,
+    digest_kwargs: Dict[str, int],
+) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    # Chunks of simulated values until the digest of their returns at the end of the timeframe says to stop
+    digest = BatchedQuantileDigest(**digest_kwargs)
+    start = time.perf_counter()
+    try:
+        for values, sample_weights in chunks:
+            yield values, sample_weights
+            digest.update(values[:, -1] - initial_investment, sample_weights)
+            if _check_stopping(stopping, digest, time.perf_counter() - start):
+                return
+    finally:
+        chunks.close()
+
+def _check_stopping(stopping: AdaptiveStopping, digest: BatchedQuantileDigest, seconds: float) -> bool:
+    stop_reason = stopping.stop_reason(digest, seconds)
+    if stop_reason is not None:
+        logger.info(f"Adaptive simulation stopped ({stop_reason}) after {digest.count} simulations in {seconds:.2f}s")
+    return stop_reason is not None
+
+def _get_adaptive_stopping(params: Dict[str, Any]) -> Optional[AdaptiveStopping]:
+    # Stopping rule of the simulate.adaptive parameters (None unless adaptive simulation is enabled)
+    adaptive_params = params["simulate"].get("adaptive") or {}
+    if not adaptive_params.get("enabled", False):
+        return None
+    return AdaptiveStopping(
+        alphas=(params.get("evaluate") or {}).get("alphas", [0.05]),
+        rel_tol=adaptive_params.get("rel_tol", 0.01),
+        confidence=adaptive_params.get("confidence", 0.95),
+        min_sims=adaptive_params.get("min_sims", 10000),
+        max_sims=adaptive_params.get("max_sims", 1000000),
+        max_seconds=adaptive_params.get("max_seconds"),
+        min_scale=adaptive_params.get("min_scale", 0.0) * params["simulate"].get("initial_investment", 10000),
+    )
+
+def _get_digest_kwargs(params: Dict[str, Any]) -> Dict[str, int]:
+    evaluate_params = params.get("evaluate") or {}
+    return dict(
+        compression=evaluate_params.get("compression", 500),
+        n_batches=evaluate_params.get("n_batches", 10),
+    )
+
+def _prepare_chunks(
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
+    weights_dict: Dict[str, float],
+    params: Dict[str, Any],
+    agg: str = "Close",
+    covariance_model: Optional[CovarianceModel] = None,
+) -> Tuple[List[Tuple], float, int]:
+    if covariance_model is None:
+        # Calculate returns of the selected tickers & their moments
+        returns = _get_returns(stocks_data, list(weights_dict), agg)
+        covariance_params = params.get("covariance") or {}
+        covariance_model = estimate_covariance(
+            returns,
+            estimator=covariance_params.get("estimator", "sample"),
+            n_factors=covariance_params.get("n_factors", 3),
+        )
+
+    # Convert the weights dictionary to a numpy array over the model's symbols (reusing its cached factors)
+    weights = covariance_model.align_weights(weights_dict)
+    mean_returns = covariance_model.mean
+
+    # Monte Carlo parameters
+    stopping = _get_adaptive_stopping(params)
+    mc_sims = params["simulate"].get("num_sims", 400) if stopping is None else stopping.max_sims  # Number of simulations (at most, if adaptive)
+    T = params["simulate"].get("timeframe", 90)  # Timeframe in days
+    initial_investment = params["simulate"].get("initial_investment", 10000)
+    chunk_size = params["simulate"].get("chunk_size", 1000)  # Simulations drawn per vectorized batch
+    mode = params["simulate"].get("mode", "asset")  # "asset" (per-asset paths), "portfolio" (portfolio paths only) or "factor"
+    if mode not in SIMULATION_MODES:
+        raise ValueError(f"{mode}: Invalid value for 'mode' parameter; choose from {SIMULATION_MODES}")
+
+    generator = params["simulate"].get("generator", "gaussian")  # Distribution of asset mode's daily returns
+    if generator not in RETURN_GENERATORS:
+        raise ValueError(f"{generator}: Invalid value for 'generator' parameter; choose from {RETURN_GENERATORS}")
+    if generator != "gaussian" and mode != "asset":
+        raise ValueError(f"{generator}: Invalid value for 'generator' parameter in {mode} mode; choose from ['gaussian']")
+    generator_params = params["simulate"].get("generator_params") or {}
+    variance_reduction = params["simulate"].get("variance_reduction", "none")  # Sampling of the normal shocks
+    if variance_reduction != "none" and generator in ["bootstrap", "filtered_historical"]:
+        raise ValueError(
+            f"{variance_reduction}: Invalid value for 'variance_reduction' parameter with the {generator} generator; "
+            f"choose from ['none']"
+        )
+    sampler = NormalSampler(variance_reduction, shift=params["simulate"].get("importance_shift", 2.5))
+
+    seed = params["simulate"].get("seed")  # None draws fresh entropy from the OS
+    n_workers = params["simulate"].get("n_workers", 1)  # Processes simulating chunks concurrently
+
+    if mode == "asset" and generator in ["gaussian", "student_t"]:
+        # Correlated per-asset shocks via Cholesky decomposition
+        if generator == "gaussian":
+            return_generator = GaussianReturnGenerator(mean_returns, covariance_model.cholesky, sampler=sampler)
+        else:
+            return_generator = StudentTReturnGenerator(
+                mean_returns, covariance_model.cholesky, dof=generator_params.get("dof", 5), sampler=sampler
+            )
+        kernel = simulate_portfolio_generator_growth_chunk
+        kernel_kwargs = dict(
+            generator=return_generator,
+            weights=weights,
+            T=T,
+        )
+    elif mode == "asset":
+        # Historical returns of held assets, resampled as is (bootstrap) or rescaled by GARCH volatilities
+        held = weights != 0
+        returns = _get_returns(stocks_data, list(covariance_model.symbols[held]), agg).to_numpy()
+        if generator == "bootstrap":
+            return_generator = BlockBootstrapReturnGenerator(returns, block_size=generator_params.get("block_size", 10))
+        else:
+            return_generator = FilteredHistoricalReturnGenerator.fit(returns)
+        kernel = simulate_portfolio_generator_growth_chunk
+        kernel_kwargs = dict(
+            generator=return_generator,
+            weights=weights[held],
+            T=T,
+        )
+    elif mode == "factor":
+        # Per-asset shocks from k factors plus idiosyncratic noise, over held assets only: O(n·k) per day
+        loadings, specific_var = covariance_model.factors((params.get("covariance") or {}).get("n_factors", 3))
+        held = weights != 0
+        kernel = simulate_portfolio_factor_growth_chunk
+        kernel_kwargs = dict(
+            mean_returns=mean_returns[held],
+            loadings=loadings[held],
+            specific_vol=np.sqrt(specific_var[held]),
+            weights=weights[held],
+            T=T,
+            sampler=sampler,
+        )
+    else:
+        # Portfolio daily returns are univariate normal with mean w·mu and variance wᵀΣw
+        kernel = simulate_portfolio_space_growth_chunk
+        kernel_kwargs = dict(
+            portfolio_mean=float(np.dot(weights, mean_returns)),
+            portfolio_vol=float(np.sqrt(np.dot(weights, np.dot(covariance_model.cov, weights)))),
+            T=T,
+            sampler=sampler,
+        )
+
+    # Simulate in memory-bounded chunks of paths (peak memory ~ chunk_size * T * n_assets floats).
+    # Each chunk owns an independent RNG stream spawned from the seed, so results depend only on
+    # (seed, chunk_size) and are bit-identical however many workers run them. Adaptive simulations
+    # draw chunks for the whole path budget & stop early, so they are a prefix of the full simulation.
+    chunk_sizes = [min(chunk_size, mc_sims - start) for start in range(0, mc_sims, chunk_size)]
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_args = [(kernel, kernel_kwargs, n_sims, seed_seq) for n_sims, seed_seq in zip(chunk_sizes, chunk_seeds)]
+    return chunk_args, initial_investment, n_workers
+
+def _get_returns(
+    stocks_data: Union[PricePanel, Dict[str, Callable[[], pd.DataFrame]]],
+    symbols: List[str],
+    agg: str = "Close",
+) -> pd.DataFrame:
+    # Extract the adjusted close prices of the symbols
+    if isinstance(stocks_data, PricePanel):
+        agg_df = stocks_data.field(agg)[symbols]
+    else:
+        agg_df = pd.DataFrame({ticker: callable2obj(stocks_data[ticker])[agg] for ticker in symbols})
+    return agg_df.pct_change().dropna()
+
+def _iter_chunks(
+    func: Callable[..., Any],
+    chunk_args: List[Tuple],
+    n_workers: int,
+) -> Iterator[Any]:
+    # Results of func for each chunk, in order
+    if n_workers > 1 and len(chunk_args) > 1:
+        # At most 2 chunks per worker are in flight, so memory stays bounded however slow the consumer
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            pending = deque()
+            try:
+                for args in chunk_args:
+                    pending.append(executor.submit(func, *args))
+                    if len(pending) >= 2 * n_workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # Chunks not yet started are dropped if the consumer stops early (e.g. adaptive simulation)
+                for future in pending:
+                    future.cancel()
+    else:
+        for args in chunk_args:
+            yield func(*args)
+
+def _simulate_chunk(
+    kernel: Callable[..., np.ndarray],
+    kernel_kwargs: Dict[str, Any],
+    n_sims: int,
+    seed_seq: np.random.SeedSequence,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Module-level so that chunks can be pickled to worker processes
+    return kernel(**kernel_kwargs, n_sims=n_sims, rng=np.random.default_rng(seed_seq))
+
+def _simulate_values_chunk(*chunk_args, initial_investment: float) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    growth, sample_weights = _simulate_chunk(*chunk_args)
+    return growth * initial_investment, sample_weights
+
+def _digest_chunk(*chunk_args, initial_investment: float, compression: int, n_batches: int) -> BatchedQuantileDigest:
+    # Returns at the end of the timeframe, summarized in the worker so that only the digest is sent back
+    growth, sample_weights = _simulate_chunk(*chunk_args)
+    returns = growth[:, -1] * initial_investment - initial_investment
+    return BatchedQuantileDigest(compression, n_batches).update(returns, sample_weights)
+
+def _path_risk_chunk(*chunk_args, initial_investment: float, **path_risk_kwargs) -> PathRiskAccumulator:
+    growth, sample_weights = _simulate_chunk(*chunk_args)
+    return PathRiskAccumulator(initial_investment, **path_risk_kwargs).update(growth * initial_investment, sample_weights)
+
+def simulate_portfolio_generator_growth_chunk(
+    *,
+    generator: ReturnGenerator,
+    weights: np.ndarray,
+    T: int,
+    n_sims: int,
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Simulates a block of portfolio paths at once from per-asset daily returns drawn by a return generator.
+
+    Parameters:
+    - generator: Return generator of the assets (e.g. GaussianReturnGenerator).
+    - weights: Portfolio weights of the generator's assets, shape (n_assets,).
+    - T: Number of days to simulate.
+    - n_sims: Number of paths in the block.
+    - rng: Random number generator owning this block's stream.
+
+    Returns:
+    - Cumulative growth of each path (value / initial investment), shape (n_sims, T).
+    - Sample weight of each path (likelihood ratios under importance sampling), or None if unweighted.
+    """
+    # Per-asset returns for every path & day in one draw: (n_sims, T, n_assets)
+    daily_returns, sample_weights = generator.sample(n_sims, T, rng, weights)
+    # Collapse to portfolio daily returns with a single matmul against the weights: (n_sims, T)
+    portfolio_daily_returns = daily_returns @ weights
+    return np.cumprod(portfolio_daily_returns + 1, axis=1), sample_weights
+
+def simulate_portfolio_factor_growth_chunk(
+    *,
+    mean_returns: np.ndarray,
+    loadings: np.ndarray,
+    specific_vol: np.ndarray,
+    weights: np.ndarray,
+    T: int,
+    n_sims: int,
+    rng: np.random.Generator,
+    sampler: Optional[NormalSampler] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Simulates a block of portfolio paths from a factor model of asset returns (r = mu + B f + e),
+    at O(n_assets * n_factors) cost per day instead of the O(n_assets²) of a full Cholesky factor.
+
+    Parameters:
+    - mean_returns: Mean daily return of each asset, shape (n_assets,).
+    - loadings: Factor loadings B, shape (n_assets, n_factors).
+    - specific_vol: Idiosyncratic daily volatility of each asset, shape (n_assets,).
+    - weights: Portfolio weights, shape (n_assets,).
+    - T: Number of days to simulate.
+    - n_sims: Number of paths in the block.
+    - rng: Random number generator owning this block's stream.
+    - sampler: Sampler of the factor & idiosyncratic shocks (plain normal draws if None).
+
+    Returns:
+    - Cumulative growth of each path (value / initial investment), shape (n_sims, T).
+    - Sample weight of each path (likelihood ratios under importance sampling), or None if unweighted.
+    """
+    # Factor & idiosyncratic shocks in one draw, the portfolio's exposure to each being (Bᵀw, specific_vol * w)
+    n_factors = loadings.shape[1]
+    exposure = np.r_[loadings.T @ weights, specific_vol * weights]
+    shocks, sample_weights = (sampler or NormalSampler()).draw(n_sims, T, n_factors + len(weights), rng, exposure)
+    daily_returns = mean_returns + shocks[..., :n_factors] @ loadings.T + shocks[..., n_factors:] * specific_vol
+    portfolio_daily_returns = daily_returns @ weights
+    return np.cumprod(portfolio_daily_returns + 1, axis=1), sample_weights
+
+def simulate_portfolio_space_growth_chunk(
+    *,
+    portfolio_mean: float,
+    portfolio_vol: float,
+    T: int,
+    n_sims: int,
+    rng: np.random.Generator,
+    sampler: Optional[NormalSampler] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Simulates a block of portfolio paths directly in portfolio space, skipping per-asset returns.
+
+    Under the multivariate normal model the weighted daily return is itself normal, so this is
+    equivalent in distribution to asset mode's Gaussian generator at O(T) cost per path.
+
+    Parameters:
+    - portfolio_mean: Mean daily portfolio return (w·mu).
+    - portfolio_vol: Daily portfolio volatility (sqrt(wᵀΣw)).
+    - T: Number of days to simulate.
+    - n_sims: Number of paths in the block.
+    - rng: Random number generator owning this block's stream.
+    - sampler: Sampler of the portfolio shocks (plain normal draws if None).
+
+    Returns:
+    - Cumulative growth of each path (value / initial investment), shape (n_sims, T).
+    - Sample weight of each path (likelihood ratios under importance sampling), or None if unweighted.
+    """
+    shocks, sample_weights = (sampler or NormalSampler()).draw(n_sims, T, 1, rng, np.array([portfolio_vol]))
+    portfolio_daily_returns = portfolio_mean + portfolio_vol * shocks[..., 0]
+    return np.cumprod(portfolio_daily_returns + 1, axis=1), sample_weights
+
 def calculate_simulated_portfolio_returns(
-    portfolio_simulations: pd.DataFrame,
+    portfolio_simulations: Union[PortfolioSimulations, pd.DataFrame],
     initial_investment: int,
 ) -> pd.Series:
+    """
+    Returns of each simulation at the end of the timeframe. Importance sampled returns are shifted
+    towards losses, so they are resampled in proportion to their sample weights, so that their stats &
+    distribution plots describe the actual returns (VaR & CVaR use the weighted digest instead).
+    """
+    if isinstance(portfolio_simulations, PortfolioSimulations):
+        # Only the last day's column is read from the (memory-mapped) simulations
+        returns = portfolio_simulations.terminal_values() - initial_investment
+        if portfolio_simulations.weighted:
+            returns = returns[_resample(portfolio_simulations.sample_weights())]
+        return pd.Series(returns)
     return portfolio_simulations.iloc[-1] - initial_investment
 
+def _resample(sample_weights: np.ndarray) -> np.ndarray:
+    # Systematic resampling: indices of as many evenly spaced draws from the weights' cumulative distribution
+    cum_weights = np.cumsum(sample_weights)
+    positions = (np.arange(len(sample_weights)) + 0.5) * cum_weights[-1] / len(sample_weights)
+    return np.minimum(np.searchsorted(cum_weights, positions), len(sample_weights) - 1)
+
+def calculate_simulated_portfolio_returns_digest(
+    portfolio_simulations: Union[PortfolioSimulations, pd.DataFrame],
+    initial_investment: int,
+    compression: int = 500,
+    n_batches: int = 10,
+) -> BatchedQuantileDigest:
+    if isinstance(portfolio_simulations, pd.DataFrame):
+        portfolio_simulations = PortfolioSimulations.from_frame(portfolio_simulations)
+    # Streams the last day's values batch by batch (one batch per simulated chunk)
+    digest = BatchedQuantileDigest(compression, n_batches)
+    for terminal_values, sample_weights in portfolio_simulations.iter_day(
+        portfolio_simulations.timeframe - 1, with_sample_weights=True
+    ):
+        digest.update(terminal_values - initial_investment, sample_weights)
+    return digest
+
+def calculate_simulated_path_risk(
+    portfolio_simulations: Union[PortfolioSimulations, pd.DataFrame],
+    initial_investment: int,
+    loss_barriers: Optional[List[float]] = None,
+    compression: int = 500,
+) -> PathRiskAccumulator:
+    if isinstance(portfolio_simulations, pd.DataFrame):
+        portfolio_simulations = PortfolioSimulations.from_frame(portfolio_simulations)
+    # Streams the paths chunk by chunk into running statistics
+    path_risk = PathRiskAccumulator(initial_investment, loss_barriers or [], compression)
+    for values, sample_weights in portfolio_simulations.iter_chunks(with_sample_weights=True):
+        path_risk.update(values, sample_weights)
+    return path_risk
+
 def calculate_simulated_portfolio_returns_stats(
     simulated_portfolio_returns: pd.Series,
 ) -> pd.Series:
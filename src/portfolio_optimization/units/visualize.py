@@ -4,8 +4,12 @@ import plotly.graph_objects as go
 import plotly.express as px
 import plotly.figure_factory as ff
 
+from portfolio_optimization.datasets.portfolio_set import PortfolioSet
+from portfolio_optimization.datasets.simulations_dataset import PortfolioSimulations
+from portfolio_optimization.units.optimize import FRONTIER_SOLVER
 from portfolio_optimization.units.report.portfolios_stats import get_best_portfolio
-from portfolio_optimization.utils.data_utils import concat_partitions, filter_stocks_df_for_agg, get_stock_returns
+from portfolio_optimization.utils.data_utils import get_agg_prices
+from portfolio_optimization.utils.moments_utils import get_returns_moments
 from portfolio_optimization.utils.formatting_utils import str2list, format_currency_str
 
 import numpy as np
@@ -99,7 +103,7 @@ def plot_stock_prices_box_plot_dists(
     agg: str = "Close",
     show: bool = True
 ):
-    stocks_data = filter_stocks_df_for_agg(concat_partitions(stocks_data), agg)
+    stocks_data = get_agg_prices(stocks_data, agg)
     return plot_grouped_boxplot(
         stocks_data,
         columns=stocks_data.columns,
@@ -114,7 +118,7 @@ def plot_stock_returns_box_plot_dists(
     agg: str = "Close",
     show: bool = True
 ):
-    stock_returns = get_stock_returns(stocks_data, agg)
+    stock_returns = get_returns_moments(stocks_data, agg).returns
     return plot_grouped_boxplot(
         stock_returns,
         columns=stock_returns.columns,
@@ -208,7 +212,7 @@ def plot_stock_returns(
     agg: str = "Close",
 ) -> go.Figure:
     fig = go.Figure()
-    returns = get_stock_returns(stocks_data, agg)
+    returns = get_returns_moments(stocks_data, agg).returns
     for ticker in returns.columns:
         fig.add_trace(go.Scatter(
             x=returns.index,
@@ -228,7 +232,7 @@ def plot_stock_prices(
     agg: str = "Close",
 ) -> go.Figure:
     fig = go.Figure()
-    stocks_data = filter_stocks_df_for_agg(concat_partitions(stocks_data), agg)
+    stocks_data = get_agg_prices(stocks_data, agg)
     for ticker in stocks_data.columns:
         fig.add_trace(go.Scatter(
             x=stocks_data.index,
@@ -244,80 +248,85 @@ def plot_stock_prices(
     return fig
 
 def plot_portfolios(
-    portfolios: pd.DataFrame,
+    portfolios: Union[PortfolioSet, pd.DataFrame],
     sample: int = 50000,
     show: bool = False
 ) -> go.Figure:
     fig = go.Figure()
+    if isinstance(portfolios, pd.DataFrame):
+        portfolios = PortfolioSet.from_frame(portfolios)
 
     # Define a color palette
     color_palette = ['blue', 'green', 'red', 'purple', 'orange', 'yellow', 'pink', 'cyan', 'magenta', 'grey']
-    
+
     # Group portfolios by solver and find the best one in each group
-    portfolios_by_solver = {}
-    for index, row in portfolios.iterrows():
-        solver = row['Solver']
-        if solver not in portfolios_by_solver:
-            portfolios_by_solver[solver] = []
-        portfolios_by_solver[solver].append(row)
+    solvers = portfolios.solvers
+    rets = portfolios.get_metric("Return")
+    vols = portfolios.get_metric("Volatility")
+    sharpe_ratios = portfolios.get_metric("Sharpe Ratio")
+    symbols = list(portfolios.symbols)
+    solver_names = list(dict.fromkeys(solvers))
+    solver_colors = {solver: color_palette[i % len(color_palette)] for i, solver in enumerate(solver_names)}
+    rng = np.random.default_rng(42)
+
+    def _hovertext(idx: np.ndarray):
+        return [
+            f"Volatility: {vols[i]:.3f}<br>Return: {rets[i]:.3f}<br>Sharpe Ratio: {sharpe_ratios[i]:.3f}<br><br>" +
+            "<br>".join([f"{k}: {v:.2%}" for k, v in zip(symbols, portfolios.weights[i])])
+            for i in idx
+        ]
 
     best_portfolios = []
-    solver_colors = {solver: color_palette[i % len(color_palette)] for i, solver in enumerate(portfolios_by_solver.keys())}
-
-    for solver, portfolios in portfolios_by_solver.items():
-        # Convert list of portfolios to DataFrame for easier manipulation
-        portfolios_df = pd.DataFrame(portfolios)
-        best_portfolio = portfolios_df.loc[portfolios_df['Sharpe Ratio'].idxmax()]
-        best_portfolios.append(best_portfolio)
+    for solver in solver_names:
+        idx = np.flatnonzero(solvers == solver)
+        best = idx[np.argmax(sharpe_ratios[idx])]
+        best_portfolios.append((solver, best))
 
         # Sample if necessary
-        if len(portfolios) > sample:
-            sampled_portfolios = portfolios_df.sample(n=sample-1, random_state=42)  # Reserve one spot for the best portfolio
-            sampled_portfolios = pd.concat([sampled_portfolios, best_portfolio.to_frame().T], ignore_index=True)
-        else:
-            sampled_portfolios = portfolios_df
+        if len(idx) > sample:
+            sampled = rng.choice(idx[idx != best], size=sample - 1, replace=False)  # Reserve one spot for the best portfolio
+            idx = np.append(sampled, best)
+
+        # Frontier portfolios are drawn as a curve, ordered by volatility
+        is_frontier = solver == FRONTIER_SOLVER
+        if is_frontier:
+            idx = idx[np.argsort(vols[idx])]
 
         # Plot all (or sampled) portfolios for this solver with assigned color
         fig.add_trace(go.Scatter3d(
-            x=sampled_portfolios['Volatility'],
-            y=sampled_portfolios['Return'],
-            z=sampled_portfolios['Sharpe Ratio'],
-            mode='markers',
+            x=vols[idx],
+            y=rets[idx],
+            z=sharpe_ratios[idx],
+            mode='lines+markers' if is_frontier else 'markers',
+            line=dict(color=solver_colors[solver], width=4) if is_frontier else None,
             marker=dict(
                 size=6,
                 opacity=0.5,
                 color=solver_colors[solver],  # Use solver-specific color
             ),
             name=solver,
-            hovertext=[
-                f"Volatility: {vol:.3f}<br>Return: {ret:.3f}<br>Sharpe Ratio: {sr:.3f}<br><br>" + 
-                "<br>".join([f"{k}: {v:.2%}" for k, v in row["Weights"].items()])
-                for vol, ret, sr, row in zip(sampled_portfolios['Volatility'], sampled_portfolios['Return'], sampled_portfolios['Sharpe Ratio'], sampled_portfolios.to_dict('records'))
-            ],
+            hovertext=_hovertext(idx),
             hoverinfo='text'
         ))
 
     # Plot best portfolios with special markers and assigned colors
-    for portfolio in best_portfolios:
+    for solver, best in best_portfolios:
         fig.add_trace(go.Scatter3d(
-            x=[portfolio['Volatility']],
-            y=[portfolio['Return']],
-            z=[portfolio['Sharpe Ratio']],
+            x=[vols[best]],
+            y=[rets[best]],
+            z=[sharpe_ratios[best]],
             mode='markers',
             marker=dict(
                 size=10,
                 symbol='diamond',
-                color=solver_colors[portfolio['Solver']],  # Use solver-specific color
+                color=solver_colors[solver],  # Use solver-specific color
                 line=dict(
                     color='Black',
                     width=2
                 ),
             ),
-            name=f"Best {portfolio['Solver']}",
-            hovertext=[
-                f"Volatility: {portfolio['Volatility']:.3f}<br>Return: {portfolio['Return']:.3f}<br>Sharpe Ratio: {portfolio['Sharpe Ratio']:.3f}<br><br>" +
-                "<br>".join([f"{k}: {v:.2%}" for k, v in portfolio["Weights"].items()])
-            ],
+            name=f"Best {solver}",
+            hovertext=_hovertext([best]),
             hoverinfo='text'
         ))
 
@@ -467,16 +476,23 @@ def plot_simulation_and_evaluation(
     return fig
 
 def plot_simulation_and_evaluation_all_alphas(
-    portfolio_sims_df: pd.DataFrame,
+    portfolio_sims_df: Union[PortfolioSimulations, pd.DataFrame],
     initial_investment: Optional[Union[int, float]] = None,
     VaR_series: Optional[Union[Dict[float, Union[int, float]], pd.Series]] = None,
     CVaR_series: Optional[Union[Dict[float, Union[int, float]], pd.Series]] = None,
     VaR_color: Optional[str] = "red",
     CVaR_color: Optional[str] = "red",
     days: int = 90,
-    show: bool = False
+    show: bool = False,
+    max_paths: Optional[int] = None, # simulations drawn (all if None)
 ) -> Dict[float, go.Figure]: # figure for each alpha
     
+    if isinstance(portfolio_sims_df, PortfolioSimulations):
+        # Only the plotted simulations are converted from the (memory-mapped) Arrow table
+        portfolio_sims_df = portfolio_sims_df.to_frame(max_paths)
+    elif max_paths is not None:
+        portfolio_sims_df = portfolio_sims_df.iloc[:, :max_paths]
+
     if VaR_series is not None:
         VaR_series = dict(VaR_series)
     if CVaR_series is not None:
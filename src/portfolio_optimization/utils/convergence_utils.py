@@ -0,0 +1,92 @@
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from portfolio_optimization.utils.quantile_utils import BatchedQuantileDigest
+
+def calculate_confidence_intervals(
+    digest: BatchedQuantileDigest,
+    alphas: List[float],
+    confidence: float = 0.95,
+    min_scale: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Confidence intervals of the VaR & CVaR estimates of a batched digest of simulated returns, from the
+    batch-means standard errors (Student-t with n_batches - 1 degrees of freedom).
+
+    Parameters:
+    - min_scale: Floor of the estimates' magnitude the half-widths are relative to (e.g. a fraction of the
+      initial investment), so that estimates near zero do not blow up the relative error.
+
+    Returns:
+    - DataFrame indexed by alpha, with VaR & CVaR columns, their interval half-widths (VaR CI & CVaR CI),
+      and the largest half-width relative to its estimate, or to min_scale if larger (Relative Error).
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"{confidence}: Value of 'confidence' parameter must meet 0 < value < 1")
+    alphas = np.asarray(alphas, dtype=np.float64)
+    t = stats.t.ppf((1 + confidence) / 2, len(digest.batches) - 1)
+    table = pd.DataFrame(
+        {
+            "VaR": digest.quantile(alphas),
+            "VaR CI": t * np.asarray(digest.quantile_se(alphas)),
+            "CVaR": digest.tail_mean(alphas),
+            "CVaR CI": t * np.asarray(digest.tail_mean_se(alphas)),
+        },
+        index=pd.Index(alphas, name="alpha"),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["Relative Error"] = np.maximum(
+            table["VaR CI"] / np.maximum(table["VaR"].abs(), min_scale),
+            table["CVaR CI"] / np.maximum(table["CVaR"].abs(), min_scale),
+        )
+    return table
+
+class AdaptiveStopping:
+    """
+    Stopping rule of an adaptive simulation: paths are simulated chunk by chunk until the confidence
+    interval of VaR & CVaR at every alpha is narrower than `rel_tol` of the estimate, or of `min_scale`
+    for estimates closer to zero (checked once `min_sims` paths have run, so that every batch reaches
+    into the smallest alpha's tail), or until the path or time budget runs out.
+    """
+
+    def __init__(
+        self,
+        alphas: List[float],
+        rel_tol: float = 0.01,  # confidence interval half-width, relative to the estimate
+        confidence: float = 0.95,
+        min_sims: int = 10000,
+        max_sims: int = 1000000,  # path budget
+        max_seconds: Optional[float] = None,  # time budget
+        min_scale: float = 0.0,  # floor of the estimates' magnitude rel_tol is relative to
+    ):
+        if rel_tol <= 0:
+            raise ValueError(f"{rel_tol}: Value of 'rel_tol' parameter must be > 0")
+        if max_sims < min_sims:
+            raise ValueError(f"{max_sims}: Value of 'max_sims' parameter must be >= 'min_sims' ({min_sims})")
+        self.alphas = list(alphas)
+        self.rel_tol = rel_tol
+        self.confidence = confidence
+        self.min_sims = min_sims
+        self.max_sims = max_sims
+        self.max_seconds = max_seconds
+        self.min_scale = min_scale
+
+    def stop_reason(self, digest: BatchedQuantileDigest, seconds: float) -> Optional[str]:
+        # Why the simulation should stop after `digest.count` paths in `seconds` (None to go on)
+        if digest.count >= self.min_sims and self.converged(digest):
+            return "converged"
+        if digest.count >= self.max_sims:
+            return "path budget"
+        if self.max_seconds is not None and seconds >= self.max_seconds:
+            return "time budget"
+        return None
+
+    def converged(self, digest: BatchedQuantileDigest) -> bool:
+        relative_errors = calculate_confidence_intervals(
+            digest, self.alphas, self.confidence, self.min_scale
+        )["Relative Error"]
+        # NaN (too few batches with values) never counts as converged
+        return bool((relative_errors <= self.rel_tol).all())
+
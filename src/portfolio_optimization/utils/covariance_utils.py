@@ -0,0 +1,152 @@
+from typing import Dict, Optional, Tuple
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+
+from portfolio_optimization.utils.financial_utils import get_num_trading_periods
+
+
+COVARIANCE_ESTIMATORS = ["sample", "ledoit_wolf", "oas", "factor"]
+
+class CovarianceModel:
+    """
+    Daily return moments of a universe of symbols, estimated once per run, with the factorizations
+    of the covariance matrix (Cholesky, eigen) computed on first use and cached for every consumer.
+    """
+
+    def __init__(
+        self,
+        symbols: ArrayLike,
+        mean: np.ndarray,
+        cov: Optional[np.ndarray] = None,  # built from loadings & specific_var when omitted
+        *,
+        estimator: str = "sample",
+        shrinkage: Optional[float] = None,  # shrinkage intensity (ledoit_wolf, oas)
+        loadings: Optional[np.ndarray] = None,  # (n_symbols, n_factors) factor loadings (factor)
+        specific_var: Optional[np.ndarray] = None,  # (n_symbols,) idiosyncratic variances (factor)
+    ):
+        self.symbols = pd.Index(list(symbols))
+        self.mean = np.asarray(mean, dtype=np.float64)
+        if cov is not None:
+            self.cov = np.asarray(cov, dtype=np.float64)
+        elif loadings is None or specific_var is None:
+            raise ValueError("Expected either 'cov' or both 'loadings' and 'specific_var' parameters")
+        self.estimator = estimator
+        self.shrinkage = shrinkage
+        self.loadings = loadings
+        self.specific_var = specific_var
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @cached_property
+    def cov(self) -> np.ndarray:
+        # Factor models keep n·k loadings & n specific variances until the full n x n matrix is needed
+        return self.loadings @ self.loadings.T + np.diag(self.specific_var)
+
+    @cached_property
+    def cholesky(self) -> np.ndarray:
+        # Lower-triangular factor; a vanishing ridge is added if the matrix is numerically singular
+        try:
+            return np.linalg.cholesky(self.cov)
+        except np.linalg.LinAlgError:
+            pass
+        jitter = max(np.trace(self.cov) / len(self), np.finfo(np.float64).tiny) * 1e-10
+        for _ in range(10):
+            try:
+                return np.linalg.cholesky(self.cov + jitter * np.eye(len(self)))
+            except np.linalg.LinAlgError:
+                jitter *= 10
+        raise np.linalg.LinAlgError(f"Covariance matrix ('{self.estimator}' estimator) is not positive definite")
+
+    @cached_property
+    def eigh(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (eigenvalues ascending, eigenvectors as columns)
+        return np.linalg.eigh(self.cov)
+
+    def factors(self, n_factors: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (loadings, specific variances) of a k-factor approximation of the covariance matrix:
+        the model's own for the factor estimator, else its leading principal components.
+        """
+        if self.loadings is not None:
+            return self.loadings, self.specific_var
+        if not 0 < n_factors < len(self):
+            raise ValueError(f"{n_factors}: Value of 'n_factors' parameter must be between 1 and {len(self) - 1}")
+        eigenvalues, eigenvectors = self.eigh
+        loadings = eigenvectors[:, -n_factors:] * np.sqrt(np.clip(eigenvalues[-n_factors:], 0, None))
+        specific_var = np.clip(np.diag(self.cov) - np.sum(loadings ** 2, axis=1), 1e-12, None)
+        return loadings, specific_var
+
+    @property
+    def condition_number(self) -> float:
+        eigenvalues = self.eigh[0]
+        return float(eigenvalues[-1] / eigenvalues[0]) if eigenvalues[0] > 0 else np.inf
+
+    def annualized(self, period: str = "daily") -> Tuple[np.ndarray, np.ndarray]:
+        num_trading_periods = get_num_trading_periods(period)
+        return self.mean * num_trading_periods, self.cov * num_trading_periods
+
+    def align_weights(self, weights_dict: Dict[str, float]) -> np.ndarray:
+        # Weights over the model's full universe (zero for symbols not in the portfolio)
+        columns = self.symbols.get_indexer(list(weights_dict.keys()))
+        if (columns < 0).any():
+            missing = [s for s, c in zip(weights_dict, columns) if c < 0]
+            raise ValueError(f"{missing}: Symbols missing from covariance model; choose from {list(self.symbols)}")
+        weights = np.zeros(len(self))
+        weights[columns] = list(weights_dict.values())
+        return weights
+
+    def to_frame(self, period: Optional[str] = None) -> pd.DataFrame:
+        cov = self.cov if period is None else self.annualized(period)[1]
+        return pd.DataFrame(cov, index=self.symbols, columns=self.symbols)
+
+def estimate_covariance(
+    returns: pd.DataFrame,
+    estimator: str = "sample",
+    n_factors: int = 3,
+) -> CovarianceModel:
+    """
+    Estimates the covariance matrix of daily returns.
+
+    Parameters:
+    - returns: Daily returns, one column per symbol.
+    - estimator: "sample", "ledoit_wolf" (shrinkage towards a scaled identity), "oas" (oracle
+                 approximating shrinkage) or "factor" (k-factor PCA model plus diagonal noise).
+    - n_factors: Number of factors of the "factor" estimator.
+    """
+    if estimator not in COVARIANCE_ESTIMATORS:
+        raise ValueError(f"{estimator}: Invalid value for 'estimator' parameter; choose from {COVARIANCE_ESTIMATORS}")
+    mean = returns.mean().values
+    if estimator == "sample":
+        return CovarianceModel(returns.columns, mean, returns.cov().values)
+
+    X = returns.values - mean
+    n_obs, n_symbols = X.shape
+    if estimator == "factor":
+        if not 0 < n_factors < n_symbols:
+            raise ValueError(f"{n_factors}: Value of 'n_factors' parameter must be between 1 and {n_symbols - 1}")
+        # Leading principal components of the returns (SVD, never forming the n x n sample covariance),
+        # remaining variance as idiosyncratic noise
+        _, singular_values, components = np.linalg.svd(X / np.sqrt(n_obs - 1), full_matrices=False)
+        loadings = components[:n_factors].T * singular_values[:n_factors]
+        specific_var = np.clip(returns.var().values - np.sum(loadings ** 2, axis=1), 1e-12, None)
+        return CovarianceModel(
+            returns.columns, mean, estimator=estimator, loadings=loadings, specific_var=specific_var
+        )
+
+    # Shrinkage towards mu * I, mu being the average variance
+    sample_cov = X.T @ X / n_obs
+    mu = np.trace(sample_cov) / n_symbols
+    if estimator == "ledoit_wolf":
+        X2 = X ** 2
+        beta = np.sum(X2.T @ X2 / n_obs - sample_cov ** 2) / (n_symbols * n_obs)
+        delta = np.sum((sample_cov - mu * np.eye(n_symbols)) ** 2) / n_symbols
+        shrinkage = min(beta, delta) / delta if delta > 0 else 1.0
+    else:
+        alpha = np.mean(sample_cov ** 2)
+        denominator = (n_obs + 1) * (alpha - mu ** 2 / n_symbols)
+        shrinkage = min((alpha + mu ** 2) / denominator, 1.0) if denominator > 0 else 1.0
+    cov = (1 - shrinkage) * sample_cov + shrinkage * mu * np.eye(n_symbols)
+    return CovarianceModel(returns.columns, mean, cov, estimator=estimator, shrinkage=shrinkage)
@@ -1,8 +1,9 @@
-from typing import Union, Callable, Optional, Iterable, Dict, Any
+from typing import Union, Callable, Optional, Iterable, Dict, Any, Mapping
 import pandas as pd
 from numpy.typing import ArrayLike
 
 from portfolio_optimization.consts import INDEX_COL
+from portfolio_optimization.datasets.price_panel import PricePanel
 from portfolio_optimization.utils.formatting_utils import str2list
 
 
@@ -19,7 +20,7 @@ def concat_partitions(
         dfs = dfs()
     if isinstance(dfs, pd.DataFrame):
         return dfs
-    if isinstance(dfs, dict):
+    if isinstance(dfs, Mapping):
         dfs_list = []
         for title, df in dfs.items():
             df = pd.DataFrame(callable2obj(df))
@@ -46,11 +47,20 @@ def filter_stocks_df_for_agg(
     df.columns = [f.replace(suffix, "") for f in df]
     return df
 
+def get_agg_prices(
+    stocks_data: Union[PricePanel, Dict[str, Union[Callable, pd.DataFrame]]],
+    agg: str = "Close",
+) -> pd.DataFrame:
+    # Prices of one field, dates x tickers (a zero-copy view of a PricePanel, without re-concatenating)
+    if isinstance(stocks_data, PricePanel):
+        return stocks_data.field(agg)
+    return filter_stocks_df_for_agg(concat_partitions(stocks_data), agg)
+
 def get_stock_returns(
-    stocks_data: Dict[str, Union[Callable, pd.DataFrame]],
+    stocks_data: Union[PricePanel, Dict[str, Union[Callable, pd.DataFrame]]],
     agg: str = "Close",
 ) -> pd.DataFrame:
-    stocks_data = filter_stocks_df_for_agg(concat_partitions(stocks_data), agg)
+    stocks_data = get_agg_prices(stocks_data, agg)
     returns = stocks_data.pct_change().dropna()
     return returns
 
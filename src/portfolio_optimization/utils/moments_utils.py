@@ -0,0 +1,100 @@
+from typing import Callable, Dict, Hashable, Tuple, Union
+from collections import OrderedDict
+from functools import cached_property
+import hashlib
+import logging
+import pandas as pd
+
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.utils.covariance_utils import CovarianceModel, estimate_covariance
+from portfolio_optimization.utils.data_utils import get_agg_prices
+from portfolio_optimization.utils.financial_utils import get_num_trading_periods
+
+logger = logging.getLogger(__name__)
+
+MOMENTS_CACHE_SIZE = 8  # (prices, agg, period) entries kept
+
+class ReturnsMoments:
+    """
+    Returns of one price field and their moments, each computed on first use and then shared by every
+    node reading the same prices (see get_returns_moments).
+    """
+
+    def __init__(self, prices: pd.DataFrame, period: str = "daily"):
+        self.prices = prices
+        self.period = period
+        self._covariance_models: Dict[Tuple[str, int], CovarianceModel] = {}
+
+    @cached_property
+    def returns(self) -> pd.DataFrame:
+        return self.prices.pct_change().dropna()
+
+    @cached_property
+    def mean(self) -> pd.Series:
+        return self.returns.mean()
+
+    @cached_property
+    def cov(self) -> pd.DataFrame:
+        return self.returns.cov()
+
+    @cached_property
+    def corr(self) -> pd.DataFrame:
+        return self.returns.corr()
+
+    @property
+    def mean_annualized(self) -> pd.Series:
+        return self.mean * get_num_trading_periods(self.period)
+
+    @property
+    def cov_annualized(self) -> pd.DataFrame:
+        return self.cov * get_num_trading_periods(self.period)
+
+    def get_covariance_model(self, estimator: str = "sample", n_factors: int = 3) -> CovarianceModel:
+        # One model per estimator, caching its own Cholesky & eigen factorizations
+        key = (estimator, n_factors if estimator == "factor" else 0)
+        if key not in self._covariance_models:
+            if estimator == "sample":
+                self._covariance_models[key] = CovarianceModel(self.returns.columns, self.mean.values, self.cov.values)
+            else:
+                self._covariance_models[key] = estimate_covariance(self.returns, estimator, n_factors)
+        return self._covariance_models[key]
+
+_moments_cache: "OrderedDict[Hashable, ReturnsMoments]" = OrderedDict()
+
+def get_returns_moments(
+    stocks_data: Union[PricePanel, Dict[str, Union[Callable, pd.DataFrame]]],
+    agg: str = "Close",
+    period: str = "daily",
+) -> ReturnsMoments:
+    """
+    Returns the (memoized) returns & moments of a price field, keyed by a content hash of the prices,
+    so that nodes loading their own copy of the same prices still share one computation.
+    """
+    if isinstance(stocks_data, PricePanel):
+        prices = None
+        key = (stocks_data.content_hash, agg, period)
+    else:
+        prices = get_agg_prices(stocks_data, agg)
+        key = (_hash_frame(prices), agg, period)
+    if key in _moments_cache:
+        _moments_cache.move_to_end(key)
+        logger.info(f"Returns & moments cache hit ({agg}, {period})")
+        return _moments_cache[key]
+    moments = ReturnsMoments(get_agg_prices(stocks_data, agg) if prices is None else prices, period)
+    _moments_cache[key] = moments
+    if len(_moments_cache) > MOMENTS_CACHE_SIZE:
+        _moments_cache.popitem(last=False)
+    return moments
+
+def estimate_covariance_model(
+    stocks_data: Union[PricePanel, Dict[str, Union[Callable, pd.DataFrame]]],
+    agg: str = "Close",
+    estimator: str = "sample",
+    n_factors: int = 3,
+) -> CovarianceModel:
+    return get_returns_moments(stocks_data, agg).get_covariance_model(estimator, n_factors)
+
+def _hash_frame(df: pd.DataFrame) -> str:
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(df, index=True).values.tobytes(), digest_size=16)
+    digest.update(",".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.utils.quantile_utils import QuantileDigest
+
+def calculate_path_metrics(
+    values: np.ndarray,
+    initial_investment: float,
+) -> Dict[str, np.ndarray]:
+    """
+    Path-dependent metrics of a chunk of simulated portfolio paths, one value per path.
+
+    Parameters:
+    - values: Simulated portfolio values, shape (n_sims, T).
+    - initial_investment: Portfolio value at day 0, the first peak of every path.
+
+    Returns:
+    - max_drawdown: Largest fall from a running peak, as a fraction of the peak.
+    - time_under_water: Longest run of days spent below a running peak.
+    - min_return: Lowest value along the path minus the initial investment.
+    """
+    T = values.shape[1]
+    peaks = np.maximum(np.maximum.accumulate(values, axis=1), initial_investment)
+    drawdowns = 1 - values / peaks
+    # Days since the last day at a peak (the initial investment being the peak at day -1)
+    days = np.arange(T)
+    last_peak_day = np.maximum.accumulate(np.where(drawdowns > 0, -1, days), axis=1)
+    return {
+        "max_drawdown": np.maximum(drawdowns.max(axis=1), 0),
+        "time_under_water": (days - last_peak_day).max(axis=1),
+        "min_return": values.min(axis=1) - initial_investment,
+    }
+
+class PathRiskAccumulator:
+    """
+    Running path-dependent risk statistics of simulated portfolio paths, updated chunk by chunk (so that
+    paths never have to be kept) and mergeable across worker processes: exact (sample weighted) loss barrier
+    breach counts, and QuantileDigests of each path's max drawdown, time under water & lowest return.
+    """
+
+    def __init__(
+        self,
+        initial_investment: float,
+        loss_barriers: Iterable[float] = (),  # losses (fractions of the initial investment) to count breaches of
+        compression: int = 500,
+    ):
+        self.initial_investment = initial_investment
+        self.loss_barriers: List[float] = list(loss_barriers)
+        self.compression = compression
+        self.count = 0
+        self.breaches = np.zeros(len(self.loss_barriers))  # total sample weight of the breaching paths
+        self.digests = {
+            metric: QuantileDigest(compression) for metric in ["max_drawdown", "time_under_water", "min_return"]
+        }
+
+    def update(self, values: np.ndarray, sample_weights: Optional[np.ndarray] = None) -> "PathRiskAccumulator":
+        metrics = calculate_path_metrics(values, self.initial_investment)
+        weights = np.ones(len(values)) if sample_weights is None else np.asarray(sample_weights, dtype=np.float64)
+        self.count += len(values)
+        barriers = -np.asarray(self.loss_barriers) * self.initial_investment
+        self.breaches += weights @ (metrics["min_return"][:, None] <= barriers)
+        for metric, digest in self.digests.items():
+            digest.update(metrics[metric], sample_weights)
+        return self
+
+    def merge(self, *others: "PathRiskAccumulator") -> "PathRiskAccumulator":
+        for other in others:
+            if other.loss_barriers != self.loss_barriers:
+                raise ValueError(f"{other.loss_barriers}: Loss barriers must match {self.loss_barriers} to merge")
+            self.count += other.count
+            self.breaches += other.breaches
+            for metric, digest in self.digests.items():
+                digest.merge(other.digests[metric])
+        return self
+
+    def breach_probabilities(self) -> pd.Series:
+        # Probability of the portfolio losing at least each barrier at any point of the timeframe
+        return pd.Series(
+            self.breaches / self.count if self.count else np.nan,
+            index=pd.Index(self.loss_barriers, name="loss_barrier"),
+            name="Breach Probability",
+        )
+
+    def metrics_for_each_alpha(self, alphas: List[float]) -> pd.DataFrame:
+        # Levels exceeded by a fraction alpha of the paths (intra-horizon VaR: lowest return along the path)
+        alphas = np.asarray(alphas)
+        return pd.DataFrame(
+            {
+                "Intra-horizon VaR": self.digests["min_return"].quantile(alphas),
+                "Max Drawdown": self.digests["max_drawdown"].upper_quantile(alphas),
+                "Time Under Water": self.digests["time_under_water"].upper_quantile(alphas),
+            },
+            index=pd.Index(alphas, name="alpha"),
+        )
+
+    def __repr__(self) -> str:
+        return f"PathRiskAccumulator({self.count} paths, loss_barriers={self.loss_barriers})"
@@ -0,0 +1,226 @@
+from typing import Iterable, Optional, Union
+import numpy as np
+from numpy.typing import ArrayLike
+
+class QuantileDigest:
+    """
+    Mergeable t-digest of a stream of values: values are summarized by at most ~`compression` weighted
+    centroids, smallest (down to single values) in the tails, so that tail quantiles (VaR) and tail means
+    (CVaR) are answered with bounded error in constant memory. Exact count, sum, min & max are kept
+    alongside the centroids.
+
+    Up to ~compression * 2/π values every centroid is a single value, and quantile & tail_mean match
+    np.percentile (linear) & the mean of the values <= it exactly. Values may carry sample weights
+    (importance sampling likelihood ratios), in which case a value's probability mass is its weight over
+    the number of values (not over the total weight, which is dominated by the rare, heavily weighted
+    values far from the tail sampled).
+    """
+
+    def __init__(self, compression: int = 200, buffer_size: Optional[int] = None):
+        if compression < 10:
+            raise ValueError(f"{compression}: Value of 'compression' parameter must be >= 10")
+        self.compression = compression
+        self.buffer_size = buffer_size or 5 * compression  # values buffered before compressing
+        self.count = 0
+        self.total_weight = 0.0
+        self.sum = 0.0  # weighted
+        self.weighted = False  # whether any value had a sample weight other than 1
+        self.min = np.inf
+        self.max = -np.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer = []
+        self._buffered = 0
+
+    @classmethod
+    def from_values(
+        cls,
+        values: ArrayLike,
+        compression: int = 200,
+        sample_weights: Optional[ArrayLike] = None,
+    ) -> "QuantileDigest":
+        digest = cls(compression)
+        digest.update(values, sample_weights)
+        return digest
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else np.nan
+
+    @property
+    def centroids(self) -> np.ndarray:
+        # (n_centroids, 2) array of (mean, weight), sorted by mean
+        self._compress()
+        return np.column_stack([self._means, self._weights])
+
+    def update(self, values: ArrayLike, sample_weights: Optional[ArrayLike] = None) -> "QuantileDigest":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        valid = ~np.isnan(values)
+        values = values[valid]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if sample_weights is None:
+            self.total_weight += len(values)
+            self.sum += float(values.sum())
+            self._buffer.append(values)
+        else:
+            sample_weights = np.asarray(sample_weights, dtype=np.float64).ravel()[valid]
+            self.weighted |= bool((sample_weights != 1).any())
+            self.total_weight += float(sample_weights.sum())
+            self.sum += float(np.dot(values, sample_weights))
+            self._buffer.append(np.column_stack([values, sample_weights]))
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self._compress()
+        return self
+
+    def merge(self, *others: "QuantileDigest") -> "QuantileDigest":
+        # Merge digests (e.g. one per worker process) into this one
+        for other in others:
+            other._compress()
+            self.count += other.count
+            self.total_weight += other.total_weight
+            self.sum += other.sum
+            self.weighted |= other.weighted
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._buffer.append(np.column_stack([other._means, other._weights]))
+        self._compress()
+        return self
+
+    def quantile(self, q: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        # Linearly interpolated between centroids' rank positions, as np.percentile between values
+        self._check_not_empty()
+        self._compress()
+        cum = np.cumsum(self._weights)
+        if self.weighted:
+            # Centroids' midpoints in cumulative weight, spanning [0, total weight]
+            positions, last, target = cum - self._weights / 2, self.total_weight, np.asarray(q) * self.count
+        else:
+            # Centroids' mean rank (0-indexed), spanning [0, count - 1]
+            positions, last, target = cum - (self._weights + 1) / 2, self.count - 1, np.asarray(q) * (self.count - 1)
+        values = self._means
+        if positions[0] > 0:
+            positions, values = np.r_[0, positions], np.r_[self.min, values]
+        if positions[-1] < last:
+            positions, values = np.r_[positions, last], np.r_[values, self.max]
+        result = np.interp(target, positions, values)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def upper_quantile(self, q: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        # Value exceeded by a fraction q of the values, i.e. quantile(1 - q); if weighted, the tail's weight is
+        # counted down from the total weight, so that the estimate only depends on the upper tail's weights
+        if not self.weighted:
+            return self.quantile(1 - np.asarray(q))
+        return self.quantile((self.total_weight - np.asarray(q) * self.count) / self.count)
+
+    def tail_mean(self, q: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        # Mean of the values <= the q-quantile: of the floor(q * (count - 1)) + 1 smallest values, or
+        # of the smallest values weighing q * count if weighted
+        self._check_not_empty()
+        self._compress()
+        q = np.asarray(q, dtype=np.float64)
+        n_tail = q * self.count if self.weighted else np.floor(q * (self.count - 1)) + 1
+        cum = np.r_[0, np.cumsum(self._weights)]
+        cum_sum = np.r_[0, np.cumsum(self._means * self._weights)]
+        # Centroids entirely in the tail, plus the part of the one straddling its edge
+        i = np.searchsorted(cum, n_tail, side="right") - 1
+        i_partial = np.minimum(i, len(self._means) - 1)
+        tail_sum = cum_sum[i] + (n_tail - cum[i]) * self._means[i_partial]
+        result = tail_sum / n_tail
+        return float(result) if np.ndim(result) == 0 else result
+
+    def _check_not_empty(self) -> None:
+        if not self.count:
+            raise ValueError("Cannot estimate quantiles of an empty QuantileDigest")
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        # (1) Pool existing centroids with buffered values (weight 1) & centroids of merged digests
+        pooled = [np.column_stack([self._means, self._weights])]
+        pooled += [item if item.ndim == 2 else np.column_stack([item, np.ones(len(item))]) for item in self._buffer]
+        pooled = np.concatenate(pooled)
+        pooled = pooled[np.argsort(pooled[:, 0], kind="stable")]
+        means, weights = pooled[:, 0], pooled[:, 1]
+        # (2) Assign each item to a unit interval of the k1 scale function k(q) = δ/π * asin(2q - 1) by its
+        #     mid rank: intervals span few values in the tails (where k is steep) and many around the median
+        cum = np.cumsum(weights)
+        q_mid = (cum - weights / 2) / cum[-1]
+        bins = np.floor(self.compression / np.pi * np.arcsin(2 * q_mid - 1))
+        # (3) Each interval's items merge into one centroid
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        self._weights = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / self._weights
+        self._buffer = []
+        self._buffered = 0
+
+    def __len__(self) -> int:
+        # Number of centroids
+        self._compress()
+        return len(self._means)
+
+    def __getstate__(self) -> dict:
+        self._compress()
+        return self.__dict__.copy()
+
+    def __repr__(self) -> str:
+        return f"QuantileDigest({self.count} values, {len(self)} centroids, compression={self.compression})"
+
+class BatchedQuantileDigest(QuantileDigest):
+    """
+    QuantileDigest that also keeps one digest per batch of its values, for batch-means standard errors of
+    its quantiles & tail means. Consecutive pairs of values are dealt to the batches in turn, so that
+    antithetic pairs stay in the same batch.
+    """
+
+    def __init__(self, compression: int = 200, n_batches: int = 10, buffer_size: Optional[int] = None):
+        if n_batches < 2:
+            raise ValueError(f"{n_batches}: Value of 'n_batches' parameter must be >= 2")
+        super().__init__(compression, buffer_size)
+        self.batches = [QuantileDigest(compression) for _ in range(n_batches)]
+        self._n_pairs = 0
+
+    def update(self, values: ArrayLike, sample_weights: Optional[ArrayLike] = None) -> "BatchedQuantileDigest":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        batch_ids = (self._n_pairs + np.arange(len(values)) // 2) % len(self.batches)
+        self._n_pairs += -(-len(values) // 2)
+        if sample_weights is not None:
+            sample_weights = np.asarray(sample_weights, dtype=np.float64).ravel()
+        for i, batch in enumerate(self.batches):
+            in_batch = batch_ids == i
+            batch.update(values[in_batch], None if sample_weights is None else sample_weights[in_batch])
+        return super().update(values, sample_weights)
+
+    def merge(self, *others: "QuantileDigest") -> "BatchedQuantileDigest":
+        super().merge(*others)
+        for other in others:
+            if not isinstance(other, BatchedQuantileDigest) or len(other.batches) != len(self.batches):
+                raise ValueError(f"{other}: Only digests with {len(self.batches)} batches can be merged")
+            for batch, other_batch in zip(self.batches, other.batches):
+                batch.merge(other_batch)
+        return self
+
+    def quantile_se(self, q: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        return self._batch_means_se([batch.quantile(q) for batch in self.batches if batch.count])
+
+    def tail_mean_se(self, q: Union[float, ArrayLike]) -> Union[float, np.ndarray]:
+        return self._batch_means_se([batch.tail_mean(q) for batch in self.batches if batch.count])
+
+    @staticmethod
+    def _batch_means_se(estimates: list) -> Union[float, np.ndarray]:
+        if len(estimates) < 2:
+            return np.full(np.shape(estimates[0]), np.nan) if estimates else np.nan
+        result = np.std(estimates, axis=0, ddof=1) / np.sqrt(len(estimates))
+        return float(result) if np.ndim(result) == 0 else result
+
+def merge_digests(digests: Iterable[QuantileDigest]) -> QuantileDigest:
+    digests = list(digests)
+    if not digests:
+        raise ValueError("No digests to merge")
+    if isinstance(digests[0], BatchedQuantileDigest):
+        return BatchedQuantileDigest(digests[0].compression, len(digests[0].batches)).merge(*digests)
+    return QuantileDigest(digests[0].compression).merge(*digests)
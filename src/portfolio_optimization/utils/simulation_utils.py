@@ -0,0 +1,255 @@
+from typing import Optional, Tuple
+from abc import ABC, abstractmethod
+import numpy as np
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+from scipy.stats import norm, qmc
+
+RETURN_GENERATORS = ["gaussian", "student_t", "bootstrap", "filtered_historical"]
+VARIANCE_REDUCTIONS = ["none", "antithetic", "sobol", "importance"]
+SOBOL_MAX_DIMENSION = 21201  # dimensions supported by scipy's Sobol' direction numbers
+
+class NormalSampler:
+    """
+    Draws the standard normal shocks of a block of paths, shape (n_sims, T, n_shocks), with optional
+    variance reduction:
+    - antithetic: every draw is followed by its negation (pairs of consecutive paths).
+    - sobol: randomized quasi-Monte Carlo, a scrambled Sobol' sequence (one dimension per day & shock,
+      scrambled independently per block) mapped through the normal inverse CDF.
+    - importance: shocks are shifted by `shift / sqrt(T)` standard deviations per day against the portfolio
+      (`exposure`: its daily return's sensitivity to each shock), i.e. by `shift` standard deviations over
+      the timeframe, oversampling losses; each path's likelihood ratio is returned as its sample weight.
+    """
+
+    def __init__(self, method: str = "none", shift: float = 2.5):
+        if method not in VARIANCE_REDUCTIONS:
+            raise ValueError(f"{method}: Invalid value for 'variance_reduction' parameter; choose from {VARIANCE_REDUCTIONS}")
+        self.method = method
+        self.shift = shift
+
+    def draw(
+        self,
+        n_sims: int,
+        T: int,
+        n_shocks: int,
+        rng: np.random.Generator,
+        exposure: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # Shocks, and sample weights of the paths (None if unweighted)
+        if self.method == "antithetic":
+            Z = rng.standard_normal(size=(-(-n_sims // 2), T, n_shocks))
+            return np.stack([Z, -Z], axis=1).reshape(-1, T, n_shocks)[:n_sims], None
+        if self.method == "sobol":
+            if T * n_shocks > SOBOL_MAX_DIMENSION:
+                raise ValueError(
+                    f"{T * n_shocks}: Too many shocks per path for Sobol' sampling (at most {SOBOL_MAX_DIMENSION}); "
+                    f"use fewer days or assets, or another variance reduction"
+                )
+            sobol = qmc.Sobol(d=T * n_shocks, scramble=True, seed=rng)
+            U = sobol.random_base2(int(np.ceil(np.log2(max(n_sims, 2)))))[:n_sims]
+            return norm.ppf(np.clip(U, 1e-12, 1 - 1e-12)).reshape(n_sims, T, n_shocks), None
+        Z = rng.standard_normal(size=(n_sims, T, n_shocks))
+        if self.method == "none":
+            return Z, None
+        # Importance sampling: shift towards losses along the (unit) direction the portfolio falls fastest
+        if exposure is None:
+            raise ValueError("Importance sampling requires the portfolio's 'exposure' to the shocks")
+        direction = -exposure / np.linalg.norm(exposure)
+        theta = self.shift / np.sqrt(T)
+        Z += theta * direction
+        # Likelihood ratio of the standard normal over the shifted density, over every day of the path
+        log_ratios = -theta * (Z @ direction).sum(axis=1) + T * theta ** 2 / 2
+        return Z, np.exp(log_ratios)
+
+class ReturnGenerator(ABC):
+    """
+    Generates daily returns of a set of assets for a block of simulated paths at once. Generators only
+    hold fitted arrays (no state carried between blocks), so they can be pickled to worker processes
+    and every block drawn from its own RNG stream.
+    """
+
+    @abstractmethod
+    def generate(self, n_sims: int, T: int, rng: np.random.Generator) -> np.ndarray:
+        # Daily returns, shape (n_sims, T, n_assets)
+        ...
+
+    def sample(
+        self,
+        n_sims: int,
+        T: int,
+        rng: np.random.Generator,
+        weights: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # Daily returns, and sample weights of the paths (None if unweighted) for portfolio weights `weights`
+        return self.generate(n_sims, T, rng), None
+
+class GaussianReturnGenerator(ReturnGenerator):
+    """
+    Multivariate normal returns: correlated shocks via the Cholesky factor of the covariance matrix.
+    """
+
+    def __init__(self, mean_returns: np.ndarray, L: np.ndarray, sampler: Optional[NormalSampler] = None):
+        self.mean_returns = mean_returns
+        self.L = L
+        self.sampler = sampler or NormalSampler()
+
+    def generate(self, n_sims: int, T: int, rng: np.random.Generator) -> np.ndarray:
+        return self.sample(n_sims, T, rng)[0]
+
+    def sample(
+        self,
+        n_sims: int,
+        T: int,
+        rng: np.random.Generator,
+        weights: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        exposure = None if weights is None else self.L.T @ weights
+        Z, sample_weights = self.sampler.draw(n_sims, T, len(self.mean_returns), rng, exposure)
+        return self.mean_returns + Z @ self.L.T, sample_weights
+
+class StudentTReturnGenerator(ReturnGenerator):
+    """
+    Multivariate Student-t returns (normal shocks divided by a shared chi-square mixing variable per path
+    & day), scaled to keep the covariance matrix of the Gaussian generator while fattening both tails.
+    """
+
+    def __init__(
+        self,
+        mean_returns: np.ndarray,
+        L: np.ndarray,
+        dof: float = 5,
+        sampler: Optional[NormalSampler] = None,
+    ):
+        if dof <= 2:
+            raise ValueError(f"{dof}: Value of 'dof' parameter must be > 2 for the covariance to exist")
+        self.mean_returns = mean_returns
+        self.L = L
+        self.dof = dof
+        self.sampler = sampler or NormalSampler()
+
+    def generate(self, n_sims: int, T: int, rng: np.random.Generator) -> np.ndarray:
+        return self.sample(n_sims, T, rng)[0]
+
+    def sample(
+        self,
+        n_sims: int,
+        T: int,
+        rng: np.random.Generator,
+        weights: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        # Variance reduction applies to the normal shocks, independent of the mixing variable
+        exposure = None if weights is None else self.L.T @ weights
+        Z, sample_weights = self.sampler.draw(n_sims, T, len(self.mean_returns), rng, exposure)
+        W = rng.chisquare(self.dof, size=(n_sims, T, 1))
+        return self.mean_returns + (Z @ self.L.T) * np.sqrt((self.dof - 2) / W), sample_weights
+
+class BlockBootstrapReturnGenerator(ReturnGenerator):
+    """
+    Historical (moving) block bootstrap: each path concatenates blocks of `block_size` consecutive days of
+    historical returns of all assets, keeping their fat tails, cross-correlation & short-term dependence.
+    """
+
+    def __init__(self, returns: np.ndarray, block_size: int = 10):
+        self.returns = np.ascontiguousarray(returns)  # (n_obs, n_assets)
+        self.block_size = max(1, min(block_size, len(returns)))
+
+    def generate(self, n_sims: int, T: int, rng: np.random.Generator) -> np.ndarray:
+        n_blocks = -(-T // self.block_size)
+        starts = rng.integers(0, len(self.returns) - self.block_size + 1, size=(n_sims, n_blocks))
+        days = (starts[:, :, None] + np.arange(self.block_size)).reshape(n_sims, -1)[:, :T]
+        return self.returns[days]
+
+class FilteredHistoricalReturnGenerator(ReturnGenerator):
+    """
+    Filtered historical simulation: historical returns are standardized by per-asset GARCH(1,1) volatilities,
+    and paths rescale bootstrapped days of these residuals (all assets' from the same day) by volatilities
+    following the GARCH recursion from today's forecast, so that volatility clusters along each path.
+    """
+
+    def __init__(
+        self,
+        mean_returns: np.ndarray,
+        residuals: np.ndarray,  # (n_obs, n_assets) standardized residuals
+        omega: np.ndarray,
+        alpha: np.ndarray,
+        beta: np.ndarray,
+        next_variance: np.ndarray,  # variance forecast for the first simulated day
+    ):
+        self.mean_returns = mean_returns
+        self.residuals = np.ascontiguousarray(residuals)
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        self.next_variance = next_variance
+
+    @classmethod
+    def fit(cls, returns: np.ndarray) -> "FilteredHistoricalReturnGenerator":
+        mean_returns = returns.mean(axis=0)
+        eps = returns - mean_returns
+        params = [fit_garch(eps[:, i]) for i in range(eps.shape[1])]
+        omega, alpha, beta = (np.array(values) for values in zip(*params))
+        variances = garch_variances(eps, omega, alpha, beta)
+        return cls(
+            mean_returns=mean_returns,
+            residuals=eps / np.sqrt(variances),
+            omega=omega,
+            alpha=alpha,
+            beta=beta,
+            next_variance=omega + alpha * eps[-1] ** 2 + beta * variances[-1],
+        )
+
+    def generate(self, n_sims: int, T: int, rng: np.random.Generator) -> np.ndarray:
+        shocks = self.residuals[rng.integers(0, len(self.residuals), size=(n_sims, T))]
+        returns = np.empty_like(shocks)
+        variance = np.broadcast_to(self.next_variance, (n_sims, len(self.next_variance)))
+        for t in range(T):
+            eps = np.sqrt(variance) * shocks[:, t]
+            returns[:, t] = self.mean_returns + eps
+            variance = self.omega + self.alpha * eps ** 2 + self.beta * variance
+        return returns
+
+def garch_variances(
+    eps: np.ndarray,
+    omega: np.ndarray,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+) -> np.ndarray:
+    """
+    Conditional variances of GARCH(1,1) innovations, sigma²_t = omega + alpha * eps²_{t-1} + beta * sigma²_{t-1},
+    started from the sample variance (a linear filter over time, vectorized across assets).
+
+    Parameters:
+    - eps: Demeaned returns, shape (n_obs,) or (n_obs, n_assets).
+    - omega, alpha, beta: GARCH(1,1) parameters (of each asset).
+    """
+    eps = eps.reshape(len(eps), -1)
+    omega, alpha, beta = (np.broadcast_to(param, eps.shape[1]) for param in (omega, alpha, beta))
+    variances = np.empty_like(eps)
+    variances[0] = eps.var(axis=0)
+    for i in range(eps.shape[1]):
+        inputs = omega[i] + alpha[i] * eps[:-1, i] ** 2
+        variances[1:, i] = lfilter([1.0], [1.0, -beta[i]], inputs, zi=[beta[i] * variances[0, i]])[0]
+    return variances
+
+def fit_garch(eps: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Fits GARCH(1,1) parameters (omega, alpha, beta) to demeaned returns by Gaussian quasi maximum
+    likelihood, with omega targeting the sample variance (omega = var * (1 - alpha - beta)).
+    """
+    sample_variance = eps.var()
+
+    def negative_log_likelihood(x: np.ndarray) -> float:
+        alpha, beta = x
+        if alpha + beta >= 0.999:
+            return np.inf
+        variances = garch_variances(eps, sample_variance * (1 - alpha - beta), alpha, beta)[:, 0]
+        return 0.5 * np.sum(np.log(variances) + eps ** 2 / variances)
+
+    result = minimize(
+        negative_log_likelihood,
+        x0=[0.05, 0.90],
+        method="Nelder-Mead",
+        bounds=[(0.0, 0.5), (0.0, 0.998)],
+    )
+    alpha, beta = result.x
+    return sample_variance * (1 - alpha - beta), alpha, beta
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.datasets.portfolio_set import PortfolioSet
+from portfolio_optimization.units.optimize import get_optimizer, get_ret_vol_sr
+
+
+@pytest.fixture
+def moments():
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(5, 5))
+    return pd.Index([f"S{i}" for i in range(5)]), rng.normal(0.1, 0.05, size=5), A @ A.T / 5
+
+
+def _portfolio_set(solver, sharpe_ratios, symbols=("AAA", "BBB", "CCC")):
+    portfolio_set = PortfolioSet()
+    n = len(sharpe_ratios)
+    weights = np.random.default_rng(len(symbols)).dirichlet(np.ones(len(symbols)), size=n)
+    portfolio_set.add_portfolios(
+        solver=solver,
+        rets=np.arange(n, dtype=float),
+        vols=np.ones(n),
+        sharpe_ratios=sharpe_ratios,
+        weights=weights,
+        symbols=symbols,
+    )
+    return portfolio_set
+
+
+class TestPortfolioSet:
+    def test_add_portfolios_and_extend(self):
+        portfolio_set = _portfolio_set("SLSQP", [1.0, 2.0])
+        other = _portfolio_set(["QP", "Frontier"], [3.0, 4.0], symbols=("CCC", "DDD"))
+        other.timings["QP"] = 1.5
+        portfolio_set.extend(other)
+        assert list(portfolio_set.symbols) == ["AAA", "BBB", "CCC", "DDD"]
+        assert list(portfolio_set.solvers) == ["SLSQP", "SLSQP", "QP", "Frontier"]
+        np.testing.assert_array_equal(portfolio_set.get_metric("Sharpe Ratio"), [1, 2, 3, 4])
+        # Widened symbols are zero for earlier portfolios, and missing symbols for later ones
+        np.testing.assert_array_equal(portfolio_set.weights[:2, 3], 0)
+        np.testing.assert_array_equal(portfolio_set.weights[2:, :2], 0)
+        np.testing.assert_array_equal(portfolio_set.weights[2:, 2:], other.weights)
+        assert portfolio_set.timings == {"QP": 1.5}
+
+    def test_growth_keeps_portfolios(self):
+        portfolio_set = PortfolioSet(capacity=2)
+        for i in range(5):
+            portfolio_set.add_portfolio(solver="SLSQP", ret=i, vol=1.0, sharpe_ratio=i, weights={"AAA": i, "BBB": 1.0})
+        np.testing.assert_array_equal(portfolio_set.weights, np.c_[np.arange(5), np.ones(5)])
+        np.testing.assert_array_equal(portfolio_set.get_metric("Return"), np.arange(5))
+
+    def test_portfolios_view_round_trip(self):
+        portfolio_set = _portfolio_set(["SLSQP", "QP", "SLSQP"], [1.0, 3.0, 2.0])
+        portfolios = portfolio_set.portfolios
+        assert list(portfolios.columns) == ["Solver", "Return", "Volatility", "Sharpe Ratio", "Weights"]
+        assert portfolios.iloc[1]["Weights"] == dict(zip(["AAA", "BBB", "CCC"], portfolio_set.weights[1]))
+        assert portfolio_set.portfolios is portfolios  # only rebuilt after new appends
+        round_trip = PortfolioSet.from_frame(portfolios)
+        np.testing.assert_array_equal(round_trip.weights, portfolio_set.weights)
+        np.testing.assert_array_equal(round_trip.solvers, portfolio_set.solvers)
+        pd.testing.assert_frame_equal(round_trip.portfolios, portfolios)
+        portfolio_set.add_portfolio(solver="QP", ret=0.0, vol=1.0, sharpe_ratio=0.0, weights={"AAA": 1.0})
+        assert len(portfolio_set.portfolios) == 4
+
+    def test_to_arrow(self):
+        portfolio_set = _portfolio_set(["SLSQP", "QP"], [1.0, 2.0])
+        table = portfolio_set.to_arrow()
+        assert table.column_names == ["Solver", "Return", "Volatility", "Sharpe Ratio", "Weights"]
+        assert table.schema.metadata[b"symbols"] == b"AAA,BBB,CCC"
+        assert table.column("Solver").to_pylist() == ["SLSQP", "QP"]
+        np.testing.assert_array_equal(np.array(table.column("Weights").to_pylist()), portfolio_set.weights)
+        np.testing.assert_array_equal(table.column("Sharpe Ratio").to_numpy(), [1, 2])
+
+    def test_top_k_ordering_and_ties(self):
+        portfolio_set = _portfolio_set("SLSQP", [1.0, 3.0, 2.0, 3.0, 0.5, 3.0])
+        assert list(portfolio_set.top_k(k=2).index) == [1, 3]  # earliest of the tied best
+        assert list(portfolio_set.top_k(k=4).index) == [1, 3, 5, 2]
+        assert list(portfolio_set.top_k(k=2, ascending=True).index) == [4, 0]
+        assert list(portfolio_set.top_k(k=10).index) == [1, 3, 5, 2, 0, 4]
+        assert list(portfolio_set.top_k("Return", k=1).index) == [5]
+
+    def test_empty(self):
+        portfolio_set = PortfolioSet()
+        assert len(portfolio_set) == 0
+        assert portfolio_set.top_k(k=3).empty
+        assert portfolio_set.portfolios.empty
+        assert portfolio_set.to_arrow().num_rows == 0
+        assert len(PortfolioSet.from_frame(portfolio_set.portfolios)) == 0
+        with pytest.raises(ValueError):
+            portfolio_set.get_metric("Sortino Ratio")
+
+
+class TestOptimizationTrace:
+    def test_record_every(self):
+        portfolio_set = PortfolioSet()
+        trace = portfolio_set.new_trace(solver="SLSQP", symbols=["AAA", "BBB"], record_every=3)
+        for i in range(7):
+            trace.record(np.array([i, 1.0]), ret=i, vol=1.0, sharpe_ratio=i)
+        # Calls 1, 4 & 7 are kept
+        np.testing.assert_array_equal(portfolio_set.get_metric("Return"), [0, 3, 6])
+        trace.record(np.array([0.5, 0.5]), ret=9, vol=1.0, sharpe_ratio=9, force=True)
+        np.testing.assert_array_equal(portfolio_set.get_metric("Return"), [0, 3, 6, 9])
+
+    def test_forced_records_only(self):
+        portfolio_set = PortfolioSet()
+        trace = portfolio_set.new_trace(solver="SLSQP", symbols=["AAA"], record_every=None)
+        for i in range(5):
+            trace.record(np.ones(1), ret=i, vol=1.0, sharpe_ratio=i)
+        assert len(portfolio_set) == 0
+        trace.record(np.ones(1), ret=1, vol=1.0, sharpe_ratio=1, force=True)
+        assert len(portfolio_set) == 1
+
+    def test_objective_records_every_nth_iterate_and_solution(self, moments):
+        symbols, mean, cov = moments
+        portfolio_set = PortfolioSet()
+        opt_results = get_optimizer("SLSQP")(
+            None, portfolio_set, solver="SLSQP", record_every=3, moments=moments, subtract_risk_free=False
+        )
+        # One of every 3 objective calls, then the solution itself
+        assert len(portfolio_set) == -(-opt_results.nfev // 3) + 1
+        np.testing.assert_allclose(portfolio_set.weights[-1], opt_results.x)
+        np.testing.assert_allclose(portfolio_set.get_metric("Sharpe Ratio")[-1], get_ret_vol_sr(opt_results.x, mean, cov)[2])
+        assert list(portfolio_set.symbols) == list(symbols)
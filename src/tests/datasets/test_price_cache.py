@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.datasets.price_cache import PriceCache
+
+
+def _prices(start, end):
+    dates = pd.bdate_range(start, end, inclusive="left", name="Date")
+    return pd.DataFrame({"Open": np.arange(len(dates), dtype=float), "Close": np.arange(len(dates), dtype=float)}, index=dates)
+
+
+class TestPriceCache:
+    def test_fixed_window_is_a_hit_after_first_fetch(self, tmp_path):
+        cache = PriceCache(tmp_path)
+        assert cache.plan(["AAA"], "2021-01-01", "2022-01-01") == {"AAA": [(pd.Timestamp("2021-01-01"), pd.Timestamp("2022-01-01"))]}
+        cache.update("AAA", _prices("2021-01-01", "2022-01-01"), "2021-01-01", "2022-01-01")
+        assert cache.plan(["AAA"], "2021-03-01", "2021-06-01") == {}
+        assert cache.hits == ["AAA"] and cache.misses == []
+        pd.testing.assert_frame_equal(cache.load("AAA", "2021-03-01", "2021-06-01"), _prices("2021-01-01", "2022-01-01").loc["2021-03-01":"2021-05-31"], check_freq=False)
+
+    def test_only_missing_ranges_are_fetched(self, tmp_path):
+        cache = PriceCache(tmp_path)
+        cache.update("AAA", _prices("2021-06-01", "2022-01-01"), "2021-06-01", "2022-01-01")
+        assert cache.missing_ranges("AAA", "2021-01-01", "2022-03-01") == [
+            (pd.Timestamp("2021-01-01"), pd.Timestamp("2021-06-01")),
+            (pd.Timestamp("2022-01-01"), pd.Timestamp("2022-03-01")),
+        ]
+        cache.update("AAA", _prices("2022-01-01", "2022-03-01"), "2022-01-01", "2022-03-01")
+        assert cache.coverage("AAA") == (pd.Timestamp("2021-06-01"), pd.Timestamp("2022-03-01"))
+        assert len(cache.load("AAA", "2021-06-01", "2022-03-01")) == len(pd.bdate_range("2021-06-01", "2022-02-28"))
+
+    def test_offline_mode_fails_fast(self, tmp_path):
+        cache = PriceCache(tmp_path, offline=True)
+        with pytest.raises(RuntimeError):
+            cache.plan(["AAA"], "2021-01-01", "2022-01-01")
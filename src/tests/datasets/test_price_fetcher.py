@@ -0,0 +1,54 @@
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.datasets.price_fetcher import NO_DATA, ConcurrentFetcher, PriceFetcher
+
+
+class FakeFetcher(PriceFetcher):
+    def __init__(self, flaky=(), broken=()):
+        self.flaky = set(flaky)  # fail on their first request
+        self.broken = set(broken)  # never return data
+        self.calls = Counter()
+
+    def fetch(self, tickers, start_date, end_date=None, interval="1d"):
+        for ticker in tickers:
+            self.calls[ticker] += 1
+        if any(ticker in self.flaky and self.calls[ticker] == 1 for ticker in tickers):
+            raise ConnectionError("rate limited")
+        dates = pd.bdate_range(start_date, end_date, inclusive="left", name="Date")
+        return pd.concat(
+            {ticker: pd.DataFrame({"Close": np.ones(len(dates))}, index=dates) for ticker in tickers if ticker not in self.broken},
+            axis=1,
+            names=["Ticker", "Price"],
+        ) if set(tickers) - self.broken else pd.DataFrame()
+
+
+TICKERS = [f"T{i}" for i in range(12)]
+
+
+class TestConcurrentFetcher:
+    def test_retries_and_isolates_failures(self):
+        fake = FakeFetcher(flaky=["T1"], broken=["T7"])
+        fetcher = ConcurrentFetcher(fake, batch_size=4, n_workers=3, max_retries=2, backoff=0.001)
+        data = fetcher.fetch(TICKERS, "2021-01-01", "2021-02-01")
+        assert sorted(data.columns.get_level_values(0).unique()) == sorted(set(TICKERS) - {"T7"})
+        assert list(fetcher.failures) == ["T7"]
+        assert fake.calls["T0"] == 2  # its batch failed once on T1
+
+    def test_rate_limit(self):
+        fetcher = ConcurrentFetcher(FakeFetcher(), batch_size=1, n_workers=4, rate=40)
+        start = time.perf_counter()
+        fetcher.fetch(TICKERS, "2021-01-01", "2021-02-01")
+        assert time.perf_counter() - start >= (len(TICKERS) - 1) / 40 * 0.9
+
+    def test_empty_response_is_not_retried(self):
+        fake = FakeFetcher()
+        fetcher = ConcurrentFetcher(fake, batch_size=4, max_retries=3, backoff=10)
+        data = fetcher.fetch(TICKERS, "2021-01-02", "2021-01-04")  # a weekend
+        assert data.empty
+        assert set(fake.calls.values()) == {1}
+        assert fetcher.failures == dict.fromkeys(TICKERS, NO_DATA)
@@ -0,0 +1,36 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.utils.data_utils import concat_partitions, get_stock_returns
+
+
+@pytest.fixture
+def stocks_data():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=50, name="Date")
+    return {
+        ticker: pd.DataFrame({"Close": rng.uniform(90, 110, 50), "Open": rng.uniform(90, 110, 50)}, index=dates)
+        for ticker in ["AAA", "BBB", "CCC"]
+    }
+
+
+class TestPricePanel:
+    def test_views_are_zero_copy(self, stocks_data):
+        panel = PricePanel.from_dict(stocks_data)
+        assert np.shares_memory(panel.field("Close").values, panel.values)
+        assert np.shares_memory(panel["BBB"].values, panel.values)
+        pd.testing.assert_frame_equal(panel["BBB"], stocks_data["BBB"], check_names=False)
+
+    def test_dict_consumers_match(self, stocks_data):
+        panel = PricePanel.from_dict(stocks_data)
+        pd.testing.assert_frame_equal(get_stock_returns(panel), get_stock_returns(stocks_data), check_names=False)
+        pd.testing.assert_frame_equal(concat_partitions(panel), concat_partitions(stocks_data), check_names=False)
+
+    def test_pickle_keeps_values_read_only(self, stocks_data):
+        panel = pickle.loads(pickle.dumps(PricePanel.from_dict(stocks_data, dtype=np.float32)))
+        assert panel.values.dtype == np.float32
+        assert not panel.values.flags.writeable
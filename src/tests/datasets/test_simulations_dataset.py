@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.datasets.simulations_dataset import PortfolioSimulations, SimulationsDataSet
+from portfolio_optimization.units.simulate import calculate_simulated_portfolio_returns
+
+
+@pytest.fixture
+def chunks():
+    rng = np.random.default_rng(0)
+    return [rng.normal(100, 5, size=(n, 30)) for n in (100, 100, 50)]
+
+
+class TestSimulationsDataSet:
+    def test_streamed_save_round_trip(self, tmp_path, chunks):
+        dataset = SimulationsDataSet(filepath=str(tmp_path / "sims.arrow"))
+        dataset.save(PortfolioSimulations(chunks=iter(chunks), timeframe=30))
+        sims = dataset.load()
+        expected = np.concatenate(chunks)
+        assert (sims.num_sims, sims.timeframe) == (250, 30)
+        np.testing.assert_array_equal(sims.terminal_values(), expected[:, -1])
+        np.testing.assert_array_equal(sims.to_frame(max_paths=10).values, expected[:10].T)
+
+    def test_load_is_memory_mapped(self, tmp_path, chunks):
+        dataset = SimulationsDataSet(filepath=str(tmp_path / "sims.arrow"))
+        dataset.save(PortfolioSimulations(chunks=chunks[:1], timeframe=30))
+        sims = dataset.load()
+        column = sims.table.column(0).chunk(0)
+        assert column.buffers()[1].is_cpu and not column.buffers()[1].is_mutable
+        assert sims.day(0).base is not None  # a view of the mapped buffer, not a copy
+
+    def test_frame_compatibility(self, tmp_path, chunks):
+        df = pd.DataFrame(chunks[0].T, columns=[f"Simulation {i + 1}" for i in range(100)])
+        dataset = SimulationsDataSet(filepath=str(tmp_path / "sims.arrow"))
+        dataset.save(df)
+        sims = dataset.load()
+        pd.testing.assert_frame_equal(sims.to_frame(), df)
+        np.testing.assert_array_equal(
+            calculate_simulated_portfolio_returns(sims, 100).values,
+            calculate_simulated_portfolio_returns(df, 100).values,
+        )
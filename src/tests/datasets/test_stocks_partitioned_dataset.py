@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.datasets.stocks_partitioned_dataset import StocksPartitionedDataSet
+
+DATASET = "portfolio_optimization.datasets.metadata_parquet_dataset.MetadataParquetDataSet"
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=30, name="Date")
+    return PricePanel.from_dict({
+        ticker: pd.DataFrame({"Open": rng.uniform(90, 110, 30), "Close": rng.uniform(90, 110, 30)}, index=dates)
+        for ticker in ["AAA", "BBB", "CCC"]
+    })
+
+
+class TestStocksPartitionedDataSet:
+    def test_round_trip_with_metadata(self, tmp_path, panel):
+        StocksPartitionedDataSet(str(tmp_path), DATASET, filename_suffix=".parquet").save(panel)
+        assert pq.read_schema(tmp_path / "BBB.parquet").metadata[b"ticker"] == b"BBB"
+        loaded = StocksPartitionedDataSet(str(tmp_path), DATASET, filename_suffix=".parquet").load()
+        np.testing.assert_array_equal(loaded.values, panel.values)
+        assert list(loaded.fields) == ["Open", "Close"]
+
+    def test_projection_and_symbols(self, tmp_path, panel):
+        StocksPartitionedDataSet(str(tmp_path), DATASET, filename_suffix=".parquet").save(panel)
+        loaded = StocksPartitionedDataSet(
+            str(tmp_path),
+            {"type": DATASET, "load_args": {"columns": ["Close"]}},
+            symbols=["NASDAQ:CCC", "AAA"],
+            filename_suffix=".parquet",
+        ).load()
+        assert list(loaded.tickers) == ["CCC", "AAA"]
+        assert list(loaded.fields) == ["Close"]
+        pd.testing.assert_frame_equal(loaded.field("Close"), panel.field("Close")[["CCC", "AAA"]], check_freq=False)
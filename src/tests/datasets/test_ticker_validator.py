@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.datasets.price_fetcher import PriceFetcher
+from portfolio_optimization.datasets.ticker_validator import TickerValidator
+
+
+class FakeFetcher(PriceFetcher):
+    def __init__(self, listed):
+        self.listed = set(listed)
+        self.requests = []
+
+    def fetch(self, tickers, start_date, end_date=None, interval="1d"):
+        self.requests.append(list(tickers))
+        dates = pd.bdate_range(end=pd.Timestamp.today(), periods=5, name="Date")
+        frames = {t: pd.DataFrame({"Close": np.ones(len(dates))}, index=dates) for t in tickers if t in self.listed}
+        return pd.concat(frames, axis=1, names=["Ticker", "Price"]) if frames else pd.DataFrame()
+
+
+class TestTickerValidator:
+    def test_single_bulk_request_then_cached(self):
+        fetcher = FakeFetcher(["AAPL", "MSFT"])
+        validator = TickerValidator(fetcher)
+        assert validator.get_invalid(["AAPL", "XXXX", "MSFT"]) == ["XXXX"]
+        assert validator.get_invalid(["MSFT", "XXXX"]) == ["XXXX"]
+        assert validator.is_valid("GOOG") is False
+        assert fetcher.requests == [["AAPL", "XXXX", "MSFT"], ["GOOG"]]
+
+    def test_ttl_expiry(self):
+        fetcher = FakeFetcher(["AAPL"])
+        validator = TickerValidator(fetcher, ttl=0)
+        validator.validate(["AAPL"])
+        validator.validate(["AAPL"])
+        assert len(fetcher.requests) == 2
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.units.evaluate import (
+    calculate_mcCVaR,
+    calculate_mcVaR,
+    calculate_mcVaR_and_mcCVaR_for_each_alpha,
+    calculate_mcVaR_for_each_alpha,
+)
+
+ALPHAS = [0.001, 0.005, 0.01, 0.02, 0.05, 0.1]
+
+
+class TestCalculateMcVaRAndMcCVaR:
+    @pytest.mark.parametrize("decimals", [None, 0])  # continuous & heavily tied returns
+    def test_matches_per_alpha_evaluation(self, decimals):
+        returns = pd.Series(np.random.default_rng(0).normal(0, 1000, size=10_001))
+        if decimals is not None:
+            returns = (returns / 100).round(decimals)
+        table = calculate_mcVaR_and_mcCVaR_for_each_alpha(returns, ALPHAS)
+        VaRs = calculate_mcVaR_for_each_alpha(returns, ALPHAS)
+        assert list(table.index) == ALPHAS
+        np.testing.assert_array_equal(table["VaR"], list(VaRs.values()))
+        np.testing.assert_allclose(
+            table["CVaR"], [calculate_mcCVaR(returns, alpha, VaR=float(VaRs[alpha])) for alpha in ALPHAS], rtol=1e-12
+        )
+
+    def test_small_sample(self):
+        table = calculate_mcVaR_and_mcCVaR_for_each_alpha(pd.Series([3.0]), ALPHAS)
+        assert (table["VaR"] == 3.0).all() and (table["CVaR"] == 3.0).all()
+
+    def test_weighted(self):
+        returns = np.random.default_rng(1).normal(0, 1000, size=1000)
+        repeats = np.random.default_rng(2).integers(1, 4, size=1000)
+        sample_weights = repeats / repeats.mean()  # likelihood ratios, averaging 1
+        weighted = calculate_mcVaR_and_mcCVaR_for_each_alpha(returns, ALPHAS[2:], sample_weights=sample_weights)
+        repeated = np.sort(np.repeat(returns, repeats))
+        VaRs = repeated[np.ceil(np.array(ALPHAS[2:]) * len(repeated)).astype(int) - 1]  # inverted CDF
+        np.testing.assert_array_equal(weighted["VaR"], VaRs)
+        np.testing.assert_allclose(weighted["CVaR"], [repeated[repeated <= VaR].mean() for VaR in VaRs])
+        assert calculate_mcVaR(returns, 0.05, sample_weights) == weighted.loc[0.05, "VaR"]
+        assert calculate_mcCVaR(returns, 0.05, sample_weights=sample_weights) == pytest.approx(weighted.loc[0.05, "CVaR"])
+
+    def test_batch_standard_errors(self):
+        returns = np.random.default_rng(3).normal(0, 1, size=100_000)
+        table = calculate_mcVaR_and_mcCVaR_for_each_alpha(returns, [0.05], n_batches=10)
+        assert list(table.columns) == ["VaR", "CVaR", "VaR SE", "CVaR SE"]
+        assert table.loc[0.05, "VaR SE"] == pytest.approx(0.0067, rel=0.5)
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import approx_fprime, check_grad
+
+from portfolio_optimization.datasets.portfolio_set import PortfolioSet
+from portfolio_optimization.units import optimize
+from portfolio_optimization.units.optimize import (
+    extract_best_portfolio_weights,
+    get_annualized_moments,
+    get_neg_sharpe_ratio_grad,
+    get_neg_sharpe_ratio_hess,
+    get_optimizer,
+    optimize_frontier,
+    optimize_multi_start,
+    optimize_weights,
+    solve_qp,
+)
+
+
+@pytest.fixture
+def moments():
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(8, 8))
+    return rng.normal(0.1, 0.05, size=8), A @ A.T / 8
+
+
+@pytest.fixture
+def stocks_data():
+    rng = np.random.default_rng(1)
+    dates = pd.date_range("2021-01-01", periods=750, name="Date")
+    factors = rng.normal(0, 0.01, size=(len(dates), 2))
+    returns = factors @ rng.normal(0, 0.5, size=(12, 2)).T + rng.normal(0.0006, 0.01, size=(len(dates), 12))
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return {
+        f"S{i}": pd.DataFrame({"Open": prices[:, i], "Close": prices[:, i]}, index=dates)
+        for i in range(12)
+    }
+
+
+class TestSharpeDerivatives:
+    def test_gradient(self, moments):
+        mean, cov = moments
+        weights = np.random.default_rng(2).dirichlet(np.ones(len(mean)))
+        neg_sharpe = lambda w: -(mean @ w - 0.04) / np.sqrt(w @ cov @ w)
+        assert check_grad(neg_sharpe, lambda w: get_neg_sharpe_ratio_grad(w, mean, cov, 0.04), weights) < 1e-6
+
+    def test_hessian(self, moments):
+        mean, cov = moments
+        weights = np.random.default_rng(3).dirichlet(np.ones(len(mean)))
+        numerical = np.array([
+            approx_fprime(weights, lambda w: get_neg_sharpe_ratio_grad(w, mean, cov, 0.04)[i], 1e-7)
+            for i in range(len(mean))
+        ])
+        np.testing.assert_allclose(get_neg_sharpe_ratio_hess(weights, mean, cov, 0.04), numerical, atol=1e-4)
+
+
+class TestSolveQP:
+    def test_min_variance_matches_slsqp(self, moments):
+        from scipy.optimize import LinearConstraint, minimize
+        _, cov = moments
+        n = len(cov)
+        qp = solve_qp(2 * cov, np.zeros(n), A_eq=np.ones((1, n)), b_eq=np.ones(1))
+        slsqp = minimize(
+            lambda w: w @ cov @ w, np.full(n, 1 / n), jac=lambda w: 2 * cov @ w, method="SLSQP",
+            bounds=[(0, 1)] * n, constraints=LinearConstraint(np.ones(n), 1, 1), options={"ftol": 1e-12},
+        )
+        assert qp.success
+        assert qp.x.sum() == pytest.approx(1)
+        assert qp.x.min() >= 0
+        assert qp.fun == pytest.approx(slsqp.fun, rel=1e-6)
+
+    def test_max_sharpe_matches_slsqp(self, stocks_data):
+        qp = get_optimizer("QP")(stocks_data, PortfolioSet(), solver="QP")
+        slsqp = get_optimizer("SLSQP")(stocks_data, PortfolioSet(), solver="SLSQP")
+        assert qp.fun == pytest.approx(slsqp.fun, rel=1e-5)
+
+    def test_failed_solve_is_not_saved(self, stocks_data, monkeypatch, caplog):
+        monkeypatch.setattr(optimize, "solve_qp", lambda *args, **kwargs: solve_qp(*args, **kwargs, max_iter=1))
+        portfolio_set = PortfolioSet()
+        qp = get_optimizer("QP")(stocks_data, portfolio_set, solver="QP")
+        assert not qp.success
+        assert len(portfolio_set) == 0
+        assert "QP solve failed" in caplog.text
+
+
+class TestOptimizeWeights:
+    def test_parallel_solvers_match_serial(self, stocks_data):
+        params = {
+            "data": {"stocks": {"period": "daily"}},
+            "optimize": {"solvers": ["SLSQP", "QP"], "optimize_on": "Close", "record_every": None},
+        }
+        serial = optimize_weights(stocks_data, params)
+        parallel = optimize_weights(stocks_data, {**params, "optimize": {**params["optimize"], "n_workers": 2}})
+        assert set(parallel.timings) == {"SLSQP", "QP"}
+        np.testing.assert_allclose(parallel.weights, serial.weights)
+        np.testing.assert_array_equal(parallel.solvers, serial.solvers)
+
+    def test_failed_qp_keeps_other_solvers(self, stocks_data, monkeypatch, caplog):
+        monkeypatch.setattr(optimize, "solve_qp", lambda *args, **kwargs: solve_qp(*args, **kwargs, max_iter=1))
+        params = {
+            "data": {"stocks": {"period": "daily"}},
+            "optimize": {"solvers": ["QP", "SLSQP"], "optimize_on": "Close", "record_every": None},
+        }
+        portfolio_set = optimize_weights(stocks_data, params)
+        assert list(portfolio_set.solvers) == ["SLSQP"]
+        assert set(portfolio_set.timings) == {"QP", "SLSQP"}
+        assert "QP solve failed" in caplog.text
+        best_weights = extract_best_portfolio_weights(portfolios=portfolio_set, min_weight=None)
+        assert best_weights == portfolio_set.portfolios.iloc[0]["Weights"]
+
+    def test_solver_without_portfolio(self, stocks_data, monkeypatch, caplog):
+        monkeypatch.setitem(optimize.OPTIMIZER_BACKENDS, "Noop", lambda *args, **kwargs: None)
+        params = {
+            "data": {"stocks": {"period": "daily"}},
+            "optimize": {"solvers": ["Noop", "SLSQP"], "optimize_on": "Close", "record_every": None},
+        }
+        portfolio_set = optimize_weights(stocks_data, params)
+        assert list(portfolio_set.solvers) == ["SLSQP"]
+        assert "Noop: No portfolio recorded" in caplog.text
+        with pytest.raises(ValueError, match="Noop"):
+            extract_best_portfolio_weights(portfolios=optimize_weights(stocks_data, {
+                **params, "optimize": {**params["optimize"], "solvers": ["Noop"]}
+            }))
+
+
+class TestOptimizeMultiStart:
+    def test_multi_start_is_reproducible_and_no_worse(self, stocks_data):
+        single = get_optimizer("SLSQP")(stocks_data, PortfolioSet(), solver="SLSQP", record_every=None)
+        serial, parallel = PortfolioSet(), PortfolioSet()
+        best = optimize_multi_start(stocks_data, serial, n_starts=6, patience=None, seed=0)
+        optimize_multi_start(stocks_data, parallel, n_starts=6, patience=None, seed=0, n_workers=2)
+        assert best.fun <= single.fun + 1e-9
+        assert 1 <= len(serial) <= 6
+        np.testing.assert_array_equal(serial.weights, parallel.weights)
+
+    def test_patience_stops_early(self, stocks_data, caplog):
+        with caplog.at_level("INFO"):
+            optimize_multi_start(stocks_data, PortfolioSet(), n_starts=50, patience=2, seed=0)
+        assert "from 50 starting point" not in caplog.text
+
+    @pytest.mark.parametrize("n_succeeded", [1, 0])
+    def test_failed_starts_are_skipped(self, stocks_data, monkeypatch, caplog, n_succeeded):
+        solve_start, calls = optimize._solve_start, []
+
+        def _failing_solve_start(*args, **kwargs):
+            opt_results = solve_start(*args, **kwargs)
+            calls.append(opt_results)
+            opt_results.success = len(calls) <= n_succeeded
+            return opt_results
+
+        monkeypatch.setattr(optimize, "_solve_start", _failing_solve_start)
+        portfolio_set = PortfolioSet()
+        best = optimize_multi_start(stocks_data, portfolio_set, n_starts=4, patience=None, seed=0)
+        assert len(portfolio_set) == n_succeeded
+        assert best is (calls[0] if n_succeeded else calls[-1])
+        assert f"Dropped {4 - n_succeeded} starting point(s)" in caplog.text
+
+    def test_all_starts_failed_through_optimize_weights(self, stocks_data, monkeypatch, caplog):
+        solve_start = optimize._solve_start
+
+        def _failing_solve_start(*args, **kwargs):
+            opt_results = solve_start(*args, **kwargs)
+            opt_results.success = False
+            return opt_results
+
+        monkeypatch.setattr(optimize, "_solve_start", _failing_solve_start)
+        params = {
+            "data": {"stocks": {"period": "daily"}},
+            "optimize": {
+                "solvers": ["SLSQP", "QP"],
+                "optimize_on": "Close",
+                "record_every": None,
+                "multi_start": {"enabled": True, "n_starts": 3, "seed": 0},
+            },
+        }
+        portfolio_set = optimize_weights(stocks_data, params)
+        assert list(portfolio_set.solvers) == ["QP"]
+        assert "SLSQP: Every starting point failed" in caplog.text
+
+
+class TestOptimizeFrontier:
+    @pytest.mark.parametrize("grid", ["target_return", "risk_aversion"])
+    @pytest.mark.parametrize("solver", ["SLSQP", "QP"])
+    def test_frontier_is_efficient(self, stocks_data, grid, solver):
+        symbols, mean, cov = moments = get_annualized_moments(stocks_data)
+        portfolio_set = PortfolioSet()
+        opt_results = optimize_frontier(None, portfolio_set, n_points=10, grid=grid, solver=solver, moments=moments)
+        assert 1 < len(portfolio_set) == len(opt_results)
+        rets, vols = portfolio_set.get_metric("Return"), portfolio_set.get_metric("Volatility")
+        order = np.argsort(rets)
+        assert (np.diff(vols[order]) >= -1e-6).all()  # volatility non-decreasing in return
+        # The least risky frontier portfolio is the minimum variance one
+        min_variance = solve_qp(2 * cov, np.zeros(len(symbols)), A_eq=np.ones((1, len(symbols))), b_eq=np.ones(1))
+        assert vols.min() == pytest.approx(np.sqrt(min_variance.fun), rel=1e-3)
+
+    def test_equal_returns(self, moments):
+        _, cov = moments
+        symbols = pd.Index([f"S{i}" for i in range(len(cov))])
+        portfolio_set = PortfolioSet()
+        opt_results = optimize_frontier(
+            None, portfolio_set, n_points=10, grid="risk_aversion", moments=(symbols, np.full(len(cov), 0.1), cov)
+        )
+        assert len(opt_results) == len(portfolio_set) == 1
+        assert np.isfinite(portfolio_set.weights).all()
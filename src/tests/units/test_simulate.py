@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from portfolio_optimization.units.simulate import (
+    simulate_portfolio_returns,
+    simulate_portfolio_paths,
+    simulate_portfolio_returns_digest,
+    simulate_portfolio_path_risk,
+    calculate_simulated_path_risk,
+    calculate_simulated_portfolio_returns,
+)
+from portfolio_optimization.units.evaluate import calculate_simulation_convergence
+from portfolio_optimization.utils.covariance_utils import estimate_covariance
+
+
+@pytest.fixture
+def stocks_data():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2021-01-01", periods=500, name="Date")
+    cov = np.array([
+        [1.0, 0.6, 0.2],
+        [0.6, 1.0, 0.4],
+        [0.2, 0.4, 1.0],
+    ]) * 1e-4
+    returns = rng.multivariate_normal([5e-4, 3e-4, 1e-4], cov, size=len(dates))
+    prices = 100 * np.cumprod(1 + returns, axis=0)
+    return {
+        ticker: pd.DataFrame({"Close": prices[:, i]}, index=dates)
+        for i, ticker in enumerate(["AAA", "BBB", "CCC"])
+    }
+
+
+@pytest.fixture
+def weights_dict():
+    return {"AAA": 0.5, "BBB": 0.3, "CCC": 0.2}
+
+
+def _params(**simulate):
+    return {
+        "simulate": {"num_sims": 4000, "timeframe": 30, "initial_investment": 100000, **simulate},
+        "covariance": {"n_factors": 2},
+    }
+
+
+class TestSimulatePortfolioReturns:
+    def test_shape(self, stocks_data, weights_dict):
+        sims = simulate_portfolio_returns(stocks_data, weights_dict, _params(num_sims=250, chunk_size=100))
+        assert sims.shape == (30, 250)
+        assert not sims.isna().any().any()
+
+    def test_invalid_mode(self, stocks_data, weights_dict):
+        with pytest.raises(ValueError):
+            simulate_portfolio_returns(stocks_data, weights_dict, _params(mode="sector"))
+
+    def test_portfolio_mode_matches_asset_mode(self, stocks_data, weights_dict):
+        asset = simulate_portfolio_returns(stocks_data, weights_dict, _params(mode="asset", seed=1)).iloc[-1]
+        portfolio = simulate_portfolio_returns(stocks_data, weights_dict, _params(mode="portfolio", seed=2)).iloc[-1]
+        assert stats.ks_2samp(asset, portfolio).pvalue > 1e-3
+        assert portfolio.mean() == pytest.approx(asset.mean(), rel=5e-3)
+        assert portfolio.std() == pytest.approx(asset.std(), rel=5e-2)
+
+    def test_factor_mode_matches_asset_mode(self, stocks_data, weights_dict):
+        asset = simulate_portfolio_returns(stocks_data, weights_dict, _params(mode="asset", seed=1)).iloc[-1]
+        factor = simulate_portfolio_returns(stocks_data, weights_dict, _params(mode="factor", seed=2)).iloc[-1]
+        assert stats.ks_2samp(asset, factor).pvalue > 1e-3
+        assert factor.std() == pytest.approx(asset.std(), rel=5e-2)
+
+    @pytest.mark.parametrize("mode", ["asset", "portfolio", "factor"])
+    def test_seed_is_reproducible_across_workers(self, stocks_data, weights_dict, mode):
+        serial = simulate_portfolio_returns(
+            stocks_data, weights_dict, _params(num_sims=500, chunk_size=100, mode=mode, seed=7)
+        )
+        parallel = simulate_portfolio_returns(
+            stocks_data, weights_dict, _params(num_sims=500, chunk_size=100, mode=mode, seed=7, n_workers=3)
+        )
+        other_seed = simulate_portfolio_returns(
+            stocks_data, weights_dict, _params(num_sims=500, chunk_size=100, mode=mode, seed=8)
+        )
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert not serial.equals(other_seed)
+
+    def test_shared_covariance_model(self, stocks_data, weights_dict):
+        returns = pd.DataFrame({t: df["Close"] for t, df in stocks_data.items()}).pct_change().dropna()
+        covariance_model = estimate_covariance(returns)
+        params = _params(num_sims=200, seed=3)
+        pd.testing.assert_frame_equal(
+            simulate_portfolio_returns(stocks_data, weights_dict, params, covariance_model=covariance_model),
+            simulate_portfolio_returns(stocks_data, weights_dict, params),
+        )
+
+    def test_paths_match_frame(self, stocks_data, weights_dict):
+        params = _params(num_sims=250, chunk_size=100, seed=5)
+        sims = simulate_portfolio_paths(stocks_data, weights_dict, params)
+        pd.testing.assert_frame_equal(sims.to_frame(), simulate_portfolio_returns(stocks_data, weights_dict, params))
+
+    def test_returns_digest_matches_simulations(self, stocks_data, weights_dict):
+        params = {**_params(num_sims=250, chunk_size=100, seed=5), "evaluate": {"compression": 500}}
+        returns = simulate_portfolio_returns(stocks_data, weights_dict, params).iloc[-1] - 100000
+        serial = simulate_portfolio_returns_digest(stocks_data, weights_dict, params)
+        parallel = simulate_portfolio_returns_digest(
+            stocks_data, weights_dict, {**params, "simulate": {**params["simulate"], "n_workers": 2}}
+        )
+        np.testing.assert_allclose(serial.quantile([0.01, 0.05]), np.percentile(returns, [1, 5]))
+        np.testing.assert_array_equal(serial.centroids, parallel.centroids)
+
+    def test_path_risk_matches_simulations(self, stocks_data, weights_dict):
+        params = {**_params(num_sims=250, chunk_size=100, seed=5), "evaluate": {"loss_barriers": [0.01, 0.05]}}
+        sims = simulate_portfolio_returns(stocks_data, weights_dict, params)
+        simulated = simulate_portfolio_path_risk(
+            stocks_data, weights_dict, {**params, "simulate": {**params["simulate"], "n_workers": 2}}
+        )
+        streamed = calculate_simulated_path_risk(sims, 100000, [0.01, 0.05])
+        pd.testing.assert_series_equal(simulated.breach_probabilities(), streamed.breach_probabilities())
+        pd.testing.assert_frame_equal(
+            simulated.metrics_for_each_alpha([0.01, 0.1]), streamed.metrics_for_each_alpha([0.01, 0.1])
+        )
+
+    def test_importance_sampled_path_risk_matches_plain(self, stocks_data, weights_dict):
+        params = {**_params(chunk_size=1000, seed=0), "evaluate": {"loss_barriers": [0.05]}}
+        plain = simulate_portfolio_path_risk(
+            stocks_data, weights_dict, {**params, "simulate": {**params["simulate"], "num_sims": 20000}}
+        )
+        importance = simulate_portfolio_path_risk(
+            stocks_data, weights_dict, {**params, "simulate": {**params["simulate"], "variance_reduction": "importance"}}
+        )
+        # Upper tail levels (max drawdown, time under water) are estimated from the top under sample weights
+        pd.testing.assert_frame_equal(
+            importance.metrics_for_each_alpha([0.01, 0.05]), plain.metrics_for_each_alpha([0.01, 0.05]), rtol=0.1
+        )
+
+    @pytest.mark.parametrize("generator", ["student_t", "bootstrap", "filtered_historical"])
+    def test_generators(self, stocks_data, weights_dict, generator):
+        params = _params(num_sims=500, chunk_size=200, seed=4, generator=generator)
+        serial = simulate_portfolio_returns(stocks_data, weights_dict, params)
+        parallel = simulate_portfolio_returns(
+            stocks_data, weights_dict, {**params, "simulate": {**params["simulate"], "n_workers": 2}}
+        )
+        gaussian = simulate_portfolio_returns(stocks_data, weights_dict, _params(num_sims=500, seed=4))
+        pd.testing.assert_frame_equal(serial, parallel)
+        assert serial.iloc[-1].std() == pytest.approx(gaussian.iloc[-1].std(), rel=0.25)
+
+    def test_generator_requires_asset_mode(self, stocks_data, weights_dict):
+        with pytest.raises(ValueError):
+            simulate_portfolio_returns(stocks_data, weights_dict, _params(mode="portfolio", generator="bootstrap"))
+
+    @pytest.mark.parametrize("mode", ["asset", "portfolio", "factor"])
+    @pytest.mark.parametrize("variance_reduction", ["antithetic", "sobol", "importance"])
+    def test_variance_reduction(self, stocks_data, weights_dict, mode, variance_reduction):
+        params = {
+            **_params(num_sims=2000, chunk_size=500, mode=mode, seed=6, variance_reduction=variance_reduction),
+            "evaluate": {"n_batches": 10},
+        }
+        serial = simulate_portfolio_returns_digest(stocks_data, weights_dict, params)
+        parallel = simulate_portfolio_returns_digest(
+            stocks_data, weights_dict, {**params, "simulate": {**params["simulate"], "n_workers": 2}}
+        )
+        plain = simulate_portfolio_returns(stocks_data, weights_dict, _params(num_sims=4000, mode=mode, seed=6))
+        np.testing.assert_array_equal(serial.centroids, parallel.centroids)
+        assert serial.weighted == (variance_reduction == "importance")
+        assert serial.quantile(0.05) == pytest.approx(np.percentile(plain.iloc[-1] - 100000, 5), rel=0.15)
+        assert 0 < serial.quantile_se(0.05) < abs(serial.quantile(0.05))
+
+    def test_importance_sampling_paths_are_weighted(self, stocks_data, weights_dict):
+        params = _params(num_sims=300, chunk_size=100, seed=6, variance_reduction="importance")
+        sims = simulate_portfolio_paths(stocks_data, weights_dict, params)
+        assert sims.weighted and sims.sample_weights().shape == (300,)
+        with pytest.raises(ValueError):
+            simulate_portfolio_returns(stocks_data, weights_dict, params)
+
+    def test_importance_sampled_returns_are_resampled(self, stocks_data, weights_dict):
+        params = _params(chunk_size=1000, seed=0, variance_reduction="importance")
+        sims = simulate_portfolio_paths(stocks_data, weights_dict, params)
+        returns = calculate_simulated_portfolio_returns(sims, 100000)
+        plain = simulate_portfolio_returns(stocks_data, weights_dict, _params(seed=0)).iloc[-1] - 100000
+        shifted = sims.terminal_values() - 100000
+        assert len(returns) == 4000
+        assert returns.mean() == pytest.approx(np.average(shifted, weights=sims.sample_weights()), rel=0.01)
+        assert abs(returns.mean() - plain.mean()) < abs(shifted.mean() - plain.mean()) / 4
+
+    @pytest.mark.parametrize("n_workers", [1, 2])
+    def test_adaptive_stops_once_converged(self, stocks_data, weights_dict, n_workers):
+        adaptive = {"enabled": True, "rel_tol": 0.05, "min_sims": 2000, "max_sims": 50_000}
+        params = {
+            **_params(chunk_size=500, seed=9, adaptive=adaptive, n_workers=n_workers),
+            "evaluate": {"alphas": [0.01, 0.05]},
+        }
+        sims = simulate_portfolio_paths(stocks_data, weights_dict, params).to_frame()
+        digest = simulate_portfolio_returns_digest(stocks_data, weights_dict, params)
+        assert 2000 <= sims.shape[1] < 50_000 and sims.shape[1] % 500 == 0
+        # Adaptive simulations are a prefix of the full simulation of the path budget
+        full = simulate_portfolio_returns(stocks_data, weights_dict, _params(num_sims=sims.shape[1], chunk_size=500, seed=9))
+        np.testing.assert_array_equal(sims.to_numpy(), full.to_numpy())
+        convergence = calculate_simulation_convergence(digest, [0.01, 0.05], rel_tol=0.05)
+        assert convergence["Converged"].all() and (convergence["Simulations"] == digest.count).all()
+
+    def test_adaptive_path_budget(self, stocks_data, weights_dict):
+        adaptive = {"enabled": True, "rel_tol": 1e-6, "min_sims": 500, "max_sims": 1500}
+        params = {**_params(chunk_size=500, seed=9, adaptive=adaptive), "evaluate": {"alphas": [0.01]}}
+        assert simulate_portfolio_returns(stocks_data, weights_dict, params).shape == (30, 1500)
+        assert simulate_portfolio_path_risk(stocks_data, weights_dict, params).count == 1500
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from portfolio_optimization.utils.convergence_utils import AdaptiveStopping, calculate_confidence_intervals
+from portfolio_optimization.utils.quantile_utils import BatchedQuantileDigest
+
+ALPHAS = [0.01, 0.05]
+
+
+def _digest(n, seed=0):
+    return BatchedQuantileDigest(n_batches=10).update(np.random.default_rng(seed).normal(-1, 1, size=n))
+
+
+class TestConfidenceIntervals:
+    def test_intervals_shrink_with_simulations(self):
+        small, large = (calculate_confidence_intervals(_digest(n), ALPHAS) for n in [10_000, 160_000])
+        assert list(small.columns) == ["VaR", "VaR CI", "CVaR", "CVaR CI", "Relative Error"]
+        assert (large["VaR CI"] < small["VaR CI"]).all() and (large["CVaR CI"] < small["CVaR CI"]).all()
+        np.testing.assert_allclose(large["VaR"], [-3.326, -2.645], atol=0.02)
+
+    def test_invalid_confidence(self):
+        with pytest.raises(ValueError):
+            calculate_confidence_intervals(_digest(100), ALPHAS, confidence=95)
+
+
+class TestAdaptiveStopping:
+    def test_stop_reasons(self):
+        stopping = AdaptiveStopping(ALPHAS, rel_tol=0.02, min_sims=1000, max_sims=100_000, max_seconds=60)
+        assert stopping.stop_reason(_digest(500), seconds=1) is None  # converged or not, too few simulations
+        assert stopping.stop_reason(_digest(100_000), seconds=1) == "converged"
+        strict = AdaptiveStopping(ALPHAS, rel_tol=1e-4, min_sims=1000, max_sims=100_000, max_seconds=60)
+        assert strict.stop_reason(_digest(20_000), seconds=1) is None
+        assert strict.stop_reason(_digest(20_000), seconds=61) == "time budget"
+        assert strict.stop_reason(_digest(100_000), seconds=1) == "path budget"
+
+    def test_estimates_near_zero_converge_above_min_scale(self):
+        # The 1% VaR of these returns is about 0, so its relative error only shrinks with a floor
+        digest = BatchedQuantileDigest(n_batches=10).update(np.random.default_rng(0).normal(2.326, 1, size=100_000))
+        assert not AdaptiveStopping([0.01], rel_tol=0.05, min_sims=1000).converged(digest)
+        assert AdaptiveStopping([0.01], rel_tol=0.05, min_sims=1000, min_scale=1).converged(digest)
+
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError):
+            AdaptiveStopping(ALPHAS, min_sims=1000, max_sims=100)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.utils.covariance_utils import estimate_covariance
+
+
+@pytest.fixture
+def returns():
+    # More symbols than observations: the sample covariance is singular
+    rng = np.random.default_rng(0)
+    factors = rng.normal(0, 0.01, size=(60, 2))
+    values = factors @ rng.normal(0, 1, size=(80, 2)).T + rng.normal(0, 0.01, size=(60, 80))
+    return pd.DataFrame(values, columns=[f"S{i}" for i in range(80)])
+
+
+class TestEstimateCovariance:
+    def test_sample_matches_pandas(self, returns):
+        model = estimate_covariance(returns)
+        np.testing.assert_allclose(model.cov, returns.cov().values)
+        np.testing.assert_allclose(model.cholesky @ model.cholesky.T, model.cov, atol=1e-8)
+
+    @pytest.mark.parametrize("estimator", ["ledoit_wolf", "oas", "factor"])
+    def test_well_conditioned(self, returns, estimator):
+        model = estimate_covariance(returns, estimator, n_factors=2)
+        assert np.all(model.eigh[0] > 0)
+        assert model.condition_number < estimate_covariance(returns).condition_number
+        np.testing.assert_allclose(model.cholesky @ model.cholesky.T, model.cov)
+
+    def test_factor_structure(self, returns):
+        model = estimate_covariance(returns, "factor", n_factors=2)
+        assert model.loadings.shape == (80, 2)
+        np.testing.assert_allclose(np.diag(model.cov), returns.var().values)
+
+    def test_invalid_estimator(self, returns):
+        with pytest.raises(ValueError):
+            estimate_covariance(returns, "shrunk")
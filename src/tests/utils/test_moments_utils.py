@@ -0,0 +1,36 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.datasets.price_panel import PricePanel
+from portfolio_optimization.utils.data_utils import get_stock_returns
+from portfolio_optimization.utils.moments_utils import estimate_covariance_model, get_returns_moments
+
+
+def _panel(seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2021-01-01", periods=100, name="Date")
+    prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, size=(100, 4)), axis=0)
+    return PricePanel.from_dict({
+        f"S{i}": pd.DataFrame({"Open": prices[:, i], "Close": prices[:, i]}, index=dates) for i in range(4)
+    })
+
+
+class TestReturnsMoments:
+    def test_shared_across_copies_of_the_prices(self, caplog):
+        panel = _panel(0)
+        moments = get_returns_moments(panel, "Close")
+        with caplog.at_level("INFO"):
+            assert get_returns_moments(pickle.loads(pickle.dumps(panel)), "Close") is moments
+        assert "cache hit" in caplog.text
+        assert get_returns_moments(_panel(1), "Close") is not moments
+        assert get_returns_moments(panel, "Open") is not moments
+
+    def test_moments_match_returns(self):
+        panel = _panel(2)
+        moments = get_returns_moments(panel, "Close", "daily")
+        returns = get_stock_returns(panel, "Close")
+        pd.testing.assert_frame_equal(moments.returns, returns)
+        pd.testing.assert_frame_equal(moments.cov_annualized, returns.cov() * 252)
+        assert estimate_covariance_model(panel, "Close") is moments.get_covariance_model()
@@ -0,0 +1,50 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from portfolio_optimization.utils.path_risk_utils import PathRiskAccumulator, calculate_path_metrics
+
+
+def _paths(n_sims, seed=0):
+    returns = np.random.default_rng(seed).normal(0, 0.02, size=(n_sims, 60))
+    return 100 * np.cumprod(1 + returns, axis=1)
+
+
+class TestCalculatePathMetrics:
+    def test_matches_path_by_path_loop(self):
+        values = _paths(50)
+        metrics = calculate_path_metrics(values, 100)
+        for i, path in enumerate(values):
+            peak, max_drawdown, run, longest_run = 100, 0, 0, 0
+            for value in path:
+                peak = max(peak, value)
+                max_drawdown = max(max_drawdown, 1 - value / peak)
+                run = run + 1 if value < peak else 0
+                longest_run = max(longest_run, run)
+            assert metrics["max_drawdown"][i] == pytest.approx(max_drawdown)
+            assert metrics["time_under_water"][i] == longest_run
+            assert metrics["min_return"][i] == pytest.approx(path.min() - 100)
+
+
+class TestPathRiskAccumulator:
+    def test_chunked_merge_matches_single_pass(self):
+        values = _paths(2000)
+        single = PathRiskAccumulator(100, [0.1, 0.2]).update(values)
+        chunks = [pickle.loads(pickle.dumps(PathRiskAccumulator(100, [0.1, 0.2]).update(chunk)))
+                  for chunk in np.array_split(values, 5)]
+        merged = PathRiskAccumulator(100, [0.1, 0.2]).merge(*chunks)
+        min_returns = values.min(axis=1) - 100
+        np.testing.assert_array_equal(
+            merged.breach_probabilities().values, [(min_returns <= -10).mean(), (min_returns <= -20).mean()]
+        )
+        np.testing.assert_allclose(
+            merged.metrics_for_each_alpha([0.01, 0.05]), single.metrics_for_each_alpha([0.01, 0.05]), rtol=1e-2
+        )
+        assert merged.metrics_for_each_alpha([0.05])["Intra-horizon VaR"].iloc[0] == pytest.approx(
+            np.percentile(min_returns, 5), rel=1e-2
+        )
+
+    def test_merge_requires_same_barriers(self):
+        with pytest.raises(ValueError):
+            PathRiskAccumulator(100, [0.1]).merge(PathRiskAccumulator(100, [0.2]))
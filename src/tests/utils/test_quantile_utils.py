@@ -0,0 +1,68 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_optimization.units.evaluate import calculate_mcCVaR_for_each_alpha, calculate_mcVaR_for_each_alpha
+from portfolio_optimization.utils.quantile_utils import BatchedQuantileDigest, QuantileDigest, merge_digests
+
+ALPHAS = [0.001, 0.01, 0.05]
+
+
+class TestQuantileDigest:
+    def test_exact_for_few_values(self):
+        returns = pd.Series(np.random.default_rng(0).normal(0, 1000, size=200))
+        digest = QuantileDigest.from_values(returns, compression=500)
+        assert calculate_mcVaR_for_each_alpha(digest, ALPHAS) == pytest.approx(
+            calculate_mcVaR_for_each_alpha(returns, ALPHAS), rel=1e-12
+        )
+        assert calculate_mcCVaR_for_each_alpha(digest, ALPHAS) == pytest.approx(
+            calculate_mcCVaR_for_each_alpha(returns, ALPHAS), rel=1e-12
+        )
+
+    def test_bounded_memory_and_error(self):
+        values = np.random.default_rng(1).standard_t(4, size=200_000)
+        digest = QuantileDigest(compression=500)
+        for chunk in np.array_split(values, 200):
+            digest.update(chunk)
+        assert len(digest) <= 500
+        VaRs = np.percentile(values, np.array(ALPHAS) * 100)
+        CVaRs = [values[values <= VaR].mean() for VaR in VaRs]
+        np.testing.assert_allclose(digest.quantile(ALPHAS), VaRs, rtol=1e-2)
+        np.testing.assert_allclose(digest.tail_mean(ALPHAS), CVaRs, rtol=1e-2)
+        assert (digest.count, digest.min, digest.max) == (len(values), values.min(), values.max())
+
+    def test_merge_matches_single_digest(self):
+        values = np.random.default_rng(2).normal(size=50_000)
+        parts = [pickle.loads(pickle.dumps(QuantileDigest.from_values(part))) for part in np.array_split(values, 8)]
+        merged = merge_digests(parts)
+        single = QuantileDigest.from_values(values)
+        assert merged.count == single.count and merged.sum == pytest.approx(single.sum)
+        np.testing.assert_allclose(merged.quantile(ALPHAS), single.quantile(ALPHAS), rtol=2e-2)
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            QuantileDigest().quantile(0.05)
+
+    def test_weighted_matches_repeated_values(self):
+        values = np.random.default_rng(3).normal(size=20_000)
+        repeats = np.random.default_rng(4).integers(1, 4, size=20_000)
+        # Weights are likelihood ratios: a value's mass is its weight over the number of values
+        weighted = QuantileDigest.from_values(values, sample_weights=repeats / repeats.mean())
+        repeated = np.repeat(values, repeats)
+        assert weighted.mean == pytest.approx(repeated.mean())
+        np.testing.assert_allclose(weighted.quantile(ALPHAS[1:]), np.percentile(repeated, [1, 5]), atol=0.05)
+
+
+class TestBatchedQuantileDigest:
+    def test_standard_errors(self):
+        values = np.random.default_rng(5).normal(size=100_000)
+        digest = merge_digests([
+            BatchedQuantileDigest(n_batches=10).update(part) for part in np.array_split(values, 4)
+        ])
+        assert digest.count == len(values) and all(batch.count == 10_000 for batch in digest.batches)
+        # Asymptotic standard error of the 5% quantile of a standard normal, sqrt(q(1-q)/n) / pdf
+        assert digest.quantile_se(0.05) == pytest.approx(0.0067, rel=0.5)
+        assert digest.tail_mean_se(0.05) > 0
+        assert np.isnan(BatchedQuantileDigest(n_batches=2).update([1.0, 2.0]).quantile_se(0.5))
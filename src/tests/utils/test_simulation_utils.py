@@ -0,0 +1,78 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from portfolio_optimization.utils.simulation_utils import (
+    BlockBootstrapReturnGenerator,
+    FilteredHistoricalReturnGenerator,
+    GaussianReturnGenerator,
+    NormalSampler,
+    StudentTReturnGenerator,
+    fit_garch,
+)
+
+
+def _garch_returns(n_obs=2000, omega=1e-6, alpha=0.08, beta=0.9, seed=0):
+    rng = np.random.default_rng(seed)
+    eps, variance = np.empty((n_obs, 2)), np.full(2, omega / (1 - alpha - beta))
+    for t in range(n_obs):
+        eps[t] = np.sqrt(variance) * rng.standard_normal(2)
+        variance = omega + alpha * eps[t] ** 2 + beta * variance
+    return eps + 5e-4
+
+
+class TestReturnGenerators:
+    def test_student_t_keeps_covariance_with_fatter_tails(self):
+        L = np.linalg.cholesky(np.array([[1.0, 0.5], [0.5, 1.0]]) * 1e-4)
+        rng = np.random.default_rng(0)
+        gaussian = GaussianReturnGenerator(np.zeros(2), L).generate(20000, 10, rng).reshape(-1, 2)
+        student_t = StudentTReturnGenerator(np.zeros(2), L, dof=4).generate(20000, 10, rng).reshape(-1, 2)
+        np.testing.assert_allclose(np.cov(student_t.T), np.cov(gaussian.T), rtol=0.1)
+        assert np.percentile(student_t[:, 0], 0.1) < np.percentile(gaussian[:, 0], 0.1)
+
+    def test_block_bootstrap_draws_historical_blocks(self):
+        returns = np.arange(100.0)[:, None] * [1, -1]
+        paths = BlockBootstrapReturnGenerator(returns, block_size=5).generate(50, 23, np.random.default_rng(0))
+        assert paths.shape == (50, 23, 2)
+        np.testing.assert_array_equal(paths[..., 1], -paths[..., 0])
+        assert (np.diff(paths[:, :5, 0], axis=1) == 1).all()  # first block is consecutive days
+
+    def test_filtered_historical_fit(self):
+        returns = _garch_returns()
+        omega, alpha, beta = fit_garch(returns[:, 0] - returns[:, 0].mean())
+        assert alpha == pytest.approx(0.08, abs=0.03) and beta == pytest.approx(0.9, abs=0.04)
+        generator = pickle.loads(pickle.dumps(FilteredHistoricalReturnGenerator.fit(returns)))
+        paths = generator.generate(2000, 20, np.random.default_rng(0))
+        assert paths.shape == (2000, 20, 2)
+        np.testing.assert_allclose(paths.std(axis=(0, 1)), returns.std(axis=0), rtol=0.2)
+
+    def test_invalid_dof(self):
+        with pytest.raises(ValueError):
+            StudentTReturnGenerator(np.zeros(1), np.eye(1), dof=2)
+
+
+class TestNormalSampler:
+    def test_antithetic_pairs_negate(self):
+        Z, sample_weights = NormalSampler("antithetic").draw(9, 5, 2, np.random.default_rng(0))
+        assert Z.shape == (9, 5, 2) and sample_weights is None
+        np.testing.assert_array_equal(Z[1::2], -Z[:-1:2])
+
+    def test_sobol_is_standard_normal(self):
+        Z, _ = NormalSampler("sobol").draw(1000, 4, 2, np.random.default_rng(0))
+        assert Z.shape == (1000, 4, 2)
+        np.testing.assert_allclose(Z.mean(axis=0), 0, atol=0.01)
+        np.testing.assert_allclose(Z.std(axis=0), 1, atol=0.02)
+
+    def test_importance_weights_are_unbiased(self):
+        exposure = np.array([0.6, 0.8])
+        Z, sample_weights = NormalSampler("importance", shift=2.0).draw(200_000, 4, 2, np.random.default_rng(0), exposure)
+        losses = (Z @ exposure).sum(axis=1)
+        assert sample_weights.mean() == pytest.approx(1, abs=0.02)
+        assert (losses < 0).mean() > 0.9  # shifted towards losses
+        # Weighted probability of a 3-sigma loss over the timeframe matches the normal's
+        assert np.average(losses < -3 * np.sqrt(4), weights=sample_weights) == pytest.approx(1.35e-3, rel=0.05)
+
+    def test_importance_requires_exposure(self):
+        with pytest.raises(ValueError):
+            NormalSampler("importance").draw(10, 2, 1, np.random.default_rng(0))
@@ -1,9 +1,9 @@
 import pandas as pd
-import yfinance
 import streamlit as st
 from datetime import datetime, timedelta
 
 from portfolio_optimization.consts import DATE_FORMAT
+from portfolio_optimization.datasets.ticker_validator import get_ticker_validator
 
 
 def parse_symbols(symbols_input: str):
@@ -12,8 +12,7 @@ def parse_symbols(symbols_input: str):
 def check_input():
     NUM_SYMBOLS_LIMIT = 50
     symbols_input = parse_symbols(st.session_state.symbols)
-    infos = {s: yfinance.ticker.Ticker(s).info for s in symbols_input}
-    invalid_symbols = [s for s, info in infos.items() if len(info) < 10]
+    invalid_symbols = get_ticker_validator().get_invalid(symbols_input)
     if len(invalid_symbols) > 0:
         st.error(f"Input invalid. The following tickers could not be found: {', '.join(invalid_symbols)}")
     elif len(symbols_input) > NUM_SYMBOLS_LIMIT:
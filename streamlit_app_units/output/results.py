@@ -14,17 +14,18 @@ def display_results(
 ) -> None:
     
     with tab:
-        _display_titles_and_questions(params=params)
+        _display_titles_and_questions(datasets=datasets, params=params)
         _display_weights(datasets=datasets, params=params)
         _display_simulation_and_evaluation(datasets=datasets, params=params)
         
 def _display_titles_and_questions(
     *,
+    datasets: Dict[str, Any],
     params: Dict[str, Any],
 ) -> None:
     st.header("Monte Carlo Simulation & Evaluation", anchor="portfolio_mc_simulations")
     st.write(
-        f"This section visualizes the projected portfolio performances from {params['simulate']['num_sims']} "
+        f"This section visualizes the projected portfolio performances from {_get_num_sims(datasets)} "
         "simulation iterations, highlighting the Value at Risk (VaR) and Conditional Value at Risk (CVaR) for "
         "a user-selected alpha value via a slider."
     )
@@ -113,7 +114,7 @@ def _display_simulation_and_evaluation(
     VaR = -(initial_investment - fig2.data[-2:][1]["y"][0])
     CVaR = -(initial_investment - fig2.data[-2:][0]["y"][0])
     
-    col1.metric("# Simulations", params["simulate"]["num_sims"])
+    col1.metric("# Simulations", _get_num_sims(datasets))
     col2.metric("Investment", f"${initial_investment // 1000}K")
     col3.metric(":green[Expected Return] ", format_currency_str(expected_return, "$", 0), f"{expected_return / initial_investment:.2%}")
     col4.metric(f":{params['visualize']['VaR_color']}[VaR]", format_currency_str(VaR, "$", 0), f"{VaR / initial_investment:.2%}")
@@ -127,7 +128,7 @@ def _display_simulation_and_evaluation(
         "can be {confidence:.1%} confident that one will not lose more than {VaR}. In the event that this portfolio " + \
         "loss threshold is exceeded (the unlikely {alpha:.1%} of cases), the average expected loss is {CVaR}."
     format_dict = dict(
-        num_sims=params["simulate"]["num_sims"],
+        num_sims=_get_num_sims(datasets),
         expected_return=format_currency_str(expected_return, "$", 0),
         alpha=st.session_state['alpha'],
         confidence=1 - st.session_state['alpha'],
@@ -149,3 +150,7 @@ def _display_simulation_and_evaluation(
     fig3 = datasets["simulated_portfolio_returns_dist_plots"].get(st.session_state['alpha'])
     st.plotly_chart(fig3)
     
+
+def _get_num_sims(datasets: Dict[str, Any]) -> int:
+    # Simulations actually run (decided by the stopping rule if adaptive simulation is enabled)
+    return int(datasets["simulated_portfolio_returns_stats"]["count"])